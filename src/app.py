@@ -1,19 +1,25 @@
 import json
 import traceback
-from flask import Flask, render_template, request, redirect, session, url_for, flash, send_file
+from flask import Flask, Response, jsonify, render_template, request, redirect, session, url_for, flash, send_file
 import sqlite3
 from encryption import encrypt_data, decrypt_data  # ✅ Import encryption functions
-from session import session_expire_event, SessionManager  # ✅ Import session expiration event
-from database import init_db, store_master_account, load_master_account, store_password, get_total_stored_passwords, update_password, delete_password, export_database, get_user_preferences, update_user_preferences, initialize_user_preferences, get_connection, log_audit_event, get_audit_logs, get_audit_log_stats, cleanup_old_audit_logs, export_audit_logs
+from session import DEFAULT_SESSION_TIMEOUT
+from session_store import get_session_store  # ✅ Per-session server-side state
+from session_events import events_supported, watch_session, unwatch_session, publish_session_status, session_status_data
+from event_bus import event_bus, session_topic, user_topic, format_sse
+from database import init_db, store_master_account, load_master_account, create_master_account, master_account_exists, verify_master_account, store_password, store_passwords_bulk, get_total_stored_passwords, update_password, delete_password, export_database, get_credentials_page, get_credential_by_id, search_credentials, get_password_stats_summary, get_password_reuse_report, get_websites_using_password, get_user_preferences, load_user_preferences, update_user_preferences, initialize_user_preferences, get_connection, log_audit_event, get_audit_logs, get_audit_logs_page, get_audit_log_stats, cleanup_old_audit_logs, export_audit_logs, get_audit_writer_metrics
+from decrypted_cache import get_decrypted_cache, wipe_decrypted_cache
 from password_strength import PasswordStrengthAnalyzer
+from breach_filter import get_breach_filter
 from password_generator import PasswordGenerator
 
 # 🔒 Flask app setup
 app = Flask(__name__)
 app.secret_key = "supersecurekey"  # ✅ Replace with a strong, secure key
-session_manager = SessionManager()  # 🔥 Create an instance
-password_analyzer = PasswordStrengthAnalyzer()  # 🔐 Password strength analyzer
+password_analyzer = PasswordStrengthAnalyzer(pattern_entropy=True, breach_filter=get_breach_filter())  # 🔐 Password strength analyzer
 password_generator = PasswordGenerator()  # 🔐 Password generator
+SSE_KEEPALIVE_SECONDS = 25  # Comment line sent on idle event streams
+SSE_RETRY_MS = 5000  # Browser reconnect delay for dropped event streams
 init_db()
 
 # Encryption key is handled by encryption.py module
@@ -25,6 +31,13 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row
     return conn
 
+def current_session():
+    """Returns the caller's server-side session, or None if it has expired or belongs to someone else."""
+    state = get_session_store().get(session.get("session_id"))
+    if state is None or state["username"] != session.get("user_id"):
+        return None
+    return state
+
 def user_exists(username):
     """ Check if the username already exists in the database. """
     conn = get_db_connection()
@@ -42,40 +55,32 @@ def login():
         username = request.form["username"]
         password = request.form["password"]
 
-        conn = get_db_connection()
-        users = conn.execute("SELECT * FROM master_account").fetchall()
-        conn.close()
+        if verify_master_account(username, password):
+            print(f"DEBUG: Login successful for {username}")
+
+            session["user_id"] = username
+            session.permanent = True
+
+            # Initialize user preferences if they don't exist
+            initialize_user_preferences(username)
+            
+            preferences = get_user_preferences(username) or {}
+            timeout = preferences.get("session_timeout", DEFAULT_SESSION_TIMEOUT)
+            session["session_id"] = get_session_store().create(username, timeout)  # 🔥 Starts tracking session expiration
+            
+            # Log successful login
+            log_audit_event(
+                username=username,
+                action_type="LOGIN",
+                action_description="User successfully logged in",
+                ip_address=request.remote_addr,
+                user_agent=request.headers.get('User-Agent'),
+                session_id=session.get('session_id', 'unknown')
+            )
+            
+            return redirect("/dashboard")  # ✅ Redirect on success
 
-        for user in users:
-            decrypted_username = decrypt_data(user["username"])
-            decrypted_password = decrypt_data(user["password"])
-
-            if decrypted_username == username and decrypted_password == password:
-                print(f"DEBUG: Login successful for {username}")
-
-                session["user_id"] = username
-                session.permanent = True
-
-                # Initialize user preferences if they don't exist
-                initialize_user_preferences(username)
-                
-                session_manager.start_session(username)  # 🔥 Starts tracking session expiration
-                
-                # Log successful login
-                log_audit_event(
-                    username=username,
-                    action_type="LOGIN",
-                    action_description="User successfully logged in",
-                    ip_address=request.remote_addr,
-                    user_agent=request.headers.get('User-Agent'),
-                    session_id=session.get('session_id', 'unknown')
-                )
-                
-                return redirect("/dashboard")  # ✅ Redirect on success
-
-            print("DEBUG: Password incorrect")
-
-        print("DEBUG: User not found")
+        print("DEBUG: Invalid username or password")
         
         # Log failed login attempt
         log_audit_event(
@@ -96,14 +101,14 @@ def login():
 @app.route("/dashboard")
 def dashboard():
     username = session.get("user_id", "Guest")  # 🔒 Retrieves user ID from session
-    print(f"DEBUG: Checking session expiration flag (Flask) → {session_expire_event.is_set()}")  # 🔎 Logs flag state
-    total_passwords = get_total_stored_passwords()
-
-    if "user_id" not in session or session_expire_event.is_set():  # ✅ Checks timeout flag properly
+    if "user_id" not in session or current_session() is None:  # ✅ Checks this caller's own session
         print("DEBUG: Session expired. Redirecting back to login.")
         session.clear()  # 🔒 Removes user session
+        wipe_decrypted_cache()  # 🧹 Zero any cached plaintext credentials
         return redirect("/")  # 🔄 Forces relogin
 
+    total_passwords = get_total_stored_passwords()
+
     return render_template("dashboard.html", username=username, total_passwords=total_passwords)  # ✅ Passes username to template
 
 
@@ -121,7 +126,10 @@ def logout():
         session_id=session.get('session_id', 'unknown')
     )
     
+    get_session_store().delete(session.get("session_id"))  # 🔒 Ends the server-side session
+    publish_session_status(session.get("session_id"))  # 🔒 Locks this session's other open tabs
     session.clear()  # 🔒 Clears user session
+    wipe_decrypted_cache()  # 🧹 Zero any cached plaintext credentials
     return redirect("/")  # ✅ Redirects back to login page
 
 # API endpoints for auto-lock features
@@ -132,13 +140,20 @@ def get_preferences():
         return {"error": "Not authenticated"}, 401
     
     username = session["user_id"]
-    preferences = get_user_preferences(username)
+    preferences = load_user_preferences(username)  # ⚡ Cached; no database work when unchanged
     
-    if preferences:
-        return preferences
-    else:
+    if not preferences:
         return {"error": "Preferences not found"}, 404
 
+    # Unchanged preferences cost a 304 with no body
+    if request.if_none_match.contains(preferences.etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(preferences.to_dict())
+    response.set_etag(preferences.etag)
+    response.headers["Cache-Control"] = "private, no-cache"  # Browser revalidates with If-None-Match
+    return response
+
 @app.route("/api/preferences", methods=["POST"])
 def update_preferences():
     """Update user preferences for auto-lock settings."""
@@ -154,11 +169,16 @@ def update_preferences():
     try:
         update_user_preferences(username, **data)
         
-        # Update session manager timeout if session_timeout changed
+        # Update this session's timeout if session_timeout changed
         if 'session_timeout' in data:
-            session_manager.update_timeout(data['session_timeout'])
+            timeout = load_user_preferences(username).session_timeout
+            get_session_store().set_timeout(session.get("session_id"), timeout)
+            publish_session_status(session.get("session_id"))
+            get_decrypted_cache().shorten_ttl(timeout)  # 🔐 Cached entries never outlive the new timeout
         
         return {"message": "Preferences updated successfully"}
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except Exception as e:
         return {"error": str(e)}, 500
 
@@ -169,11 +189,11 @@ def session_status():
         return {"active": False, "remaining_time": 0}
     
     username = session["user_id"]
-    remaining_time = session_manager.get_remaining_time()
+    state = current_session()
     
     return {
-        "active": session_manager.active,
-        "remaining_time": remaining_time,
+        "active": state is not None,
+        "remaining_time": state["remaining_time"] if state else 0,
         "username": username
     }
 
@@ -183,9 +203,56 @@ def refresh_session():
     if "user_id" not in session:
         return {"error": "Not authenticated"}, 401
     
-    session_manager.refresh_session()
+    if current_session() is None or not get_session_store().touch(session["session_id"]):
+        return {"error": "Session expired"}, 401
+    publish_session_status(session["session_id"])
     return {"message": "Session refreshed successfully"}
 
+@app.route("/api/events")
+def events():
+    """
+    Server-Sent Events stream of session and audit notifications.
+
+    Pushes 'session' (status after a refresh or timeout change),
+    'session_warning', 'session_expired' and 'audit_stats_changed' events,
+    replacing the status and stats polling of open tabs.
+
+    Events are only published within this process, so streams are refused
+    with 204 (which stops EventSource reconnecting) when the session store
+    is shared between workers; auto_lock.js then polls. Each open stream
+    holds a request thread, so serve it from a threaded server.
+    """
+    if "user_id" not in session:
+        return {"error": "Not authenticated"}, 401
+    if not events_supported():
+        return "", 204
+    state = current_session()
+    if state is None:
+        return {"error": "Session expired"}, 401
+
+    session_id = session["session_id"]
+    subscription = event_bus.subscribe([session_topic(session_id), user_topic(session["user_id"])])
+    watch_session(session_id)
+
+    def stream():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n"
+            yield format_sse("session", session_status_data(state))
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"  # Lets the server notice closed connections
+                    continue
+                yield event.to_sse()
+                if event.type == "session_expired":
+                    break
+        finally:
+            subscription.close()
+            unwatch_session(session_id)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/create_account", methods=["GET", "POST"])
 def create_account():
     if request.method == "POST":
@@ -199,26 +266,12 @@ def create_account():
             return redirect(url_for("create_account"))
 
         # ✅ Check if username already exists
-        conn = get_db_connection()  # 🔒 Correct database path
-        cursor = conn.cursor()
-        cursor.execute("SELECT username FROM master_account WHERE username = ?", (username,))
-        exists = cursor.fetchone() is not None
-
-        if exists:
-            conn.close()
+        if master_account_exists(username):
             flash("Username already taken. Please choose another one!", "error")
             return redirect(url_for("create_account"))
 
-        # ✅ Encrypt password before storing
-        encrypted_username = encrypt_data(username)
-        print(f"🔎 DEBUG: Encrypted Username → {encrypted_username}")
-        encrypted_password = encrypt_data(password)
-        print(f"🔎 DEBUG: Encrypted Password → {encrypted_password}")  # ✅ Verify encryption output
-
-        # ✅ Store new user in the database
-        cursor.execute("INSERT INTO master_account (username, password) VALUES (?, ?)", (encrypted_username, encrypted_password))
-        conn.commit()
-        conn.close()
+        # ✅ Encrypt and store new user in the database
+        create_master_account(username, password)
 
         print(f"✅ DEBUG: Stored {username} in users table")  # 🔥 Confirms successful insertion
 
@@ -239,22 +292,77 @@ def create_account():
 
 @app.route("/vault")
 def vault():
-    """Fetch stored credentials and decrypt passwords before displaying."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """Render the vault page; credentials are loaded page by page from /api/vault."""
+    if "user_id" not in session:
+        return redirect("/")
 
-    cursor.execute("SELECT website, username, password FROM credentials WHERE deleted_at IS NULL")
-    credentials = [
-        {
-            "website": row[0],
-            "username": decrypt_data(row[1]),  # ✅ Just decrypt, no encryption needed
-            "password": decrypt_data(row[2])   # ✅ Ensure plaintext display
-        }
-        for row in cursor.fetchall()
-    ]
+    return render_template("vault.html")
 
-    conn.close()
-    return render_template("vault.html", credentials=credentials)
+@app.route("/api/vault")
+def api_vault():
+    """
+    API endpoint listing stored credentials one page at a time.
+
+    Supports ?page=, ?per_page=, ?sort=website|created_at|updated_at,
+    ?order=asc|desc and ?q= (website substring). Nothing is decrypted.
+    """
+    if "user_id" not in session:
+        return {"error": "Not authenticated"}, 401
+
+    try:
+        result = get_credentials_page(
+            page=int(request.args.get('page', 1)),
+            per_page=min(max(int(request.args.get('per_page', 50)), 1), 200),
+            sort=request.args.get('sort', 'website'),
+            order=request.args.get('order', 'asc'),
+            website_filter=request.args.get('q', '').strip() or None
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    return result
+
+@app.route("/api/vault/search")
+def api_vault_search():
+    """API endpoint for ranked, paginated website search (?q=, ?page=, ?per_page=)."""
+    if "user_id" not in session:
+        return {"error": "Not authenticated"}, 401
+
+    try:
+        return search_credentials(
+            request.args.get('q', ''),
+            page=int(request.args.get('page', 1)),
+            per_page=min(max(int(request.args.get('per_page', 50)), 1), 200)
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+@app.route("/api/vault/<int:credential_id>/reveal", methods=["POST"])
+def api_vault_reveal(credential_id):
+    """API endpoint that decrypts a single credential on demand."""
+    if "user_id" not in session:
+        return {"error": "Not authenticated"}, 401
+    state = current_session()
+    if state is None:
+        return {"error": "Session expired"}, 401
+
+    # 🔐 The decrypted copy is cached no longer than this caller's session timeout
+    credential = get_credential_by_id(credential_id, cache_ttl=state["timeout"])
+    if not credential:
+        return {"error": "Credential not found"}, 404
+
+    # Log password reveal
+    log_audit_event(
+        username=session["user_id"],
+        action_type="PASSWORD_REVEALED",
+        action_description=f"Password revealed for website: {credential['website']}",
+        target_resource=credential["website"],
+        ip_address=request.remote_addr,
+        user_agent=request.headers.get('User-Agent'),
+        session_id=session.get('session_id', 'unknown')
+    )
+
+    return credential
 
 @app.route("/update_password", methods=["POST"])
 def update_password_route():
@@ -340,26 +448,21 @@ def add_password():
 def change_password():
     """Handles password change for the master account."""
     # Load the current master account credentials
-    username, stored_password = load_master_account()
-    print(f"DEBUG: Current Username: {username}, Stored Password: {stored_password}")
+    username, _ = load_master_account()
+    print(f"DEBUG: Current Username: {username}")
 
     # Retrieve new password inputs from the form
     new_password = request.form.get('new_password')
     confirm_password = request.form.get('confirm_password')
-    print(f"DEBUG: New Password: {new_password}, Confirm Password: {confirm_password}")
 
     # Validate that the new passwords match
     if new_password != confirm_password:
         flash("New passwords do not match.", "danger")
         return redirect(url_for('settings'))
 
-    # Encrypt the new password
-    encrypted_new_password = encrypt_data(new_password)
-    print(f"DEBUG: Encrypted New Password: {encrypted_new_password}")
-
     try:
-        # Update the master account password in the database
-        store_master_account(username, encrypted_new_password)
+        # Hash and store the new master account password
+        store_master_account(username, new_password)
         
         # Log password change
         log_audit_event(
@@ -469,14 +572,17 @@ def import_backup():
     try:
         # ✅ Load JSON data
         backup_data = json.load(uploaded_file)
-        print(f"DEBUG: Backup Data Loaded → {backup_data}")  # 🔎 Verify JSON structure
+        print(f"DEBUG: Backup Data Loaded → {len(backup_data)} entries")  # 🔎 Verify JSON structure
+
+        if not isinstance(backup_data, list):
+            flash("Invalid backup format: expected a list of credentials.", "danger")
+            return redirect(url_for('settings'))
 
-        # 🔥 Pass each entry directly to `store_password()`
-        imported_count = 0
-        for entry in backup_data:
-            store_password(entry["website"], entry["username"], entry["password"])
-            print(f"✅ Stored: {entry['website']} | {entry['username']} | {entry['password']}")  # Debugging output
-            imported_count += 1
+        # 🔥 Store all entries in a single transaction
+        result = store_passwords_bulk(backup_data)
+        imported_count = result["stored"]
+        failed_count = len(result["failed"])
+        print(f"✅ Stored {imported_count} entries, {failed_count} failed")  # Debugging output
 
         # Log backup import
         log_audit_event(
@@ -485,11 +591,15 @@ def import_backup():
             action_description=f"Database backup imported - {imported_count} entries",
             ip_address=request.remote_addr,
             user_agent=request.headers.get('User-Agent'),
-            additional_data=f"imported_count:{imported_count}",
+            additional_data=f"imported_count:{imported_count},failed_count:{failed_count}",
             session_id=session.get('session_id', 'unknown')
         )
 
-        flash("Backup imported successfully!", "success")
+        if failed_count:
+            skipped = ", ".join(str(f["website"] or f"entry #{f['index']}") for f in result["failed"][:5])
+            flash(f"Imported {imported_count} entries; {failed_count} could not be imported ({skipped}).", "warning")
+        else:
+            flash("Backup imported successfully!", "success")
         session.modified = True  # 🔄 Ensure flash messages persist
 
     except json.JSONDecodeError as json_err:
@@ -512,6 +622,8 @@ def analyze_password():
     password = data.get('password', '')
     
     analysis = password_analyzer.analyze_password(password)
+    # One fingerprint index lookup; the stored passwords are never decrypted
+    analysis['reused_on'] = get_websites_using_password(password, exclude_website=data.get('website'))
     return analysis
 
 @app.route('/password_stats', methods=['GET'])
@@ -521,32 +633,8 @@ def get_password_stats():
         return {"error": "Not authenticated"}, 401
         
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT password FROM credentials WHERE deleted_at IS NULL")
-        passwords = cursor.fetchall()
-        conn.close()
-        
-        if not passwords:
-            return {"total": 0, "strength_distribution": {}, "average_entropy": 0}
-        
-        # Analyze all passwords
-        strength_counts = {"Very Strong": 0, "Strong": 0, "Moderate": 0, "Weak": 0, "Very Weak": 0}
-        total_entropy = 0
-        
-        for row in passwords:
-            decrypted_password = decrypt_data(row[0])
-            analysis = password_analyzer.analyze_password(decrypted_password)
-            strength_counts[analysis['strength_level']] += 1
-            total_entropy += analysis['entropy']
-        
-        average_entropy = round(total_entropy / len(passwords), 2)
-        
-        return {
-            "total": len(passwords),
-            "strength_distribution": strength_counts,
-            "average_entropy": average_entropy
-        }
+        # Served from strength results persisted at write time; nothing is decrypted
+        return get_password_stats_summary()
         
     except Exception as e:
         print(f"Error getting password stats: {e}")
@@ -680,9 +768,27 @@ def audit_logs():
     return render_template("logging.html", logs=logs, stats=stats, 
                          current_filters={'action_type': action_type, 'days': days, 'success_only': success_only})
 
+@app.route("/api/password_reuse")
+def api_password_reuse():
+    """API endpoint for passwords reused across websites and near-duplicate passwords (nothing is decrypted)."""
+    if "user_id" not in session:
+        return {"error": "Not authenticated"}, 401
+
+    try:
+        return get_password_reuse_report()
+    except Exception as e:
+        print(f"Error getting password reuse report: {e}")
+        return {"error": "Failed to get password reuse report"}, 500
+
 @app.route("/api/audit_logs")
 def api_audit_logs():
-    """API endpoint for audit logs with filtering."""
+    """
+    API endpoint for audit logs with filtering.
+
+    Pages with opaque cursors: pass ?cursor=<next_cursor> for older entries or
+    ?cursor=<prev_cursor>&direction=prev for newer ones. ?offset= is still
+    accepted for backward compatibility.
+    """
     if "user_id" not in session:
         return {"error": "Not authenticated"}, 401
     
@@ -690,8 +796,6 @@ def api_audit_logs():
     
     # Get filter parameters
     action_type = request.args.get('action_type')
-    limit = int(request.args.get('limit', 50))
-    offset = int(request.args.get('offset', 0))
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     success_only = request.args.get('success_only')
@@ -703,17 +807,34 @@ def api_audit_logs():
     elif success_only == 'false':
         success_filter = False
     
-    logs = get_audit_logs(
-        username=username,
-        action_type=action_type,
-        limit=limit,
-        offset=offset,
-        start_date=start_date,
-        end_date=end_date,
-        success_only=success_filter
-    )
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        if 'offset' in request.args:
+            logs = get_audit_logs(
+                username=username,
+                action_type=action_type,
+                limit=limit,
+                offset=max(int(request.args['offset']), 0),
+                start_date=start_date,
+                end_date=end_date,
+                success_only=success_filter
+            )
+            return {"logs": logs}
+
+        page = get_audit_logs_page(
+            username=username,
+            action_type=action_type,
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            direction=request.args.get('direction', 'next'),
+            start_date=start_date,
+            end_date=end_date,
+            success_only=success_filter
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
     
-    return {"logs": logs}
+    return page
 
 @app.route("/api/audit_stats")
 def api_audit_stats():
@@ -727,6 +848,22 @@ def api_audit_stats():
     stats = get_audit_log_stats(username=username, days=days)
     return stats
 
+@app.route("/api/audit_writer/metrics")
+def api_audit_writer_metrics():
+    """API endpoint for audit writer queue depth and backpressure metrics."""
+    if "user_id" not in session:
+        return {"error": "Not authenticated"}, 401
+
+    return get_audit_writer_metrics()
+
+@app.route("/api/decrypted_cache/metrics")
+def api_decrypted_cache_metrics():
+    """API endpoint for decrypted credential cache hit/miss counters."""
+    if "user_id" not in session:
+        return {"error": "Not authenticated"}, 401
+
+    return get_decrypted_cache().get_metrics()
+
 @app.route("/export_audit_logs")
 def export_audit_logs_route():
     """Export audit logs as JSON file."""
@@ -0,0 +1,240 @@
+import queue
+import threading
+import time
+
+# Default tuning for the background audit writer
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 1.0  # Seconds an event may wait before being written
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_ENQUEUE_TIMEOUT = 0.25  # How long a request may block on a full queue
+DEFAULT_CRITICAL_TIMEOUT = 5.0  # How long a critical event waits for its flush
+
+# Events that are written durably before the request continues
+DEFAULT_CRITICAL_ACTIONS = frozenset({
+    "LOGIN_FAILED",
+    "PASSWORD_CHANGED",
+    "PASSWORD_CHANGE_FAILED",
+    "ACCOUNT_DELETED",
+    "ACCOUNT_DELETE_FAILED",
+})
+
+
+class _FlushRequest:
+    """Queue marker asking the writer to persist everything queued before it."""
+
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    Batches audit events in a bounded queue and writes them from one thread.
+
+    Events are flushed when a batch fills up, when the oldest queued event is
+    older than flush_interval, when a flush is requested, or at shutdown.
+    Critical events block the caller until they are on disk. When the queue is
+    full the caller blocks briefly and then writes its event synchronously, so
+    backpressure slows requests down instead of dropping audit records.
+    """
+
+    def __init__(self, write_batch, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_queue_size=DEFAULT_MAX_QUEUE_SIZE,
+                 enqueue_timeout=DEFAULT_ENQUEUE_TIMEOUT,
+                 critical_actions=DEFAULT_CRITICAL_ACTIONS,
+                 critical_timeout=DEFAULT_CRITICAL_TIMEOUT):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.critical_actions = frozenset(critical_actions)
+        self.critical_timeout = critical_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._closed = False
+
+        self.metrics = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "dropped": 0,
+            "sync_fallbacks": 0,
+            "critical_flushes": 0,
+            "blocked_seconds": 0.0,
+            "max_queue_depth": 0,
+            "last_batch_size": 0,
+            "last_flush_seconds": 0.0,
+            "flushes_by_reason": {"size": 0, "interval": 0, "requested": 0, "shutdown": 0},
+        }
+
+    def start(self):
+        """Starts the background writer thread if it is not running yet."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, event, action_type=None, durable=None):
+        """
+        Queues one event (a tuple of column values) for writing.
+
+        Args:
+            event: Row values passed through unchanged to write_batch
+            action_type: Used to decide whether the event is critical
+            durable: Force (True) or skip (False) waiting for the write;
+                None means "durable if action_type is critical"
+        """
+        if durable is None:
+            durable = action_type in self.critical_actions
+
+        if self._closed:
+            self._write_now([event])
+            return
+
+        self.start()
+        start = time.monotonic()
+        try:
+            self._queue.put(event, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Backpressure: the writer can't keep up, so write on the caller's thread
+            with self._metrics_lock:
+                self.metrics["sync_fallbacks"] += 1
+                self.metrics["blocked_seconds"] += time.monotonic() - start
+            self._write_now([event])
+            return
+
+        with self._metrics_lock:
+            self.metrics["enqueued"] += 1
+            self.metrics["blocked_seconds"] += time.monotonic() - start
+            depth = self._queue.qsize()
+            if depth > self.metrics["max_queue_depth"]:
+                self.metrics["max_queue_depth"] = depth
+
+        if durable:
+            with self._metrics_lock:
+                self.metrics["critical_flushes"] += 1
+            self.flush(timeout=self.critical_timeout)
+
+    def flush(self, timeout=None):
+        """
+        Blocks until every event queued before this call has been written.
+
+        Returns False if that did not happen within timeout, including when
+        the queue stayed too full to take the flush request.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        request = _FlushRequest()
+        start = time.monotonic()
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return False
+        if timeout is not None:
+            timeout = max(0.0, timeout - (time.monotonic() - start))
+        return request.done.wait(timeout)
+
+    def shutdown(self, timeout=5.0):
+        """
+        Writes any pending events and stops the writer thread.
+
+        Waits at most timeout seconds in total, even when the queue stays too
+        full to take the stop request; returns whether the thread stopped.
+        """
+        self._closed = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return True
+        start = time.monotonic()
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print(f"⚠️ Audit log queue still full after {timeout}s; pending events may be lost at exit")
+        if timeout is not None:
+            timeout = max(0.0, timeout - (time.monotonic() - start))
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def get_metrics(self):
+        """Returns a snapshot of the writer's counters and queue depth."""
+        with self._metrics_lock:
+            snapshot = dict(self.metrics)
+            snapshot["flushes_by_reason"] = dict(self.metrics["flushes_by_reason"])
+        snapshot["queue_depth"] = self._queue.qsize()
+        snapshot["queue_capacity"] = self._queue.maxsize
+        snapshot["running"] = self._thread is not None and self._thread.is_alive()
+        return snapshot
+
+    def _write_now(self, batch, reason=None):
+        """Writes a batch, recording metrics; a failing batch is retried once."""
+        start = time.monotonic()
+        for attempt in range(2):
+            try:
+                self.write_batch(batch)
+                break
+            except Exception as e:
+                print(f"Error writing audit log batch (attempt {attempt + 1}): {e}")
+        else:
+            with self._metrics_lock:
+                self.metrics["failed_batches"] += 1
+                self.metrics["dropped"] += len(batch)
+            return
+
+        with self._metrics_lock:
+            self.metrics["written"] += len(batch)
+            self.metrics["batches"] += 1
+            self.metrics["last_batch_size"] = len(batch)
+            self.metrics["last_flush_seconds"] = time.monotonic() - start
+            if reason:
+                self.metrics["flushes_by_reason"][reason] += 1
+
+    def _run(self):
+        """Writer loop: collects events into batches and writes them."""
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is None:
+                # The oldest event has waited flush_interval seconds
+                if batch:
+                    self._write_now(batch, "interval")
+                batch, deadline = [], None
+                continue
+
+            if item is _STOP:
+                if batch:
+                    self._write_now(batch, "shutdown")
+                return
+
+            if isinstance(item, _FlushRequest):
+                if batch:
+                    self._write_now(batch, "requested")
+                batch, deadline = [], None
+                item.done.set()
+                continue
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size:
+                self._write_now(batch, "size")
+                batch, deadline = [], None
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for PasswordStrengthAnalyzer.analyze_password.
+
+Compares the single-pass feature extraction against the previous
+implementation, which re-ran uncompiled regexes in every scorer, and checks
+that both produce identical results. Also times the batch analyze_many API
+and the pattern-aware analysis the web UI runs on every keystroke.
+
+    python bench_password_strength.py --iterations 20000
+"""
+
+import argparse
+import math
+import random
+import re
+import string
+import time
+
+import password_strength
+from password_strength import PasswordStrengthAnalyzer
+
+SAMPLE_PASSWORDS = [
+    "password123",
+    "Tr0ub4dor&3",
+    "correct horse battery staple",
+    "aaaa1111",
+    "qwertyASDFGH!!",
+    "X9$kLm#2vQ!pR7zW",
+    "abc",
+    "٣٤٥ digits",
+    "a\n\n\n\nb",
+]
+
+
+class LegacyPasswordStrengthAnalyzer(PasswordStrengthAnalyzer):
+    """The regex-per-scorer implementation, kept here only for comparison."""
+
+    SYMBOLS_RE = r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]'
+    COMMON_RE = r'(123|abc|qwe|asd|password|123456)'
+
+    def analyze_password(self, password):
+        if not password:
+            return self._empty_analysis()
+        strength_score = self._legacy_score(password)
+        issues = self._legacy_issues(password)
+        return {
+            'password': password,
+            'length': len(password),
+            'entropy': self._legacy_entropy(password),
+            'strength_score': strength_score,
+            'strength_level': self._get_strength_level(strength_score),
+            'issues': issues,
+            'suggestions': self._legacy_suggestions(password, issues),
+            'character_sets': {
+                'lowercase': bool(re.search(r'[a-z]', password)),
+                'uppercase': bool(re.search(r'[A-Z]', password)),
+                'digits': bool(re.search(r'\d', password)),
+                'symbols': bool(re.search(self.SYMBOLS_RE, password))
+            },
+            'common_patterns': self._legacy_patterns(password)
+        }
+
+    def _legacy_entropy(self, password):
+        charset_size = 0
+        if re.search(r'[a-z]', password):
+            charset_size += self.LOWERCASE
+        if re.search(r'[A-Z]', password):
+            charset_size += self.UPPERCASE
+        if re.search(r'\d', password):
+            charset_size += self.DIGITS
+        if re.search(self.SYMBOLS_RE, password):
+            charset_size += self.SYMBOLS
+        if charset_size == 0:
+            charset_size = 95
+        return round(math.log2(charset_size ** len(password)), 2)
+
+    def _legacy_score(self, password):
+        score = 0
+        if len(password) >= 8:
+            score += min(25, len(password) * 2)
+        if re.search(r'[a-z]', password):
+            score += 8
+        if re.search(r'[A-Z]', password):
+            score += 8
+        if re.search(r'\d', password):
+            score += 8
+        if re.search(self.SYMBOLS_RE, password):
+            score += 16
+        if len(set(password)) > len(password) * 0.7:
+            score += 10
+        if not re.search(r'(.)\1{2,}', password):
+            score += 10
+        if re.search(r'(.)\1{3,}', password):
+            score -= 15
+        if re.search(self.COMMON_RE, password.lower()):
+            score -= 20
+        if len(password) < 6:
+            score -= 10
+        return max(0, min(100, score))
+
+    def _legacy_issues(self, password):
+        issues = []
+        if len(password) < 8:
+            issues.append("Too short (minimum 8 characters recommended)")
+        if not re.search(r'[a-z]', password):
+            issues.append("Missing lowercase letters")
+        if not re.search(r'[A-Z]', password):
+            issues.append("Missing uppercase letters")
+        if not re.search(r'\d', password):
+            issues.append("Missing numbers")
+        if not re.search(self.SYMBOLS_RE, password):
+            issues.append("Missing special characters")
+        if re.search(r'(.)\1{3,}', password):
+            issues.append("Too many repeated characters")
+        if re.search(self.COMMON_RE, password.lower()):
+            issues.append("Contains common patterns")
+        if len(set(password)) < len(password) * 0.5:
+            issues.append("Low character variety")
+        return issues
+
+    def _legacy_suggestions(self, password, issues):
+        suggestions = []
+        if len(password) < 8:
+            suggestions.append("Increase length to at least 8 characters")
+        if not re.search(r'[a-z]', password):
+            suggestions.append("Add lowercase letters (a-z)")
+        if not re.search(r'[A-Z]', password):
+            suggestions.append("Add uppercase letters (A-Z)")
+        if not re.search(r'\d', password):
+            suggestions.append("Add numbers (0-9)")
+        if not re.search(self.SYMBOLS_RE, password):
+            suggestions.append("Add special characters (!@#$%^&*)")
+        if re.search(r'(.)\1{3,}', password):
+            suggestions.append("Avoid repeating characters more than twice")
+        if re.search(self.COMMON_RE, password.lower()):
+            suggestions.append("Avoid common patterns and sequences")
+        if len(set(password)) < len(password) * 0.5:
+            suggestions.append("Use more diverse characters")
+        if len(password) < 12:
+            suggestions.append("Consider using 12+ characters for maximum security")
+        suggestions.append("Use a mix of random words, numbers, and symbols")
+        suggestions.append("Avoid personal information (names, birthdays, etc.)")
+        return suggestions
+
+    def _legacy_patterns(self, password):
+        patterns = []
+        for seq in ['123', 'abc', 'qwe', 'asd', 'password', '123456', 'qwerty']:
+            if seq in password.lower():
+                patterns.append(f"Contains '{seq}' sequence")
+        if re.search(r'(.)\1{3,}', password):
+            patterns.append("Repeated characters")
+        for pattern in ['qwerty', 'asdfgh', 'zxcvbn']:
+            if pattern in password.lower():
+                patterns.append("Keyboard pattern detected")
+        return patterns
+
+
+def random_passwords(count, seed=1234):
+    """Mixed-length passwords drawn from letters, digits, symbols and repeats."""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*()_+-=[]{}|;:,.<>?~ "
+    passwords = list(SAMPLE_PASSWORDS)
+    while len(passwords) < count:
+        length = rng.choice((4, 8, 12, 16, 24))
+        password = "".join(rng.choice(alphabet) for _ in range(length))
+        if rng.random() < 0.2:
+            password += rng.choice(("123", "aaaa", "Password", "qwerty"))
+        passwords.append(password)
+    return passwords
+
+
+def check_identical(passwords):
+    """Raises AssertionError if the two implementations disagree on any password."""
+    current = PasswordStrengthAnalyzer()
+    legacy = LegacyPasswordStrengthAnalyzer()
+    for password in passwords:
+        expected = legacy.analyze_password(password)
+        actual = current.analyze_password(password)
+        assert actual == expected, f"Results differ for {password!r}:\n{expected}\n{actual}"
+
+
+def time_per_call(analyzer, passwords, iterations):
+    """Returns the mean microseconds per analyze_password call."""
+    start = time.perf_counter()
+    done = 0
+    while done < iterations:
+        for password in passwords:
+            analyzer.analyze_password(password)
+        done += len(passwords)
+    return (time.perf_counter() - start) / done * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyze_password before and after feature extraction")
+    parser.add_argument("--iterations", type=int, default=20000, help="Calls per implementation (default: 20000)")
+    args = parser.parse_args()
+
+    passwords = random_passwords(500)
+    check_identical(passwords)
+    print(f"✅ Both implementations agree on {len(passwords)} passwords")
+
+    legacy_us = time_per_call(LegacyPasswordStrengthAnalyzer(), passwords, args.iterations)
+    current_us = time_per_call(PasswordStrengthAnalyzer(), passwords, args.iterations)
+    print(f"📊 Legacy (regex per scorer): {legacy_us:8.2f} µs/call")
+    print(f"📊 Single-pass features:      {current_us:8.2f} µs/call")
+    print(f"⚡ Speedup: {legacy_us / current_us:.2f}x")
+
+    pattern_us = time_per_call(PasswordStrengthAnalyzer(pattern_entropy=True), passwords, args.iterations // 10)
+    print(f"📊 With pattern matching:     {pattern_us:8.2f} µs/call")
+
+    batch = passwords * max(1, args.iterations // len(passwords))
+    start = time.perf_counter()
+    PasswordStrengthAnalyzer().analyze_many(batch)
+    batch_us = (time.perf_counter() - start) / len(batch) * 1e6
+    backend = "NumPy" if password_strength.np is not None else "pure Python"
+    print(f"📊 analyze_many ({backend}):  {batch_us:8.2f} µs/password")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Shared pytest fixtures.
+
+Test scripts that also run standalone (python test_x.py) use
+temporary_database() directly in their __main__ block.
+"""
+
+import contextlib
+import os
+import tempfile
+
+import pytest
+
+import database
+
+
+@contextlib.contextmanager
+def temporary_database(name="test.db"):
+    """Points the database module at a fresh, initialised throwaway database until the block exits."""
+    previous = database.DATABASE_FILE
+    database.DATABASE_FILE = os.path.join(tempfile.mkdtemp(), name)
+    database.invalidate_user_preferences()
+    database.init_db()
+    try:
+        yield database.DATABASE_FILE
+    finally:
+        database.invalidate_user_preferences()
+        database.close_connection_pool()
+        database.DATABASE_FILE = previous
+
+
+@pytest.fixture(scope="module")
+def temp_db():
+    """A throwaway database shared by the tests of one module; yields its path."""
+    with temporary_database() as path:
+        yield path
@@ -0,0 +1,244 @@
+import queue
+import sqlite3
+import threading
+import time
+
+# Default pool settings, tuned for a small local SQLite file
+DEFAULT_POOL_SIZE = 8
+DEFAULT_ACQUIRE_TIMEOUT = 10.0
+DEFAULT_MAX_LIFETIME = 3600  # Recycle connections after an hour
+DEFAULT_MAX_USES = 10000  # ...or after this many checkouts
+DEFAULT_HEALTH_CHECK_INTERVAL = 30  # Ping connections idle for longer than this
+
+# Pragmas applied once per physical connection
+DEFAULT_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("foreign_keys", "ON"),
+    ("busy_timeout", 5000),
+    ("cache_size", -16000),  # Negative value = size in KiB (~16 MB page cache)
+    ("mmap_size", 268435456),  # 256 MB memory-mapped I/O
+    ("temp_store", "MEMORY"),
+)
+
+
+class PoolExhaustedError(sqlite3.OperationalError):
+    """Raised when no pooled connection became available in time."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled sqlite3 connection.
+
+    Behaves like a regular sqlite3.Connection, except that close() hands the
+    connection back to its pool instead of closing it. Used as a context
+    manager it commits on success, rolls back on error and then releases.
+    """
+
+    def __init__(self, pool, raw_conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", raw_conn)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a released connection.")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        # Forward attributes such as row_factory to the underlying connection
+        setattr(self._conn, name, value)
+
+    def close(self):
+        """Returns the connection to the pool."""
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            return
+        object.__setattr__(self, "_conn", None)
+        self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is not None:
+            if exc_type is None:
+                conn.commit()
+            else:
+                conn.rollback()
+        self.close()
+        return False
+
+    def __del__(self):
+        # Safety net for callers that forget to close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class _PoolEntry:
+    """Bookkeeping for one physical connection."""
+
+    __slots__ = ("conn", "created_at", "last_used", "uses")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.uses = 0
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived, pre-configured SQLite connections."""
+
+    def __init__(self, database_file, max_size=DEFAULT_POOL_SIZE,
+                 acquire_timeout=DEFAULT_ACQUIRE_TIMEOUT,
+                 max_lifetime=DEFAULT_MAX_LIFETIME, max_uses=DEFAULT_MAX_USES,
+                 health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+                 pragmas=DEFAULT_PRAGMAS):
+        self.database_file = database_file
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_lifetime = max_lifetime
+        self.max_uses = max_uses
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas
+
+        # LIFO so the most recently used (warmest) connection is reused first
+        self._idle = queue.LifoQueue()
+        self._entries = {}  # id(conn) -> _PoolEntry for every open connection
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+        self.stats = {
+            "created": 0,
+            "recycled": 0,
+            "health_check_failures": 0,
+            "checkouts": 0,
+            "waits": 0,
+        }
+
+    def _create_connection(self):
+        """Opens a new physical connection and applies the pragmas once."""
+        conn = sqlite3.connect(self.database_file, check_same_thread=False)
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        entry = _PoolEntry(conn)
+        with self._lock:
+            self._entries[id(conn)] = entry
+            self.stats["created"] += 1
+        return entry
+
+    def _discard(self, entry):
+        """Closes a physical connection and forgets about it."""
+        with self._lock:
+            self._entries.pop(id(entry.conn), None)
+        try:
+            entry.conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _is_healthy(self, entry):
+        """Checks whether an idle connection should be reused."""
+        now = time.monotonic()
+        if self.max_lifetime and now - entry.created_at >= self.max_lifetime:
+            return False
+        if self.max_uses and entry.uses >= self.max_uses:
+            return False
+        if now - entry.last_used >= self.health_check_interval:
+            try:
+                entry.conn.execute("SELECT 1").fetchone()
+            except sqlite3.Error:
+                with self._lock:
+                    self.stats["health_check_failures"] += 1
+                return False
+        return True
+
+    def acquire(self):
+        """Checks out a connection, blocking until one is available."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed.")
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.acquire_timeout):
+                raise PoolExhaustedError(
+                    f"No database connection available after {self.acquire_timeout}s"
+                )
+
+        try:
+            entry = None
+            while entry is None:
+                try:
+                    candidate = self._entries.get(id(self._idle.get_nowait()))
+                except queue.Empty:
+                    entry = self._create_connection()
+                    break
+                if candidate is None:
+                    continue
+                if self._is_healthy(candidate):
+                    entry = candidate
+                else:
+                    with self._lock:
+                        self.stats["recycled"] += 1
+                    self._discard(candidate)
+
+            entry.uses += 1
+            entry.last_used = time.monotonic()
+            with self._lock:
+                self.stats["checkouts"] += 1
+            return PooledConnection(self, entry.conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        """Returns a connection to the pool, resetting per-checkout state."""
+        entry = self._entries.get(id(conn))
+        try:
+            if entry is None:
+                conn.close()
+                return
+
+            try:
+                # Never hand out a connection with a half-finished transaction
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.row_factory = None
+            except sqlite3.Error:
+                self._discard(entry)
+                return
+
+            entry.last_used = time.monotonic()
+            if self._closed:
+                self._discard(entry)
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Closes every idle connection; checked-out ones close on release."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            entry = self._entries.get(id(conn))
+            if entry:
+                self._discard(entry)
+
+    def get_stats(self):
+        """Returns a snapshot of pool counters."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["open"] = len(self._entries)
+        stats["idle"] = self._idle.qsize()
+        stats["max_size"] = self.max_size
+        return stats
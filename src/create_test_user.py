@@ -1,10 +1,11 @@
 import sqlite3
 from encryption import encrypt_data, decrypt_data
-from database import DATABASE_FILE
+from database import DATABASE_FILE, init_db, create_master_account, master_account_exists, verify_master_account
 
 def create_test_user():
     print("=== Create Test User ===")
     print(f"🗄️ Using database: {DATABASE_FILE}")
+    init_db()  # Ensure the username_index column exists
     
     # Connect to database
     conn = sqlite3.connect(DATABASE_FILE)
@@ -21,8 +22,7 @@ def create_test_user():
         for i, user in enumerate(existing_users, 1):
             try:
                 decrypted_username = decrypt_data(user[0])
-                decrypted_password = decrypt_data(user[1])
-                print(f"  {i}. Username: {decrypted_username}, Password: {decrypted_password}")
+                print(f"  {i}. Username: {decrypted_username}, Password hash: {user[1][:24]}...")
             except Exception as e:
                 print(f"  {i}. Encrypted data (decryption failed): {user[0][:20]}...")
     
@@ -32,17 +32,11 @@ def create_test_user():
     test_password = "testpass123"
     
     # Check if user already exists
-    cursor.execute("SELECT * FROM master_account WHERE username = ?", (encrypt_data(test_username),))
-    if cursor.fetchone():
+    if master_account_exists(test_username):
         print(f"❌ User '{test_username}' already exists")
     else:
         # Create new user
-        encrypted_username = encrypt_data(test_username)
-        encrypted_password = encrypt_data(test_password)
-        
-        cursor.execute("INSERT INTO master_account (username, password) VALUES (?, ?)", 
-                      (encrypted_username, encrypted_password))
-        conn.commit()
+        create_master_account(test_username, test_password)
         
         print(f"✅ Created test user:")
         print(f"   Username: {test_username}")
@@ -57,31 +51,14 @@ def test_login():
     test_username = "testuser"
     test_password = "testpass123"
     
-    # Connect to database
-    conn = sqlite3.connect("../data/passwords.db")
-    cursor = conn.cursor()
-    
-    # Get all users
-    cursor.execute("SELECT * FROM master_account")
-    users = cursor.fetchall()
-    
-    # Try to find matching user
-    for user in users:
-        try:
-            decrypted_username = decrypt_data(user[0])
-            decrypted_password = decrypt_data(user[1])
-            
-            if decrypted_username == test_username and decrypted_password == test_password:
-                print("✅ Login test successful!")
-                print(f"   Username: {decrypted_username}")
-                print(f"   Password: {decrypted_password}")
-                conn.close()
-                return True
-        except Exception as e:
-            print(f"❌ Decryption error: {e}")
+    # Look the user up through the blind index and verify the password
+    if verify_master_account(test_username, test_password):
+        print("✅ Login test successful!")
+        print(f"   Username: {test_username}")
+        print(f"   Password: {test_password}")
+        return True
     
     print("❌ Login test failed - no matching user found")
-    conn.close()
     return False
 
 if __name__ == "__main__":
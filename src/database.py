@@ -1,9 +1,30 @@
+import atexit
+import base64
+import binascii
+import copy
+import hashlib
+import hmac
+import itertools
 import sqlite3
 import os
 import sys
-from encryption import encrypt_data, decrypt_data
+import threading
+import time
+from encryption import (encrypt_data, decrypt_data, encrypt_many, decrypt_many, blind_index, blind_indexes,
+                        is_legacy_ciphertext, refresh_keys)
+from connection_pool import ConnectionPool
+from audit_writer import AuditLogWriter
+from event_bus import event_bus, user_topic
+from decrypted_cache import get_decrypted_cache
+from password_hashing import PasswordHasher, get_password_hasher, hash_password
+from password_strength import PasswordStrengthAnalyzer
+from breach_filter import get_breach_filter
+from password_reuse import (BAND_BYTES, NEAR_DUPLICATE_THRESHOLD, NUM_BANDS, near_duplicate_index_enabled,
+                            password_fingerprint, reuse_columns, signature_similarity)
 import json
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
 
 def get_app_data_dir():
     """Get the appropriate data directory for the application."""
@@ -31,26 +52,65 @@ def get_app_data_dir():
 DATA_DIR = get_app_data_dir()
 DATABASE_FILE = os.path.join(DATA_DIR, "passwords.db")
 
+# Shared connection pool (created lazily, rebuilt if DATABASE_FILE changes)
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Returns the shared connection pool for the canonical database path."""
+    global _pool
+    pool = _pool
+    if pool is None or pool.database_file != DATABASE_FILE:
+        with _pool_lock:
+            if _pool is None or _pool.database_file != DATABASE_FILE:
+                if _pool is not None:
+                    _pool.close()
+                _pool = ConnectionPool(DATABASE_FILE)
+            pool = _pool
+    return pool
+
+def get_connection():
+    """Checks out a pooled connection; calling close() returns it to the pool."""
+    return get_connection_pool().acquire()
+
+def close_connection_pool():
+    """Closes all pooled connections (called automatically at interpreter exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+atexit.register(close_connection_pool)
+
 def init_db():
     """Initializes the password storage database."""
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS credentials (
                 id INTEGER PRIMARY KEY,
                 website TEXT UNIQUE NOT NULL,
-                username TEXT NOT NULL,
-                password TEXT NOT NULL,
+                username BLOB NOT NULL,
+                password BLOB NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                deleted_at TIMESTAMP
+                deleted_at TIMESTAMP,
+                version INTEGER NOT NULL DEFAULT 0,
+                strength_score INTEGER,
+                strength_level TEXT,
+                entropy REAL,
+                breached INTEGER,
+                password_fingerprint TEXT,
+                password_minhash BLOB
             )
         """)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS master_account (
-                username TEXT NOT NULL,
-                password TEXT NOT NULL
+                username BLOB NOT NULL,
+                password TEXT NOT NULL,
+                username_index TEXT
             )
         """)
         cursor.execute("""
@@ -81,9 +141,51 @@ def init_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Per-user, per-day, per-action counters maintained as audit events are written
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS audit_stats_daily (
+                username TEXT NOT NULL,
+                day TEXT NOT NULL,
+                action_type TEXT NOT NULL,
+                success INTEGER NOT NULL,
+                event_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (username, day, action_type, success)
+            ) WITHOUT ROWID
+        """)
+        # Server-side web sessions shared by all worker processes; see session_store.py
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                timeout INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_activity REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
+        # Checkpoint of the current (or last) encryption key rotation; see key_rotation.py
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS key_rotation_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                target_key_id TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                rows_rotated INTEGER NOT NULL DEFAULT 0,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP
+            )
+        """)
         
         # Run migrations to add new columns to existing tables
         run_migrations(cursor)
+
+        # Full-text website search index (needs FTS5; search falls back to LIKE without it)
+        init_search_index(cursor)
+
+        # LSH bands of password MinHash signatures for near-duplicate detection
+        init_reuse_index(cursor)
         
         conn.commit()
     except sqlite3.Error as e:
@@ -93,6 +195,21 @@ def init_db():
         if 'conn' in locals() and conn:
             conn.close()
 
+def _decrypt_rows_with_fallback(rows):
+    """Decrypt (id, encrypted_password) rows in one batch; returns (id, password) for the rows that decrypt."""
+    try:
+        plaintexts = decrypt_many(encrypted_password for _, encrypted_password in rows)
+    except Exception:
+        # Fall back to row by row so one bad token doesn't block the rest
+        plaintexts = []
+        for credential_id, encrypted_password in rows:
+            try:
+                plaintexts.append(decrypt_data(encrypted_password))
+            except Exception as e:
+                print(f"⚠️ Skipping credential row {credential_id}: {e}")
+                plaintexts.append(None)
+    return [(row[0], password) for row, password in zip(rows, plaintexts) if password is not None]
+
 def run_migrations(cursor):
     """Run database migrations to update schema."""
     try:
@@ -109,6 +226,31 @@ def run_migrations(cursor):
             )
             print("✅ Migration completed: lock_on_window_blur column added")
 
+        # Migrate master_account: add the username blind index and backfill it
+        cursor.execute("PRAGMA table_info(master_account)")
+        ma_columns = [column[1] for column in cursor.fetchall()]
+        if 'username_index' not in ma_columns:
+            print("🔧 Adding username_index column to master_account table...")
+            cursor.execute("ALTER TABLE master_account ADD COLUMN username_index TEXT")
+        cursor.execute("SELECT rowid, username FROM master_account WHERE username_index IS NULL")
+        pending = cursor.fetchall()
+        if pending:
+            print(f"🔧 Backfilling username_index for {len(pending)} master account(s)...")
+            for rowid, encrypted_username in pending:
+                try:
+                    index_value = blind_index(decrypt_data(encrypted_username))
+                except Exception as e:
+                    print(f"⚠️ Skipping master account row {rowid}: {e}")
+                    continue
+                cursor.execute(
+                    "UPDATE master_account SET username_index = ? WHERE rowid = ?",
+                    (index_value, rowid)
+                )
+            print("✅ Migration completed: username_index backfilled")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_master_account_username_index ON master_account(username_index)"
+        )
+
         # Migrate credentials: add timestamps and soft-delete if missing
         cursor.execute("PRAGMA table_info(credentials)")
         cred_columns = [column[1] for column in cursor.fetchall()]
@@ -122,6 +264,67 @@ def run_migrations(cursor):
             print("🔧 Adding deleted_at to credentials (for soft deletes)...")
             cursor.execute("ALTER TABLE credentials ADD COLUMN deleted_at TIMESTAMP")
 
+        # Migrate credentials: a row version bumped on every write, so the decrypted cache sees
+        # changes made by any process (updated_at only has one-second resolution)
+        if 'version' not in cred_columns:
+            print("🔧 Adding version to credentials...")
+            cursor.execute("ALTER TABLE credentials ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS credentials_version
+            AFTER UPDATE OF website, username, password, deleted_at ON credentials
+            BEGIN
+                UPDATE credentials SET version = old.version + 1 WHERE id = new.id;
+            END
+        """)
+
+        # Migrate credentials: persist per-credential strength results and backfill them
+        for column, column_type in (("strength_score", "INTEGER"), ("strength_level", "TEXT"), ("entropy", "REAL"),
+                                    ("breached", "INTEGER")):
+            if column not in cred_columns:
+                print(f"🔧 Adding {column} to credentials...")
+                cursor.execute(f"ALTER TABLE credentials ADD COLUMN {column} {column_type}")
+        if _strength_analyzer.breach_filter is not None:
+            # Also check rows stored before a breached-password filter was available
+            cursor.execute("SELECT id, password FROM credentials WHERE strength_level IS NULL OR breached IS NULL")
+        else:
+            cursor.execute("SELECT id, password FROM credentials WHERE strength_level IS NULL")
+        pending = cursor.fetchall()
+        if pending:
+            print(f"🔧 Scoring password strength for {len(pending)} credential(s)...")
+            decrypted = _decrypt_rows_with_fallback(pending)
+            strengths = _strength_analyzer.analyze_many(password for _, password in decrypted).rows()
+            scored = [(*strength, credential_id) for (credential_id, _), strength in zip(decrypted, strengths)]
+            cursor.executemany(
+                "UPDATE credentials SET strength_score = ?, strength_level = ?, entropy = ?, breached = ? WHERE id = ?",
+                scored
+            )
+            invalidate_password_stats()
+            print("✅ Migration completed: password strength backfilled")
+
+        # Migrate credentials: keyed fingerprints (and MinHash signatures) for reuse detection
+        for column, column_type in (("password_fingerprint", "TEXT"), ("password_minhash", "BLOB")):
+            if column not in cred_columns:
+                print(f"🔧 Adding {column} to credentials...")
+                cursor.execute(f"ALTER TABLE credentials ADD COLUMN {column} {column_type}")
+        if near_duplicate_index_enabled():
+            cursor.execute("SELECT id, password FROM credentials WHERE password_fingerprint IS NULL OR password_minhash IS NULL")
+        else:
+            # Don't keep similarity data around once the near-duplicate index is turned off
+            cursor.execute("UPDATE credentials SET password_minhash = NULL WHERE password_minhash IS NOT NULL")
+            cursor.execute("SELECT id, password FROM credentials WHERE password_fingerprint IS NULL")
+        pending = cursor.fetchall()
+        if pending:
+            print(f"🔧 Fingerprinting passwords of {len(pending)} credential(s) for reuse detection...")
+            fingerprinted = [
+                (*reuse_columns(password), credential_id)
+                for credential_id, password in _decrypt_rows_with_fallback(pending)
+            ]
+            cursor.executemany(
+                "UPDATE credentials SET password_fingerprint = ?, password_minhash = ? WHERE id = ?",
+                fingerprinted
+            )
+            print("✅ Migration completed: password fingerprints backfilled")
+
         # Indexes for better performance
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_credentials_website ON credentials(website)"
@@ -133,6 +336,11 @@ def run_migrations(cursor):
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_credentials_website_active ON credentials(website) WHERE deleted_at IS NULL"
         )
+        # Exact password reuse: active credentials grouped by fingerprint
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_credentials_password_fingerprint "
+            "ON credentials(password_fingerprint) WHERE deleted_at IS NULL"
+        )
         
         # Audit logs indexes for better performance
         cursor.execute(
@@ -147,28 +355,251 @@ def run_migrations(cursor):
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_audit_logs_success ON audit_logs(success)"
         )
+        # Backs keyset pagination: WHERE username = ? ORDER BY created_at, id
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_logs_user_created_id ON audit_logs(username, created_at, id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_stats_daily_day ON audit_stats_daily(day)"
+        )
+
+        # Backfill the audit statistics rollup from existing audit logs
+        cursor.execute("SELECT 1 FROM audit_stats_daily LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute("SELECT 1 FROM audit_logs LIMIT 1")
+            if cursor.fetchone() is not None:
+                print("🔧 Building audit_stats_daily rollup from audit_logs...")
+                cursor.execute("""
+                    INSERT INTO audit_stats_daily (username, day, action_type, success, event_count)
+                    SELECT username, date(created_at), action_type, COALESCE(success, 1), COUNT(*)
+                    FROM audit_logs
+                    GROUP BY username, date(created_at), action_type, COALESCE(success, 1)
+                """)
+                print("✅ Migration completed: audit_stats_daily backfilled")
         
     except sqlite3.Error as e:
         print(f"⚠️ Migration error: {e}")
         # Continue execution even if migration fails
 
-def get_connection():
-    """Establishes connection to the database using the canonical path."""
-    return sqlite3.connect(DATABASE_FILE)
+def init_search_index(cursor):
+    """
+    Creates the credentials_fts trigram index over credentials.website.
+
+    The index is an external-content FTS5 table holding only active rows; it
+    is kept in sync by triggers on insert, update (including soft delete and
+    restore) and delete, and backfilled once when first created.
+    """
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'credentials_fts'")
+        exists = cursor.fetchone() is not None
+
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS credentials_fts USING fts5(
+                website,
+                content = 'credentials',
+                content_rowid = 'id',
+                tokenize = 'trigram'
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS credentials_fts_insert AFTER INSERT ON credentials
+            WHEN new.deleted_at IS NULL
+            BEGIN
+                INSERT INTO credentials_fts (rowid, website) VALUES (new.id, new.website);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS credentials_fts_update AFTER UPDATE OF website, deleted_at ON credentials
+            BEGIN
+                INSERT INTO credentials_fts (credentials_fts, rowid, website)
+                SELECT 'delete', old.id, old.website WHERE old.deleted_at IS NULL;
+                INSERT INTO credentials_fts (rowid, website)
+                SELECT new.id, new.website WHERE new.deleted_at IS NULL;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS credentials_fts_delete AFTER DELETE ON credentials
+            WHEN old.deleted_at IS NULL
+            BEGIN
+                INSERT INTO credentials_fts (credentials_fts, rowid, website) VALUES ('delete', old.id, old.website);
+            END
+        """)
+
+        if not exists:
+            print("🔧 Building credentials_fts search index...")
+            cursor.execute("""
+                INSERT INTO credentials_fts (rowid, website)
+                SELECT id, website FROM credentials WHERE deleted_at IS NULL
+            """)
+            print("✅ Migration completed: credentials_fts search index built")
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Website search index unavailable (FTS5 trigram support missing?): {e}")
+
+def init_reuse_index(cursor):
+    """
+    Creates the password_lsh_bands table used to find near-duplicate passwords.
+
+    Each distinct active password (by fingerprint) gets NUM_BANDS rows, one
+    per band of its MinHash signature, so two passwords that agree on every
+    value of any band share a (band, bucket) key and become candidates.
+    Triggers slice the signature into bands on insert, update (including
+    soft delete and restore) and delete; a fingerprint's bands are removed
+    once no active credential uses it. Built once from existing rows.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'password_lsh_bands'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS password_lsh_bands (
+            band INTEGER NOT NULL,
+            bucket BLOB NOT NULL,
+            fingerprint TEXT NOT NULL,
+            PRIMARY KEY (band, bucket, fingerprint)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_password_lsh_bands_fingerprint ON password_lsh_bands(fingerprint)")
+
+    band_numbers = ", ".join(f"({band})" for band in range(NUM_BANDS))
+    add_bands = f"""
+        INSERT OR IGNORE INTO password_lsh_bands (band, bucket, fingerprint)
+        SELECT column1, substr(new.password_minhash, column1 * {BAND_BYTES} + 1, {BAND_BYTES}), new.password_fingerprint
+        FROM (VALUES {band_numbers})
+        WHERE new.deleted_at IS NULL AND new.password_minhash IS NOT NULL;
+    """
+    remove_unused_bands = """
+        DELETE FROM password_lsh_bands
+        WHERE fingerprint = old.password_fingerprint AND NOT EXISTS (
+            SELECT 1 FROM credentials
+            WHERE password_fingerprint = old.password_fingerprint
+              AND deleted_at IS NULL AND password_minhash IS NOT NULL
+        );
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS password_lsh_bands_insert AFTER INSERT ON credentials
+        BEGIN
+            {add_bands}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS password_lsh_bands_update
+        AFTER UPDATE OF password_fingerprint, password_minhash, deleted_at ON credentials
+        BEGIN
+            {remove_unused_bands}
+            {add_bands}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS password_lsh_bands_delete AFTER DELETE ON credentials
+        BEGIN
+            {remove_unused_bands}
+        END
+    """)
+
+    if not exists:
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO password_lsh_bands (band, bucket, fingerprint)
+            SELECT bands.column1, substr(password_minhash, bands.column1 * {BAND_BYTES} + 1, {BAND_BYTES}),
+                   password_fingerprint
+            FROM credentials, (VALUES {band_numbers}) AS bands
+            WHERE deleted_at IS NULL AND password_minhash IS NOT NULL
+        """)
+
+def _find_master_accounts(cursor, username):
+    """Returns (rowid, password) rows whose blind index matches username."""
+    while True:
+        # During a key rotation rows may still be indexed under an older key
+        indexes = blind_indexes(username)
+        cursor.execute(
+            f"SELECT rowid, username, password FROM master_account WHERE username_index IN ({', '.join('?' * len(indexes))})",
+            indexes
+        )
+        rows = cursor.fetchall()
+        # Another process may have rotated the key and re-keyed the index since we loaded ours
+        if rows or not refresh_keys():
+            break
+    # Guard against (vanishingly unlikely) HMAC collisions
+    return [
+        (rowid, password) for rowid, encrypted_username, password in rows
+        if decrypt_data(encrypted_username) == username
+    ]
+
+def master_account_exists(username):
+    """Checks whether a master account with this username exists."""
+    conn = get_connection()
+    try:
+        return bool(_find_master_accounts(conn.cursor(), username))
+    finally:
+        conn.close()
+
+def create_master_account(username, password):
+    """Creates a new master account with an encrypted username and a hashed password."""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        if _find_master_accounts(cursor, username):
+            raise ValueError("Username already exists.")
+        cursor.execute(
+            "INSERT INTO master_account (username, password, username_index) VALUES (?, ?, ?)",
+            (encrypt_data(username), hash_password(password), blind_index(username))
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        raise
+    finally:
+        conn.close()
+
+def _check_master_password(password, stored_password):
+    """Verifies a password against a stored hash or a legacy Fernet-encrypted password."""
+    if PasswordHasher.is_hash(stored_password):
+        return get_password_hasher().verify(password, stored_password)
+    try:
+        legacy_password = decrypt_data(stored_password)
+    except Exception:
+        return False
+    return hmac.compare_digest(legacy_password.encode(), password.encode())
+
+def verify_master_account(username, password):
+    """
+    Checks a master account login.
 
-def store_master_account(username, encrypted_password):
+    Looks the account up through the username blind index, so only the
+    matching row is verified instead of every account in the table. Legacy
+    encrypted passwords and hashes made with outdated KDF parameters are
+    rehashed transparently after a successful login.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for rowid, stored_password in _find_master_accounts(cursor, username):
+            if not _check_master_password(password, stored_password):
+                continue
+            if get_password_hasher().needs_rehash(stored_password):
+                cursor.execute(
+                    "UPDATE master_account SET password = ? WHERE rowid = ?",
+                    (hash_password(password), rowid)
+                )
+                conn.commit()
+                print(f"🔧 Upgraded password hash for {username}")
+            return True
+        return False
+    finally:
+        conn.close()
+
+def store_master_account(username, new_password):
     """Updates the master account password for the given username."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
 
     try:
         # Debug: Check if the username exists
-        cursor.execute("SELECT username FROM master_account WHERE username = ?", (username,))
-        if cursor.fetchone():
+        accounts = _find_master_accounts(cursor, username)
+        if accounts:
             # Update the password
             cursor.execute(
-                "UPDATE master_account SET password = ? WHERE username = ?",
-                (encrypted_password, username)
+                "UPDATE master_account SET password = ? WHERE rowid = ?",
+                (hash_password(new_password), accounts[0][0])
             )
             print(f"DEBUG: Password updated for username: {username}")
         else:
@@ -184,51 +615,220 @@ def store_master_account(username, encrypted_password):
 
 
 def load_master_account():
-    """Retrieves and decrypts master account credentials."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    """Retrieves the first master account: decrypted username and stored password hash."""
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT username, password FROM master_account")
     row = cursor.fetchone()
     conn.close()
     if row:
-        return decrypt_data(row[0]), decrypt_data(row[1])
+        return decrypt_data(row[0]), row[1]
     return None, None
 
+# Use UPSERT to update existing row while keeping created_at and clearing soft-delete
+UPSERT_CREDENTIAL_SQL = """
+    INSERT INTO credentials (website, username, password, strength_score, strength_level, entropy, breached,
+                             password_fingerprint, password_minhash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(website) DO UPDATE SET
+        username = excluded.username,
+        password = excluded.password,
+        strength_score = excluded.strength_score,
+        strength_level = excluded.strength_level,
+        entropy = excluded.entropy,
+        breached = excluded.breached,
+        password_fingerprint = excluded.password_fingerprint,
+        password_minhash = excluded.password_minhash,
+        updated_at = CURRENT_TIMESTAMP,
+        deleted_at = NULL
+"""
+
+# Scores passwords once at write time so statistics never need to decrypt
+_strength_analyzer = PasswordStrengthAnalyzer(breach_filter=get_breach_filter())
+
+def _strength_columns(password):
+    """
+    Returns the (strength_score, strength_level, entropy, breached) column values for a password.
+
+    breached is None when no breached-password filter has been built.
+    """
+    summary = _strength_analyzer.summarize_password(password)
+    breached = summary.get("breached")
+    return (summary["strength_score"], summary["strength_level"], summary["entropy"],
+            None if breached is None else int(breached))
+
+def reset_breach_checks():
+    """Marks every credential as not yet checked against the breached-password filter."""
+    conn = get_connection()
+    cursor = conn.execute("UPDATE credentials SET breached = NULL")
+    conn.commit()
+    conn.close()
+    return cursor.rowcount
+
+# Number of credentials encrypted and written per executemany() call
+DEFAULT_BULK_CHUNK_SIZE = 500
+
 def store_password(website, username, password):
     """Stores encrypted credentials but keeps website URLs plaintext."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
-    # Use UPSERT to update existing row while keeping created_at and clearing soft-delete
     cursor.execute(
-        """
-        INSERT INTO credentials (website, username, password)
-        VALUES (?, ?, ?)
-        ON CONFLICT(website) DO UPDATE SET
-            username = excluded.username,
-            password = excluded.password,
-            updated_at = CURRENT_TIMESTAMP,
-            deleted_at = NULL
-        """,
-        (website, encrypt_data(username), encrypt_data(password))
+        UPSERT_CREDENTIAL_SQL,
+        (website, encrypt_data(username), encrypt_data(password), *_strength_columns(password), *reuse_columns(password))
     )  # ✅ Website remains unchanged
     conn.commit()
     conn.close()
+    invalidate_password_stats()
+    get_decrypted_cache().invalidate_website(website)
+
+
+def _normalize_credential_entry(entry):
+    """Accepts a dict or (website, username, password) tuple and validates it."""
+    if isinstance(entry, dict):
+        website, username, password = entry["website"], entry["username"], entry["password"]
+    else:
+        website, username, password = entry
+
+    for field, value in (("website", website), ("username", username), ("password", password)):
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be a string")
+    if not website:
+        raise ValueError("website must not be empty")
+    return website, username, password
+
+
+def store_passwords_bulk(entries, chunk_size=DEFAULT_BULK_CHUNK_SIZE):
+    """
+    Stores many credentials in a single transaction.
+
+    Entries are validated and encrypted one chunk at a time and written with
+    executemany(), so the whole batch costs one commit (one fsync) instead of
+    one per credential. A chunk that fails is rolled back to its savepoint and
+    retried row by row, so one bad entry never discards the rest.
+
+    Args:
+        entries: Iterable of dicts with website/username/password keys, or
+            (website, username, password) tuples
+        chunk_size: Number of entries encrypted and written per executemany()
+
+    Returns:
+        Dictionary with the number of stored entries and a list of failures
+        ({'index', 'website', 'error'}) for entries that were skipped
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    stored = 0
+    failed = []
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+
+        numbered = enumerate(entries)
+        while True:
+            batch = list(itertools.islice(numbered, chunk_size))
+            if not batch:
+                break
+
+            chunk = []
+            for index, entry in batch:
+                try:
+                    chunk.append((index, *_normalize_credential_entry(entry)))
+                except (KeyError, TypeError, ValueError) as e:
+                    website = entry.get("website") if isinstance(entry, dict) else None
+                    failed.append({"index": index, "website": website, "error": f"Invalid entry: {e}"})
+
+            stored += _write_credential_chunk(cursor, chunk, failed)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+        invalidate_password_stats()
+        get_decrypted_cache().wipe()
+
+    return {"stored": stored, "failed": failed}
+
+
+def _write_credential_chunk(cursor, chunk, failed):
+    """Encrypts and UPSERTs one chunk inside the caller's transaction."""
+    rows = []
+    indexes = []
+    try:
+        # Usernames and passwords are encrypted together as one batch
+        ciphertexts = encrypt_many(value for entry in chunk for value in (entry[2], entry[3]))
+        strengths = _strength_analyzer.analyze_many(entry[3] for entry in chunk).rows()
+        for position, ((index, website, username, password), strength) in enumerate(zip(chunk, strengths)):
+            rows.append((website, ciphertexts[2 * position], ciphertexts[2 * position + 1], *strength,
+                         *reuse_columns(password)))
+            indexes.append((index, website))
+    except Exception:
+        rows, indexes = [], []
+        for index, website, username, password in chunk:
+            try:
+                rows.append((website, encrypt_data(username), encrypt_data(password), *_strength_columns(password),
+                             *reuse_columns(password)))
+                indexes.append((index, website))
+            except Exception as e:
+                failed.append({"index": index, "website": website, "error": f"Encryption failed: {e}"})
+
+    if not rows:
+        return 0
+
+    cursor.execute("SAVEPOINT bulk_chunk")
+    try:
+        cursor.executemany(UPSERT_CREDENTIAL_SQL, rows)
+        cursor.execute("RELEASE SAVEPOINT bulk_chunk")
+        return len(rows)
+    except sqlite3.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT bulk_chunk")
+        cursor.execute("RELEASE SAVEPOINT bulk_chunk")
+
+    # Retry row by row to isolate the failing entries
+    written = 0
+    for (index, website), row in zip(indexes, rows):
+        try:
+            cursor.execute(UPSERT_CREDENTIAL_SQL, row)
+            written += 1
+        except sqlite3.Error as e:
+            failed.append({"index": index, "website": website, "error": str(e)})
+    return written
+
+
+def _decrypt_credential_row(credential_id, version, website, encrypted_username, encrypted_password, cache_ttl=None):
+    """Decrypts one credential row, using the decrypted cache (for cache_ttl seconds) when it is enabled."""
+    cache = get_decrypted_cache()
+    cached = cache.get(credential_id, version)
+    if cached is not None:
+        return cached
+    credential = {
+        "website": website,
+        "username": decrypt_data(encrypted_username),
+        "password": decrypt_data(encrypted_password)
+    }
+    cache.put(credential_id, version, website, credential["username"], credential["password"], ttl=cache_ttl)
+    return credential
 
 
 def retrieve_password(website):
     """Retrieves username and password for a given plaintext website."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute(
-        "SELECT username, password FROM credentials WHERE website = ? AND deleted_at IS NULL",
+        "SELECT id, version, username, password FROM credentials WHERE website = ? AND deleted_at IS NULL",
         (website,)
     )  # ✅ No encryption on lookup
     row = cursor.fetchone()
     conn.close()
 
     if row:
-        return decrypt_data(row[0]), decrypt_data(row[1])  # ✅ Decrypt only username & password
+        credential = _decrypt_credential_row(row[0], row[1], website, row[2], row[3])
+        return credential["username"], credential["password"]  # ✅ Decrypt only username & password
 
     print("❌ No stored credentials found for that website.")
     return None, None
@@ -236,7 +836,7 @@ def retrieve_password(website):
 
 def delete_password(website):
     """Deletes stored credentials for a given website."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
 
     print(f"🔎 Checking for existing website before deletion: {website}")  # Debug
@@ -251,89 +851,191 @@ def delete_password(website):
             (website,)
         )
         conn.commit()
+        invalidate_password_stats()
+        get_decrypted_cache().invalidate_website(website)
         print(f"✅ Credentials for {website} successfully removed.")  # Debug
     else:
         print("❌ No matching credentials found for deletion.")
 
     conn.close()
 
-def get_user_preferences(username):
-    """Get user preferences for auto-lock and other settings."""
-    conn = sqlite3.connect(DATABASE_FILE)
+_TRUE_STRINGS = frozenset(("true", "1", "yes", "on"))
+_FALSE_STRINGS = frozenset(("false", "0", "no", "off"))
+
+def _preference_bool(value):
+    """Parses a flag from JSON or a form post; bool('false') would be True."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        if value.strip().lower() in _TRUE_STRINGS:
+            return True
+        if value.strip().lower() in _FALSE_STRINGS:
+            return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+def _positive_int(value):
+    """Parses a whole number of seconds greater than zero."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"not an integer: {value!r}")
+    value = int(value)
+    if value <= 0:
+        raise ValueError(f"must be positive: {value}")
+    return value
+
+# Editable preference columns and the parsers for the types they are stored and returned as
+PREFERENCE_FIELDS = {
+    'session_timeout': _positive_int,
+    'lock_on_tab_inactive': _preference_bool,
+    'lock_on_suspicious_activity': _preference_bool,
+    'auto_lock_enabled': _preference_bool,
+    'lock_on_window_blur': _preference_bool,
+}
+
+# Seconds a cached preferences entry is trusted; bounds staleness when other
+# worker processes update the same user's preferences
+PREFERENCES_CACHE_TTL = 60
+
+class UserPreferences(NamedTuple):
+    """One user's auto-lock settings, as cached and served by /api/preferences."""
+
+    username: str
+    session_timeout: int
+    lock_on_tab_inactive: bool
+    lock_on_suspicious_activity: bool
+    auto_lock_enabled: bool
+    lock_on_window_blur: bool
+    created_at: Optional[str]
+    updated_at: Optional[str]
+
+    @classmethod
+    def from_row(cls, row):
+        if len(row) >= 8:  # New schema with lock_on_window_blur
+            return cls(row[0], int(row[1]), bool(row[2]), bool(row[3]), bool(row[4]),
+                       bool(row[5]), row[6], row[7])
+        # Old schema without lock_on_window_blur (defaults to True for backward compatibility)
+        return cls(row[0], int(row[1]), bool(row[2]), bool(row[3]), bool(row[4]), True,
+                   row[5] if len(row) > 5 else None,
+                   row[6] if len(row) > 6 else None)
+
+    def to_dict(self):
+        return self._asdict()
+
+    @property
+    def etag(self):
+        """Strong validator for the preference values (without quotes)."""
+        payload = json.dumps(self._asdict(), sort_keys=True).encode()
+        return hashlib.sha256(payload).hexdigest()[:32]
+
+_preferences_cache = {}  # username -> (UserPreferences, loaded_at)
+_preferences_lock = threading.Lock()
+
+def _select_user_preferences(cursor, username):
+    cursor.execute("SELECT * FROM user_preferences WHERE username = ?", (username,))
+    row = cursor.fetchone()
+    return UserPreferences.from_row(row) if row else None
+
+def _cache_user_preferences(preferences):
+    with _preferences_lock:
+        _preferences_cache[preferences.username] = (preferences, time.monotonic())
+
+def invalidate_user_preferences(username=None):
+    """Drops one user's cached preferences, or everyone's."""
+    with _preferences_lock:
+        if username is None:
+            _preferences_cache.clear()
+        else:
+            _preferences_cache.pop(username, None)
+
+def load_user_preferences(username):
+    """
+    Returns a user's preferences as a UserPreferences, creating the defaults if needed.
+
+    Served from an in-process cache that update_user_preferences writes
+    through, so repeat reads do no database work.
+    """
+    with _preferences_lock:
+        cached = _preferences_cache.get(username)
+    if cached and time.monotonic() - cached[1] < PREFERENCES_CACHE_TTL:
+        return cached[0]
+
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Check if preferences exist for this user
-    cursor.execute("SELECT * FROM user_preferences WHERE username = ?", (username,))
-    preferences = cursor.fetchone()
+    preferences = _select_user_preferences(cursor, username)
     
     if not preferences:
         # Initialize default preferences
         cursor.execute("""
-            INSERT INTO user_preferences (username, session_timeout, lock_on_tab_inactive, 
+            INSERT OR IGNORE INTO user_preferences (username, session_timeout, lock_on_tab_inactive, 
                                         lock_on_suspicious_activity, auto_lock_enabled, lock_on_window_blur)
             VALUES (?, 300, 1, 1, 1, 1)
         """, (username,))
         conn.commit()
         
         # Fetch the newly created preferences
-        cursor.execute("SELECT * FROM user_preferences WHERE username = ?", (username,))
-        preferences = cursor.fetchone()
+        preferences = _select_user_preferences(cursor, username)
     
     conn.close()
     
     if preferences:
-        # Handle different column counts (for backward compatibility)
-        if len(preferences) >= 8:  # New schema with lock_on_window_blur
-            return {
-                'username': preferences[0],
-                'session_timeout': preferences[1],
-                'lock_on_tab_inactive': bool(preferences[2]),
-                'lock_on_suspicious_activity': bool(preferences[3]),
-                'auto_lock_enabled': bool(preferences[4]),
-                'lock_on_window_blur': bool(preferences[5]),
-                'created_at': preferences[6],
-                'updated_at': preferences[7]
-            }
-        else:  # Old schema without lock_on_window_blur
-            return {
-                'username': preferences[0],
-                'session_timeout': preferences[1],
-                'lock_on_tab_inactive': bool(preferences[2]),
-                'lock_on_suspicious_activity': bool(preferences[3]),
-                'auto_lock_enabled': bool(preferences[4]),
-                'lock_on_window_blur': True,  # Default to True for backward compatibility
-                'created_at': preferences[5] if len(preferences) > 5 else None,
-                'updated_at': preferences[6] if len(preferences) > 6 else None
-            }
-    return None
+        _cache_user_preferences(preferences)
+    return preferences
+
+def get_user_preferences(username):
+    """Get user preferences for auto-lock and other settings."""
+    preferences = load_user_preferences(username)
+    return preferences.to_dict() if preferences else None
 
 def update_user_preferences(username, **kwargs):
-    """Update user preferences."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
+    """
+    Update user preferences.
+
+    Values are parsed into their column types (see PREFERENCE_FIELDS), so
+    "false" and "0" from a form post mean False; unknown fields are ignored.
+    The cached preferences are replaced with the stored row.
+
+    Raises:
+        ValueError: If a value is not a valid flag or a positive timeout
+    """
     # Build update query dynamically
     update_fields = []
     values = []
     
     for field, value in kwargs.items():
-        if field in ['session_timeout', 'lock_on_tab_inactive', 'lock_on_suspicious_activity', 'auto_lock_enabled', 'lock_on_window_blur']:
+        if field in PREFERENCE_FIELDS:
+            try:
+                value = PREFERENCE_FIELDS[field](value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for {field}: {value!r}")
             update_fields.append(f"{field} = ?")
             values.append(value)
     
-    if update_fields:
-        update_fields.append("updated_at = CURRENT_TIMESTAMP")
-        query = f"UPDATE user_preferences SET {', '.join(update_fields)} WHERE username = ?"
-        values.append(username)
-        
-        cursor.execute(query, values)
-        conn.commit()
+    if not update_fields:
+        return
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    update_fields.append("updated_at = CURRENT_TIMESTAMP")
+    query = f"UPDATE user_preferences SET {', '.join(update_fields)} WHERE username = ?"
+    values.append(username)
     
+    cursor.execute(query, values)
+    conn.commit()
+    preferences = _select_user_preferences(cursor, username)
     conn.close()
 
+    # Write through, so the next read (and its ETag) reflects this update
+    if preferences:
+        _cache_user_preferences(preferences)
+    else:
+        invalidate_user_preferences(username)
+
 def initialize_user_preferences(username):
     """Initialize default preferences for a new user."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Run migrations first to ensure table structure is up to date
@@ -350,7 +1052,7 @@ def initialize_user_preferences(username):
 
 def update_password(website, new_password):
     """Updates stored password for a given website."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
 
     print(f"🔎 Checking for existing website: {website}")  # Debug
@@ -360,10 +1062,17 @@ def update_password(website, new_password):
 
     if row:
         cursor.execute(
-            "UPDATE credentials SET password = ?, updated_at = CURRENT_TIMESTAMP WHERE website = ?",
-            (encrypt_data(new_password), website)
+            """
+            UPDATE credentials
+            SET password = ?, strength_score = ?, strength_level = ?, entropy = ?, breached = ?,
+                password_fingerprint = ?, password_minhash = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE website = ?
+            """,
+            (encrypt_data(new_password), *_strength_columns(new_password), *reuse_columns(new_password), website)
         )
         conn.commit()
+        invalidate_password_stats()
+        get_decrypted_cache().invalidate_website(website)
         print(f"✅ Password for {website} updated successfully.")  # Debug
     else:
         print("❌ No matching credentials found for update.")
@@ -372,7 +1081,7 @@ def update_password(website, new_password):
 
 def get_all_stored_urls():
     """Retrieves all stored website URLs."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT DISTINCT website FROM credentials")
@@ -383,7 +1092,7 @@ def get_all_stored_urls():
 
 def get_total_stored_passwords():
     """Retrieves the total number of stored passwords in the database."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT COUNT(*) FROM credentials WHERE deleted_at IS NULL")  # ✅ Ensure only active
@@ -394,23 +1103,356 @@ def get_total_stored_passwords():
 
 def get_all_credentials():
     """Fetches all stored passwords."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT website, username, password FROM credentials WHERE deleted_at IS NULL")
+    rows = cursor.fetchall()
+    conn.close()
+
+    # 🔓 Decrypt every username and password in one parallel batch
+    plaintexts = decrypt_many(value for row in rows for value in (row[1], row[2]))
     credentials = [
         {
             "website": row[0],
-            "username": decrypt_data(row[1]),  # 🔓 Ensure proper decryption
-            "password": decrypt_data(row[2])  # 🔓 Ensure plaintext display
+            "username": plaintexts[2 * position],
+            "password": plaintexts[2 * position + 1]
         }
-        for row in cursor.fetchall()
+        for position, row in enumerate(rows)
     ]
 
-    conn.close()
     return credentials
 
 
+# Dashboard strength summary, rebuilt from the persisted columns after any write
+_password_stats_lock = threading.Lock()
+_password_stats_cache = {"generation": 0, "summary": None}
+
+def invalidate_password_stats():
+    """Drops the cached strength summary; called whenever credentials change."""
+    with _password_stats_lock:
+        _password_stats_cache["generation"] += 1
+        _password_stats_cache["summary"] = None
+
+def get_password_stats_summary():
+    """
+    Returns the password strength distribution of active credentials.
+
+    Aggregates the strength columns persisted at write time, so nothing is
+    decrypted or re-analyzed; the result is cached until the next write.
+
+    Returns:
+        Dictionary with total, strength_distribution, average_entropy and
+        breached (credentials found in the breached-password filter)
+    """
+    with _password_stats_lock:
+        if _password_stats_cache["summary"] is not None:
+            return copy.deepcopy(_password_stats_cache["summary"])
+        generation = _password_stats_cache["generation"]
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT strength_level, COUNT(*), SUM(entropy), SUM(breached)
+        FROM credentials
+        WHERE deleted_at IS NULL AND strength_level IS NOT NULL
+        GROUP BY strength_level
+    """)
+    rows = cursor.fetchall()
+    conn.close()
+
+    total = sum(row[1] for row in rows)
+    if not total:
+        summary = {"total": 0, "strength_distribution": {}, "average_entropy": 0, "breached": 0}
+    else:
+        strength_counts = {"Very Strong": 0, "Strong": 0, "Moderate": 0, "Weak": 0, "Very Weak": 0}
+        for level, count, _, _ in rows:
+            strength_counts[level] = count
+        summary = {
+            "total": total,
+            "strength_distribution": strength_counts,
+            "average_entropy": round(sum(row[2] or 0 for row in rows) / total, 2),
+            "breached": sum(row[3] or 0 for row in rows)
+        }
+
+    with _password_stats_lock:
+        # Don't cache a result that a concurrent write has already made stale
+        if _password_stats_cache["generation"] == generation:
+            _password_stats_cache["summary"] = summary
+    return copy.deepcopy(summary)
+
+
+def get_websites_using_password(password, exclude_website=None):
+    """Websites of active credentials whose password equals password (one fingerprint index lookup)."""
+    if not password:
+        return []
+    conn = get_connection()
+    cursor = conn.cursor()
+    while True:
+        cursor.execute(
+            "SELECT website FROM credentials WHERE password_fingerprint = ? AND deleted_at IS NULL ORDER BY website",
+            (password_fingerprint(password),)
+        )
+        rows = cursor.fetchall()
+        # Fingerprints are re-keyed by key rotation, possibly in another process
+        if rows or not refresh_keys():
+            break
+    websites = [row[0] for row in rows if row[0] != exclude_website]
+    conn.close()
+    return websites
+
+# Fingerprints looked up per IN (...) query when loading near-duplicate candidates
+REUSE_LOOKUP_CHUNK_SIZE = 500
+
+def get_password_reuse_report():
+    """
+    Finds passwords used for more than one website, and near-duplicates.
+
+    Exact reuse groups active credentials by their keyed fingerprint, an
+    index scan. Near-duplicates come from password_lsh_bands: distinct
+    passwords that share a band bucket are candidates, and candidates whose
+    MinHash signatures agree on at least NEAR_DUPLICATE_THRESHOLD of their
+    values are grouped together. Only fingerprints and signatures are read;
+    nothing is decrypted.
+
+    Returns:
+        Dictionary with reused (groups of websites sharing one password),
+        reused_credentials, near_duplicates (groups of websites with similar
+        but not equal passwords, with their lowest pairwise similarity) and
+        near_duplicate_index (whether signatures are being kept)
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT password_fingerprint, website
+            FROM credentials
+            WHERE deleted_at IS NULL AND password_fingerprint IN (
+                SELECT password_fingerprint
+                FROM credentials
+                WHERE deleted_at IS NULL AND password_fingerprint IS NOT NULL
+                GROUP BY password_fingerprint
+                HAVING COUNT(*) > 1
+            )
+            ORDER BY website
+        """)
+        reused = {}
+        for fingerprint, website in cursor.fetchall():
+            reused.setdefault(fingerprint, []).append(website)
+
+        cursor.execute("""
+            SELECT DISTINCT a.fingerprint, b.fingerprint
+            FROM password_lsh_bands a
+            JOIN password_lsh_bands b ON b.band = a.band AND b.bucket = a.bucket AND b.fingerprint > a.fingerprint
+        """)
+        candidates = cursor.fetchall()
+
+        signatures = {}
+        websites = {}
+        involved = list({fingerprint for pair in candidates for fingerprint in pair})
+        for start in range(0, len(involved), REUSE_LOOKUP_CHUNK_SIZE):
+            chunk = involved[start:start + REUSE_LOOKUP_CHUNK_SIZE]
+            cursor.execute(
+                f"""
+                SELECT password_fingerprint, password_minhash, website
+                FROM credentials
+                WHERE deleted_at IS NULL AND password_minhash IS NOT NULL
+                  AND password_fingerprint IN ({', '.join('?' * len(chunk))})
+                """,
+                chunk
+            )
+            for fingerprint, signature, website in cursor.fetchall():
+                signatures[fingerprint] = signature
+                websites.setdefault(fingerprint, []).append(website)
+    finally:
+        conn.close()
+
+    # Union-find over fingerprints joined by similar-enough signatures
+    parent = {}
+    lowest_similarity = {}
+
+    def find(fingerprint):
+        while parent.setdefault(fingerprint, fingerprint) != fingerprint:
+            parent[fingerprint] = parent[parent[fingerprint]]
+            fingerprint = parent[fingerprint]
+        return fingerprint
+
+    for a, b in candidates:
+        if a not in signatures or b not in signatures:
+            continue
+        similarity = signature_similarity(signatures[a], signatures[b])
+        if similarity < NEAR_DUPLICATE_THRESHOLD:
+            continue
+        root_a, root_b = find(a), find(b)
+        lowest = min(similarity, lowest_similarity.get(root_a, 1.0), lowest_similarity.get(root_b, 1.0))
+        parent[root_b] = root_a
+        lowest_similarity[root_a] = lowest
+
+    groups = {}
+    for fingerprint in parent:
+        groups.setdefault(find(fingerprint), []).extend(websites[fingerprint])
+    near_duplicates = [
+        {"websites": sorted(group), "similarity": round(lowest_similarity[root], 2)}
+        for root, group in groups.items()
+    ]
+    near_duplicates.sort(key=lambda group: (-len(group["websites"]), group["websites"]))
+
+    reused_groups = [{"websites": group, "count": len(group)} for group in reused.values()]
+    reused_groups.sort(key=lambda group: (-group["count"], group["websites"]))
+    return {
+        "reused": reused_groups,
+        "reused_credentials": sum(group["count"] for group in reused_groups),
+        "near_duplicates": near_duplicates,
+        "near_duplicate_index": near_duplicate_index_enabled(),
+    }
+
+
+# Columns the vault listing may be sorted by
+VAULT_SORT_COLUMNS = ("website", "created_at", "updated_at")
+
+def get_credentials_page(page=1, per_page=50, sort="website", order="asc", website_filter=None):
+    """
+    Lists one page of active credentials without decrypting anything.
+
+    Only plaintext columns (id, website, timestamps) are returned; use
+    get_credential_by_id() to decrypt a single row on demand.
+
+    Args:
+        page: 1-based page number
+        per_page: Number of rows per page
+        sort: One of VAULT_SORT_COLUMNS
+        order: 'asc' or 'desc'
+        website_filter: Case-insensitive substring the website must contain
+
+    Returns:
+        Dictionary with 'credentials', 'total', 'page', 'per_page' and 'pages'
+    """
+    if sort not in VAULT_SORT_COLUMNS:
+        raise ValueError(f"sort must be one of {', '.join(VAULT_SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+    page = max(1, int(page))
+    per_page = max(1, int(per_page))
+
+    where = "WHERE deleted_at IS NULL"
+    params = []
+    if website_filter:
+        escaped = website_filter.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where += " AND website LIKE ? ESCAPE '\\'"
+        params.append(f"%{escaped}%")
+
+    conn = get_connection()
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM credentials {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"""
+            SELECT id, website, created_at, updated_at FROM credentials {where}
+            ORDER BY {sort} {order.upper()}, id {order.upper()}
+            LIMIT ? OFFSET ?
+            """,
+            params + [per_page, (page - 1) * per_page]
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return {
+        "credentials": [
+            {"id": row[0], "website": row[1], "created_at": row[2], "updated_at": row[3]}
+            for row in rows
+        ],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": (total + per_page - 1) // per_page,
+    }
+
+# The trigram tokenizer cannot match terms shorter than three characters
+MIN_FTS_QUERY_LENGTH = 3
+
+def search_credentials(query, page=1, per_page=50):
+    """
+    Ranked substring search over credential websites.
+
+    Uses the credentials_fts trigram index (best bm25 match first, shorter
+    websites first on ties). Queries shorter than three characters, or
+    databases without FTS5, fall back to a LIKE scan ordered by website.
+
+    Returns:
+        Same shape as get_credentials_page(), plus the 'query'
+    """
+    query = (query or "").strip()
+    page = max(1, int(page))
+    per_page = max(1, int(per_page))
+    if not query:
+        return get_credentials_page(page=page, per_page=per_page)
+
+    if len(query) >= MIN_FTS_QUERY_LENGTH:
+        # Quote the whole query as one phrase so FTS5 syntax in it is literal
+        match = '"' + query.replace('"', '""') + '"'
+        conn = get_connection()
+        try:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM credentials_fts WHERE credentials_fts MATCH ?", (match,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                """
+                SELECT c.id, c.website, c.created_at, c.updated_at
+                FROM credentials_fts
+                JOIN credentials c ON c.id = credentials_fts.rowid
+                WHERE credentials_fts MATCH ? AND c.deleted_at IS NULL
+                ORDER BY credentials_fts.rank, length(c.website), c.website
+                LIMIT ? OFFSET ?
+                """,
+                (match, per_page, (page - 1) * per_page)
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Search index query failed, falling back to LIKE: {e}")
+            rows = None
+        finally:
+            conn.close()
+
+        if rows is not None:
+            return {
+                "credentials": [
+                    {"id": row[0], "website": row[1], "created_at": row[2], "updated_at": row[3]}
+                    for row in rows
+                ],
+                "total": total,
+                "page": page,
+                "per_page": per_page,
+                "pages": (total + per_page - 1) // per_page,
+                "query": query,
+            }
+
+    result = get_credentials_page(page=page, per_page=per_page, website_filter=query)
+    result["query"] = query
+    return result
+
+def get_credential_by_id(credential_id, cache_ttl=None):
+    """
+    Fetches and decrypts a single active credential, or returns None.
+    cache_ttl bounds how long the decrypted copy may be cached, normally the caller's session timeout.
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT id, website, version, username, password FROM credentials WHERE id = ? AND deleted_at IS NULL",
+            (credential_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        return None
+    credential = _decrypt_credential_row(row[0], row[2], row[1], row[3], row[4], cache_ttl)
+    return {
+        "id": row[0],
+        "website": credential["website"],
+        "username": credential["username"],
+        "password": credential["password"]
+    }
+
+
 def export_database():
     """Creates a decrypted JSON backup of all stored credentials."""
     credentials = get_all_credentials()  # 🔓 Already decrypting usernames & passwords
@@ -425,35 +1467,213 @@ def export_database():
 
     return backup_path  # ✅ Path for Flask to serve
 
-# Audit Logging Functions
-def log_audit_event(username, action_type, action_description, target_resource=None, 
-                   ip_address=None, user_agent=None, success=True, error_message=None, 
-                   session_id=None, additional_data=None):
-    """Log an audit event to the database."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
+def _reencrypt_if_legacy(value):
+    """Returns value as a binary envelope, converting legacy Fernet tokens."""
+    return encrypt_data(decrypt_data(value)) if is_legacy_ciphertext(value) else value
+
+
+def reencrypt_legacy_data(batch_size=500, pause=0.0):
+    """
+    Rewrites legacy Fernet TEXT values as binary AES-GCM envelopes.
+
+    Runs online: each batch is its own short transaction and only rows that
+    are still unchanged are updated, so the app can keep reading and writing
+    while the migration runs. Safe to interrupt and re-run.
+
+    Args:
+        batch_size: Credentials converted per transaction
+        pause: Seconds to sleep between batches to yield to other writers
+
+    Returns:
+        Dictionary with converted credential/master account counts and the
+        ids of rows that could not be decrypted
+    """
+    result = {"credentials": 0, "master_accounts": 0, "failed": []}
+
+    last_id = 0
+    while True:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, username, password FROM credentials
+                WHERE id > ? AND (typeof(username) = 'text' OR typeof(password) = 'text')
+                ORDER BY id
+                LIMIT ?
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            updates = []
+            for credential_id, username, password in rows:
+                try:
+                    updates.append((_reencrypt_if_legacy(username), _reencrypt_if_legacy(password),
+                                    credential_id, username, password))
+                except Exception as e:
+                    print(f"⚠️ Could not re-encrypt credential {credential_id}: {e}")
+                    result["failed"].append(credential_id)
+
+            # Compare-and-set: skip rows that were rewritten since they were read
+            cursor.executemany("""
+                UPDATE credentials SET username = ?, password = ?
+                WHERE id = ? AND username = ? AND password = ?
+            """, updates)
+            conn.commit()
+            result["credentials"] += cursor.rowcount
+        finally:
+            conn.close()
+
+        print(f"🔄 Re-encrypted {result['credentials']} credential(s) so far...")
+        if pause:
+            time.sleep(pause)
+
+    conn = get_connection()
     try:
+        cursor = conn.cursor()
         cursor.execute("""
-            INSERT INTO audit_logs (username, action_type, action_description, target_resource,
-                                  ip_address, user_agent, success, error_message, session_id, additional_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (username, action_type, action_description, target_resource, ip_address, 
-              user_agent, success, error_message, session_id, additional_data))
+            SELECT rowid, username, password FROM master_account
+            WHERE typeof(username) = 'text' OR (typeof(password) = 'text' AND password NOT LIKE '$%')
+        """)
+        for rowid, username, password in cursor.fetchall():
+            try:
+                # Hashed master passwords are left alone; legacy encrypted ones are converted too
+                new_password = password if PasswordHasher.is_hash(password) else _reencrypt_if_legacy(password)
+                cursor.execute(
+                    "UPDATE master_account SET username = ?, password = ? WHERE rowid = ? AND username = ?",
+                    (_reencrypt_if_legacy(username), new_password, rowid, username)
+                )
+                result["master_accounts"] += cursor.rowcount
+            except Exception as e:
+                print(f"⚠️ Could not re-encrypt master account row {rowid}: {e}")
         conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error logging audit event: {e}")
     finally:
         conn.close()
 
-def get_audit_logs(username=None, action_type=None, limit=100, offset=0, 
-                  start_date=None, end_date=None, success_only=None):
-    """Retrieve audit logs with optional filtering."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    return result
+
+
+def count_legacy_ciphertext():
+    """Returns how many credential rows still hold legacy Fernet values."""
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    # Build query with filters
-    query = "SELECT * FROM audit_logs WHERE 1=1"
+    cursor.execute(
+        "SELECT COUNT(*) FROM credentials WHERE typeof(username) = 'text' OR typeof(password) = 'text'"
+    )
+    count = cursor.fetchone()[0]
+    conn.close()
+    return count
+
+# Audit Logging Functions
+AUDIT_INSERT_SQL = """
+    INSERT INTO audit_logs (username, action_type, action_description, target_resource,
+                          ip_address, user_agent, success, error_message, session_id,
+                          additional_data, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Set to False to write every audit event synchronously
+AUDIT_LOG_ASYNC = True
+
+_audit_writer = None
+_audit_writer_lock = threading.Lock()
+
+AUDIT_STATS_UPSERT_SQL = """
+    INSERT INTO audit_stats_daily (username, day, action_type, success, event_count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(username, day, action_type, success) DO UPDATE SET
+        event_count = event_count + excluded.event_count
+"""
+
+def _audit_stats_deltas(rows):
+    """Aggregates audit rows into (username, day, action_type, success, count) deltas."""
+    # A missing success flag counts as success, like COALESCE(success, 1) in the backfill and cleanup
+    counts = Counter(
+        (row[0], row[10][:10], row[1], 0 if row[6] is not None and not row[6] else 1)
+        for row in rows
+    )
+    return [key + (count,) for key, count in counts.items()]
+
+def _write_audit_batch(rows):
+    """
+    Writes a batch of audit rows in one transaction (used by the audit writer).
+
+    The audit_stats_daily rollup is updated in the same transaction, so the
+    statistics never drift from the log itself.
+    """
+    conn = get_connection()
+    try:
+        conn.executemany(AUDIT_INSERT_SQL, rows)
+        conn.executemany(AUDIT_STATS_UPSERT_SQL, _audit_stats_deltas(rows))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    _publish_audit_stats_changed(rows)
+
+def _publish_audit_stats_changed(rows):
+    """Tells open /api/events streams that a user's audit statistics changed."""
+    for username, count in Counter(row[0] for row in rows).items():
+        event_bus.publish(user_topic(username), "audit_stats_changed", {"new_events": count})
+
+def get_audit_writer():
+    """Returns the shared background audit writer, creating it on first use."""
+    global _audit_writer
+    if _audit_writer is None:
+        with _audit_writer_lock:
+            if _audit_writer is None:
+                _audit_writer = AuditLogWriter(_write_audit_batch)
+    return _audit_writer
+
+def flush_audit_log(timeout=5.0):
+    """Blocks until all queued audit events have been written."""
+    if _audit_writer is not None:
+        return _audit_writer.flush(timeout)
+    return True
+
+def shutdown_audit_writer():
+    """Flushes pending audit events and stops the writer thread."""
+    if _audit_writer is not None:
+        _audit_writer.shutdown()
+
+def get_audit_writer_metrics():
+    """Returns queue depth, throughput and backpressure counters of the audit writer."""
+    return get_audit_writer().get_metrics()
+
+# Registered after close_connection_pool so it runs first at exit (atexit is LIFO)
+atexit.register(shutdown_audit_writer)
+
+def log_audit_event(username, action_type, action_description, target_resource=None, 
+                   ip_address=None, user_agent=None, success=True, error_message=None, 
+                   session_id=None, additional_data=None, durable=None):
+    """
+    Log an audit event to the database.
+
+    Events are queued for the background audit writer and written in batches.
+    Critical actions (see audit_writer.DEFAULT_CRITICAL_ACTIONS) wait until they
+    are on disk; pass durable=True/False to override that per call.
+    """
+    # Timestamp the event now, not when the batch happens to be written
+    created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    row = (username, action_type, action_description, target_resource, ip_address,
+           user_agent, success, error_message, session_id, additional_data, created_at)
+
+    if AUDIT_LOG_ASYNC:
+        get_audit_writer().submit(row, action_type=action_type, durable=durable)
+        return
+
+    try:
+        _write_audit_batch([row])
+    except sqlite3.Error as e:
+        print(f"Error logging audit event: {e}")
+
+def _build_audit_log_filters(username=None, action_type=None, start_date=None,
+                             end_date=None, success_only=None):
+    """Builds the WHERE clause and parameters shared by the audit log queries."""
+    query = "WHERE 1=1"
     params = []
     
     if username:
@@ -475,8 +1695,23 @@ def get_audit_logs(username=None, action_type=None, limit=100, offset=0,
     if success_only is not None:
         query += " AND success = ?"
         params.append(success_only)
+
+    return query, params
+
+def get_audit_logs(username=None, action_type=None, limit=100, offset=0, 
+                  start_date=None, end_date=None, success_only=None):
+    """
+    Retrieve audit logs with optional filtering.
+
+    Uses LIMIT/OFFSET paging; prefer get_audit_logs_page() for deep pages.
+    """
+    flush_audit_log()
+    conn = get_connection()
+    cursor = conn.cursor()
     
-    query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+    # Build query with filters
+    where, params = _build_audit_log_filters(username, action_type, start_date, end_date, success_only)
+    query = f"SELECT * FROM audit_logs {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
     params.extend([limit, offset])
     
     try:
@@ -497,40 +1732,118 @@ def get_audit_logs(username=None, action_type=None, limit=100, offset=0,
     finally:
         conn.close()
 
+def encode_audit_cursor(created_at, log_id):
+    """Encodes an audit log position as an opaque URL-safe cursor."""
+    raw = json.dumps([created_at, log_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_audit_cursor(cursor_token):
+    """Decodes a cursor from encode_audit_cursor(); raises ValueError if invalid."""
+    try:
+        padded = cursor_token + "=" * (-len(cursor_token) % 4)
+        created_at, log_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(created_at, str) or not isinstance(log_id, int):
+        raise ValueError("Invalid pagination cursor")
+    return created_at, log_id
+
+def get_audit_logs_page(username=None, action_type=None, limit=50, cursor=None,
+                        direction="next", start_date=None, end_date=None, success_only=None):
+    """
+    Retrieve one page of audit logs using keyset (cursor) pagination.
+
+    Logs are ordered newest first by (created_at, id). Instead of an offset the
+    caller passes the opaque cursor returned with the previous page, so every
+    page is a bounded range scan on idx_audit_logs_user_created_id no matter
+    how deep it is.
+
+    Args:
+        cursor: next_cursor or prev_cursor from an earlier page (None = newest)
+        direction: 'next' for older entries, 'prev' for newer entries
+
+    Returns:
+        Dictionary with 'logs', 'next_cursor' and 'prev_cursor' (None when
+        there is nothing further in that direction)
+
+    Raises:
+        ValueError: If the cursor or direction is invalid
+    """
+    if direction not in ("next", "prev"):
+        raise ValueError("direction must be 'next' or 'prev'")
+
+    flush_audit_log()
+    where, params = _build_audit_log_filters(username, action_type, start_date, end_date, success_only)
+
+    if cursor:
+        created_at, log_id = decode_audit_cursor(cursor)
+        where += " AND (created_at, id) < (?, ?)" if direction == "next" else " AND (created_at, id) > (?, ?)"
+        params.extend([created_at, log_id])
+
+    order = "DESC" if direction == "next" else "ASC"
+    query = f"SELECT * FROM audit_logs {where} ORDER BY created_at {order}, id {order} LIMIT ?"
+    params.append(limit + 1)  # One extra row tells us whether another page exists
+
+    conn = get_connection()
+    try:
+        cur = conn.execute(query, params)
+        columns = [description[0] for description in cur.description]
+        rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+
+    def position(log):
+        return encode_audit_cursor(log["created_at"], log["id"])
+
+    # Coming from a cursor means there are entries on the side we came from
+    has_older = has_more if direction == "next" else bool(cursor)
+    has_newer = bool(cursor) if direction == "next" else has_more
+
+    return {
+        "logs": rows,
+        "next_cursor": position(rows[-1]) if rows and has_older else None,
+        "prev_cursor": position(rows[0]) if rows and has_newer else None,
+    }
+
 def get_audit_log_stats(username=None, days=30):
-    """Get audit log statistics for a user."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    """
+    Get audit log statistics for a user.
+
+    Reads only the audit_stats_daily rollup, so the cost depends on the number
+    of days and action types rather than the size of audit_logs. The window
+    starts at midnight (UTC) of the first day in the period.
+    """
+    flush_audit_log()
+    conn = get_connection()
     cursor = conn.cursor()
     
     try:
-        # Get total events
-        query = "SELECT COUNT(*) FROM audit_logs WHERE created_at >= datetime('now', '-{} days')".format(days)
-        params = []
+        query = """
+            SELECT action_type, success, SUM(event_count)
+            FROM audit_stats_daily
+            WHERE day >= date('now', ?)
+        """
+        params = [f"-{int(days)} days"]
         
         if username:
             query += " AND username = ?"
             params.append(username)
+        query += " GROUP BY action_type, success"
         
         cursor.execute(query, params)
-        total_events = cursor.fetchone()[0]
         
-        # Get events by type
-        query = "SELECT action_type, COUNT(*) FROM audit_logs WHERE created_at >= datetime('now', '-{} days')".format(days)
-        if username:
-            query += " AND username = ?"
-        query += " GROUP BY action_type"
-        
-        cursor.execute(query, params)
-        events_by_type = dict(cursor.fetchall())
-        
-        # Get success/failure ratio
-        query = "SELECT success, COUNT(*) FROM audit_logs WHERE created_at >= datetime('now', '-{} days')".format(days)
-        if username:
-            query += " AND username = ?"
-        query += " GROUP BY success"
-        
-        cursor.execute(query, params)
-        success_stats = dict(cursor.fetchall())
+        total_events = 0
+        events_by_type = {}
+        success_stats = {}
+        for action_type, success, count in cursor.fetchall():
+            total_events += count
+            events_by_type[action_type] = events_by_type.get(action_type, 0) + count
+            success_stats[success] = success_stats.get(success, 0) + count
         
         return {
             'total_events': total_events,
@@ -546,21 +1859,38 @@ def get_audit_log_stats(username=None, days=30):
 
 def cleanup_old_audit_logs(retention_days=90):
     """Clean up audit logs older than specified days."""
-    conn = sqlite3.connect(DATABASE_FILE)
+    flush_audit_log()
+    conn = get_connection()
     cursor = conn.cursor()
+    cutoff = f"-{int(retention_days)} days"
     
     try:
+        # Subtract the deleted events from the rollup in the same transaction
+        cursor.execute("""
+            SELECT username, date(created_at), action_type, COALESCE(success, 1), COUNT(*)
+            FROM audit_logs
+            WHERE created_at < datetime('now', ?)
+            GROUP BY username, date(created_at), action_type, COALESCE(success, 1)
+        """, (cutoff,))
+        removed = cursor.fetchall()
+
         cursor.execute("""
             DELETE FROM audit_logs 
-            WHERE created_at < datetime('now', '-{} days')
-        """.format(retention_days))
+            WHERE created_at < datetime('now', ?)
+        """, (cutoff,))
         
         deleted_count = cursor.rowcount
+        cursor.executemany("""
+            UPDATE audit_stats_daily SET event_count = event_count - ?
+            WHERE username = ? AND day = ? AND action_type = ? AND success = ?
+        """, [(count, user, day, action, success) for user, day, action, success, count in removed])
+        cursor.execute("DELETE FROM audit_stats_daily WHERE event_count <= 0")
         conn.commit()
         
         print(f"Cleaned up {deleted_count} old audit log entries")
         return deleted_count
     except sqlite3.Error as e:
+        conn.rollback()
         print(f"Error cleaning up audit logs: {e}")
         return 0
     finally:
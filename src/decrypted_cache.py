@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+# Matches the default session timeout; used for entries cached without a TTL of their own
+DEFAULT_TTL = 300
+
+
+class _CacheEntry:
+    """One decrypted credential; secrets are held in bytearrays so they can be zeroed."""
+
+    __slots__ = ("version", "website", "username", "password", "expires_at")
+
+    def __init__(self, version, website, username, password, expires_at):
+        self.version = version
+        self.website = website
+        self.username = bytearray(username.encode())
+        self.password = bytearray(password.encode())
+        self.expires_at = expires_at
+
+    def wipe(self):
+        """Overwrites the secret bytes in place."""
+        self.username[:] = bytes(len(self.username))
+        self.password[:] = bytes(len(self.password))
+
+
+class DecryptedCache:
+    """
+    Short-lived, opt-in cache of decrypted credentials.
+
+    Entries are keyed by credential id and only returned while the row's
+    version (bumped by a trigger on every write, so writes made by other
+    processes are noticed too) still matches. Each entry expires after the
+    TTL it was cached with, normally the caller's session timeout, or ttl
+    seconds by default; the least recently used entry is evicted beyond
+    max_entries, and every entry is zeroed when it is evicted, expired or
+    wiped. Note that the strings handed back to callers are ordinary Python
+    copies and are not wiped.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, enabled=False):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "wipes": 0}
+
+    def get(self, credential_id, version):
+        """Returns {'website', 'username', 'password'} for a fresh entry, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(credential_id)
+            if entry is None:
+                self.metrics["misses"] += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._drop(credential_id)
+                self.metrics["expirations"] += 1
+                self.metrics["misses"] += 1
+                return None
+            if entry.version != version:
+                # The row changed since it was cached
+                self._drop(credential_id)
+                self.metrics["misses"] += 1
+                return None
+            self._entries.move_to_end(credential_id)
+            self.metrics["hits"] += 1
+            return {
+                "website": entry.website,
+                "username": entry.username.decode(),
+                "password": entry.password.decode(),
+            }
+
+    def put(self, credential_id, version, website, username, password, ttl=None):
+        """
+        Caches a decrypted credential for ttl seconds (default: self.ttl),
+        evicting the least recently used entries if full.
+        """
+        if not self.enabled or self.max_entries < 1:
+            return
+        with self._lock:
+            if credential_id in self._entries:
+                self._drop(credential_id)
+            self._entries[credential_id] = _CacheEntry(
+                version, website, username, password, time.monotonic() + (self.ttl if ttl is None else ttl)
+            )
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._drop(oldest_id)
+                self.metrics["evictions"] += 1
+
+    def invalidate(self, credential_id):
+        """Drops and zeroes one entry."""
+        with self._lock:
+            self._drop(credential_id)
+
+    def invalidate_website(self, website):
+        """Drops and zeroes the entries for a website (used by writes that only know the website)."""
+        with self._lock:
+            for credential_id in [cid for cid, entry in self._entries.items() if entry.website == website]:
+                self._drop(credential_id)
+
+    def wipe(self):
+        """Drops and zeroes every entry, e.g. on logout or session expiry."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.wipe()
+            self._entries.clear()
+            self.metrics["wipes"] += 1
+
+    def set_ttl(self, ttl):
+        """Changes the default TTL for new entries; existing entries are shortened, never extended."""
+        with self._lock:
+            self.ttl = ttl
+            self._shorten(ttl)
+
+    def shorten_ttl(self, ttl):
+        """Makes every existing entry expire within ttl seconds, e.g. after a session timeout is lowered."""
+        with self._lock:
+            self._shorten(ttl)
+
+    def get_metrics(self):
+        """Returns hit/miss counters and the current size."""
+        with self._lock:
+            snapshot = dict(self.metrics)
+            snapshot["size"] = len(self._entries)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 3) if lookups else 0.0
+        snapshot["enabled"] = self.enabled
+        snapshot["max_entries"] = self.max_entries
+        snapshot["ttl"] = self.ttl
+        return snapshot
+
+    def _shorten(self, ttl):
+        latest = time.monotonic() + ttl
+        for entry in self._entries.values():
+            entry.expires_at = min(entry.expires_at, latest)
+
+    def _drop(self, credential_id):
+        entry = self._entries.pop(credential_id, None)
+        if entry is not None:
+            entry.wipe()
+
+
+# Process-wide cache; opt in with AEGISVAULT_DECRYPTED_CACHE=1
+_decrypted_cache = DecryptedCache(
+    max_entries=int(os.environ.get("AEGISVAULT_DECRYPTED_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+    enabled=os.environ.get("AEGISVAULT_DECRYPTED_CACHE", "").lower() in ("1", "true", "yes"),
+)
+
+
+def get_decrypted_cache():
+    """Returns the process-wide decrypted credential cache."""
+    return _decrypted_cache
+
+
+def wipe_decrypted_cache():
+    """Zeroes and drops every cached decrypted credential."""
+    _decrypted_cache.wipe()
@@ -1,6 +1,17 @@
+import base64
+import hashlib
+import hmac
 import os
 import sys
-from cryptography.fernet import Fernet
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 def get_encryption_key_path():
     """Get the appropriate path for the encryption key."""
@@ -20,25 +31,353 @@ def get_encryption_key_path():
     os.makedirs(app_data, exist_ok=True)
     return os.path.join(app_data, "encryption_key.key")
 
-# Initialize encryption with the stored key
-key = None
-if not os.path.exists(get_encryption_key_path()):
-    key = Fernet.generate_key()
-    with open(get_encryption_key_path(), "wb") as key_file:
-        key_file.write(key)
-else:
-    with open(get_encryption_key_path(), "rb") as key_file:
-        key = key_file.read()
+# Binary envelope: version (1 byte) | key id (4 bytes) | nonce (12 bytes) | ciphertext + GCM tag (16 bytes)
+ENVELOPE_VERSION = 1
+KEY_ID_BYTES = 4
+NONCE_BYTES = 12
+HEADER_BYTES = 1 + KEY_ID_BYTES
 
-print(f"Generated Key: {key}")  # ✅ Debugging output
+# How often encrypt_data checks the key provider for a rotation done by another process
+KEY_RELOAD_INTERVAL = 5.0
 
-cipher_suite = Fernet(key)
+
+def derive_envelope_key(fernet_key):
+    """Derives the AES-256-GCM key for the binary envelope from a Fernet key."""
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"aegisvault-envelope-aes-256-gcm-v1",
+    ).derive(base64.urlsafe_b64decode(fernet_key))
+
+
+def key_id_for(fernet_key):
+    """Short public identifier of a key, stored in every envelope it writes."""
+    return hashlib.sha256(b"aegisvault-key-id" + fernet_key).digest()[:KEY_ID_BYTES]
+
+
+class KeyProviderError(Exception):
+    """Raised when a key provider cannot load or store keys."""
+
+
+class KeyProvider(ABC):
+    """
+    Source of the encryption keyring: a list of Fernet keys, primary first.
+
+    Providers are only asked for keys on first crypto use, so importing this
+    module never touches key material.
+    """
+
+    @abstractmethod
+    def load_keys(self):
+        """Returns the keys, primary first."""
+
+    def store_keys(self, keys):
+        """Replaces the stored keys (used by key rotation)."""
+        raise KeyProviderError(f"{type(self).__name__} is read-only")
+
+    def version(self):
+        """Cheap change marker; a different value means the keys must be reloaded."""
+        return None
+
+
+class FileKeyProvider(KeyProvider):
+    """Keys stored one per line in a key file; a missing file is created with a fresh key."""
+
+    def __init__(self, path=None):
+        self._path = path
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = get_encryption_key_path()
+        return self._path
+
+    def load_keys(self):
+        return read_key_file(self.path)
+
+    def store_keys(self, keys):
+        write_key_file(keys, self.path)
+
+    def version(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+
+class EnvKeyProvider(KeyProvider):
+    """Keys from an environment variable, comma or newline separated, primary first."""
+
+    def __init__(self, variable="AEGISVAULT_ENCRYPTION_KEY"):
+        self.variable = variable
+
+    def load_keys(self):
+        value = os.environ.get(self.variable, "")
+        keys = [part.strip().encode() for part in value.replace(",", "\n").splitlines() if part.strip()]
+        if not keys:
+            raise KeyProviderError(f"{self.variable} is not set")
+        return keys
+
+    def version(self):
+        return os.environ.get(self.variable)
+
+
+class MemoryKeyProvider(KeyProvider):
+    """Keys held in memory; a stand-in for an OS keyring and handy for tests."""
+
+    def __init__(self, keys=None):
+        self._keys = list(keys) if keys else [Fernet.generate_key()]
+        self._version = 0
+
+    def load_keys(self):
+        return list(self._keys)
+
+    def store_keys(self, keys):
+        self._keys = list(keys)
+        self._version += 1
+
+    def version(self):
+        return self._version
+
+
+def read_key_file(path=None):
+    """
+    Reads the keyring from the key file: one Fernet key per line, primary first.
+
+    A missing key file is created with a single fresh key.
+    """
+    path = path or get_encryption_key_path()
+    if not os.path.exists(path):
+        write_key_file([Fernet.generate_key()], path)
+    with open(path, "rb") as key_file:
+        keys = [line.strip() for line in key_file.read().splitlines() if line.strip()]
+    if not keys:
+        raise ValueError(f"No encryption keys found in {path}")
+    return keys
+
+
+def write_key_file(keys, path=None):
+    """Atomically replaces the key file with the given keys (primary first)."""
+    path = path or get_encryption_key_path()
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as key_file:
+        key_file.write(b"\n".join(keys) + b"\n")
+        key_file.flush()
+        os.fsync(key_file.fileno())
+    os.replace(temp_path, path)
+
+
+class Keyring:
+    """
+    The loaded encryption keys.
+
+    New data is always encrypted with the primary key; envelopes are
+    decrypted with whichever key their key id names, and legacy Fernet
+    tokens are tried against every key.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.primary_key = self.keys[0]
+        self.primary_key_id = key_id_for(self.primary_key)
+        self.envelope_ciphers = {key_id_for(k): AESGCM(derive_envelope_key(k)) for k in self.keys}
+        self.fernet = MultiFernet([Fernet(k) for k in self.keys])
+        # Separate subkeys for blind indexes so index values reveal nothing about the cipher keys
+        self.blind_index_keys = [
+            hmac.new(k, b"aegisvault-blind-index-v1", hashlib.sha256).digest() for k in self.keys
+        ]
+
+
+# Loaded on first use from the key provider
+_key_provider = None
+_keyring = None
+_keyring_version = None
+_keyring_lock = threading.Lock()
+_next_reload_check = 0.0
+
+
+def default_key_provider():
+    """AEGISVAULT_ENCRYPTION_KEY if set, otherwise the key file."""
+    if os.environ.get("AEGISVAULT_ENCRYPTION_KEY"):
+        return EnvKeyProvider()
+    return FileKeyProvider()
+
+
+def get_key_provider():
+    """Returns the active key provider, choosing the default on first use."""
+    global _key_provider
+    if _key_provider is None:
+        _key_provider = default_key_provider()
+    return _key_provider
+
+
+def set_key_provider(provider):
+    """Switches key provider; the keyring is reloaded from it on next use."""
+    global _key_provider, _keyring, _keyring_version
+    with _keyring_lock:
+        _key_provider = provider
+        _keyring = None
+        _keyring_version = None
+
+
+def get_keyring():
+    """Returns the loaded keyring, loading it from the key provider on first use."""
+    keyring = _keyring
+    if keyring is None:
+        keyring = reload_keys()
+    return keyring
+
+
+def reload_keys():
+    """Re-reads the keys from the provider, e.g. after another process rotated the key."""
+    global _keyring, _keyring_version
+    with _keyring_lock:
+        provider = get_key_provider()
+        _keyring = Keyring(provider.load_keys())
+        _keyring_version = provider.version()
+        return _keyring
+
+
+def _check_for_new_keys():
+    """Reloads the keyring if the provider's keys changed; checked at most every KEY_RELOAD_INTERVAL."""
+    global _next_reload_check
+    now = time.monotonic()
+    if _keyring is None or now < _next_reload_check:
+        return
+    _next_reload_check = now + KEY_RELOAD_INTERVAL
+    if get_key_provider().version() != _keyring_version:
+        reload_keys()
+
+
+def refresh_keys():
+    """
+    Reloads the keyring right away if the provider's keys changed.
+
+    For lookups that miss, e.g. a login right after another process rotated
+    the key and re-keyed the blind indexes; returns whether keys were reloaded.
+    """
+    if _keyring is None or get_key_provider().version() == _keyring_version:
+        return False
+    reload_keys()
+    return True
 
 
 def encrypt_data(data):
-    """Encrypts data using AES-256."""
-    return cipher_suite.encrypt(data.encode()).decode()
+    """Encrypts data with AES-256-GCM and returns the binary envelope (stored as a BLOB)."""
+    _check_for_new_keys()
+    keyring = get_keyring()
+    header = bytes([ENVELOPE_VERSION]) + keyring.primary_key_id
+    nonce = os.urandom(NONCE_BYTES)
+    # The header is authenticated so the version and key id can't be swapped
+    cipher = keyring.envelope_ciphers[keyring.primary_key_id]
+    return header + nonce + cipher.encrypt(nonce, data.encode(), header)
 
 def decrypt_data(encrypted_data):
-    """Decrypts AES-256 encrypted data."""
-    return cipher_suite.decrypt(encrypted_data.encode()).decode()
\ No newline at end of file
+    """
+    Decrypts a binary envelope, or a legacy Fernet token, under any loaded key.
+
+    Raises:
+        InvalidToken: If the value is corrupted, tampered with or was
+            encrypted under a key that is not in the keyring
+    """
+    if isinstance(encrypted_data, str):
+        # Legacy row written before the binary envelope
+        return get_keyring().fernet.decrypt(encrypted_data.encode()).decode()
+
+    encrypted_data = bytes(encrypted_data)
+    if not encrypted_data or encrypted_data[0] != ENVELOPE_VERSION:
+        # Fernet token stored as bytes
+        return get_keyring().fernet.decrypt(encrypted_data).decode()
+    if len(encrypted_data) < HEADER_BYTES + NONCE_BYTES + 16:
+        raise InvalidToken
+    header = encrypted_data[:HEADER_BYTES]
+    cipher = get_keyring().envelope_ciphers.get(header[1:])
+    if cipher is None:
+        # Possibly written under a key rotated in by another process
+        cipher = reload_keys().envelope_ciphers.get(header[1:])
+        if cipher is None:
+            raise InvalidToken
+    nonce = encrypted_data[HEADER_BYTES:HEADER_BYTES + NONCE_BYTES]
+    try:
+        return cipher.decrypt(nonce, encrypted_data[HEADER_BYTES + NONCE_BYTES:], header).decode()
+    except InvalidTag:
+        raise InvalidToken from None
+
+def is_legacy_ciphertext(encrypted_data):
+    """Whether a stored value still uses the legacy Fernet format."""
+    if isinstance(encrypted_data, str):
+        return True
+    return not encrypted_data or bytes(encrypted_data[:1]) != bytes([ENVELOPE_VERSION])
+
+def needs_reencryption(encrypted_data):
+    """Whether a stored value is legacy Fernet or was encrypted under a non-primary key."""
+    if is_legacy_ciphertext(encrypted_data):
+        return True
+    return bytes(encrypted_data[1:HEADER_BYTES]) != get_keyring().primary_key_id
+
+def blind_index_key():
+    """The primary blind-index subkey, picking up keys rotated in by another process."""
+    _check_for_new_keys()
+    return get_keyring().blind_index_keys[0]
+
+def blind_index(value):
+    """Returns a keyed HMAC-SHA256 of value for equality lookups on encrypted columns."""
+    return hmac.new(blind_index_key(), value.encode(), hashlib.sha256).hexdigest()
+
+def blind_indexes(value):
+    """Blind index of value under every loaded key, primary first (for lookups during rotation)."""
+    _check_for_new_keys()
+    return [hmac.new(k, value.encode(), hashlib.sha256).hexdigest() for k in get_keyring().blind_index_keys]
+
+
+# Batches smaller than this are processed serially; thread hand-off costs more than it saves
+PARALLEL_THRESHOLD = 256
+# Upper bound on crypto worker threads (defaults to the number of cores)
+MAX_CRYPTO_WORKERS = int(os.environ.get("AEGISVAULT_CRYPTO_WORKERS", min(32, os.cpu_count() or 1)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Returns the shared crypto thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_CRYPTO_WORKERS,
+                                               thread_name_prefix="aegisvault-crypto")
+    return _executor
+
+
+def _map_batched(func, values):
+    """
+    Applies func to every value, in order, splitting large batches across threads.
+
+    The AES and HMAC work inside cryptography runs in OpenSSL with the GIL
+    released, so chunks processed on separate threads use separate cores.
+    Threads are used rather than processes so the key never leaves this process.
+    """
+    values = list(values)
+    if len(values) < PARALLEL_THRESHOLD or MAX_CRYPTO_WORKERS < 2:
+        return [func(value) for value in values]
+
+    # A few chunks per worker keeps the threads evenly loaded
+    chunk_size = max(64, -(-len(values) // (MAX_CRYPTO_WORKERS * 4)))
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+    results = []
+    for part in _get_executor().map(lambda chunk: [func(value) for value in chunk], chunks):
+        results.extend(part)
+    return results
+
+
+def encrypt_many(values):
+    """Encrypts a sequence of strings; returns the tokens in the same order."""
+    return _map_batched(encrypt_data, values)
+
+
+def decrypt_many(encrypted_values):
+    """Decrypts a sequence of tokens; returns the plaintexts in the same order."""
+    return _map_batched(decrypt_data, encrypted_values)
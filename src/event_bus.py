@@ -0,0 +1,126 @@
+import itertools
+import json
+import queue
+import threading
+
+# Events buffered per subscriber before the oldest are dropped
+DEFAULT_SUBSCRIBER_QUEUE_SIZE = 64
+
+
+def session_topic(session_id):
+    """Topic for events about one browser session."""
+    return f"session:{session_id}"
+
+
+def user_topic(username):
+    """Topic for events about one user's data."""
+    return f"user:{username}"
+
+
+def format_sse(event_type, data, event_id=None):
+    """Encodes one Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Event:
+    """One published event."""
+
+    __slots__ = ("id", "topic", "type", "data")
+
+    def __init__(self, event_id, topic, event_type, data):
+        self.id = event_id
+        self.topic = topic
+        self.type = event_type
+        self.data = data
+
+    def to_sse(self):
+        return format_sse(self.type, self.data, self.id)
+
+
+class Subscription:
+    """A subscriber's queue of events for a set of topics."""
+
+    def __init__(self, bus, topics, maxsize=DEFAULT_SUBSCRIBER_QUEUE_SIZE):
+        self.bus = bus
+        self.topics = frozenset(topics)
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout=None):
+        """Waits up to timeout seconds for the next event; None if there was none."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def _deliver(self, event):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                # A slow reader loses its oldest events, never blocks the publisher
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class EventBus:
+    """
+    In-process publish/subscribe hub for push notifications.
+
+    Publishers (the session scheduler, the audit writer) call publish() from
+    any thread; each subscriber (an open /api/events stream) blocks on its own
+    queue, so nothing runs while no events are published.
+    """
+
+    def __init__(self):
+        self._subscribers = {}  # topic -> set of Subscriptions
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topics, maxsize=DEFAULT_SUBSCRIBER_QUEUE_SIZE):
+        """Returns a Subscription receiving every event published to any of topics."""
+        subscription = Subscription(self, topics, maxsize)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def has_subscribers(self, topic):
+        with self._lock:
+            return topic in self._subscribers
+
+    def publish(self, topic, event_type, data=None):
+        """Delivers an event to the topic's subscribers; returns how many received it."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        if not subscribers:
+            return 0
+        event = Event(next(self._ids), topic, event_type, data or {})
+        for subscription in subscribers:
+            subscription._deliver(event)
+        return len(subscribers)
+
+
+# Shared by every publisher and /api/events stream in the process
+event_bus = EventBus()
@@ -0,0 +1,324 @@
+import argparse
+import sys
+import time
+
+from cryptography.fernet import Fernet
+
+import encryption
+from database import init_db, get_connection
+from password_hashing import PasswordHasher
+from password_reuse import reuse_columns
+
+DEFAULT_BATCH_SIZE = 500
+# Full passes over the tables before giving up on rows rewritten under an old key
+MAX_PASSES = 3
+
+# (table, row id column, encrypted columns) in the order they are rotated
+ROTATION_TABLES = (
+    ("credentials", "id", ("username", "password")),
+    ("master_account", "rowid", ("username", "password")),
+)
+
+
+class KeyRotationError(Exception):
+    """Raised when a rotation cannot be started, resumed or finished."""
+
+
+def _rotate_value(value):
+    """Re-encrypts value under the primary key; hashes and current values are returned unchanged."""
+    if PasswordHasher.is_hash(value) or not encryption.needs_reencryption(value):
+        return value
+    return encryption.encrypt_data(encryption.decrypt_data(value))
+
+
+def get_rotation_status():
+    """Returns the checkpoint row of the current or last rotation as a dict, or None."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT target_key_id, table_name, last_id, rows_rotated, started_at, updated_at, completed_at
+        FROM key_rotation_state WHERE id = 1
+    """)
+    row = cursor.fetchone()
+    conn.close()
+    if not row:
+        return None
+    return {
+        "target_key_id": row[0],
+        "table_name": row[1],
+        "last_id": row[2],
+        "rows_rotated": row[3],
+        "started_at": row[4],
+        "updated_at": row[5],
+        "completed_at": row[6],
+        "in_progress": row[6] is None,
+    }
+
+
+def count_rows_needing_rotation():
+    """Counts rows per table that are legacy Fernet or encrypted under a non-primary key."""
+    primary_key_id = encryption.get_keyring().primary_key_id
+    counts = {}
+    conn = get_connection()
+    cursor = conn.cursor()
+    for table, _, columns in ROTATION_TABLES:
+        # Hashed master passwords are text but never encrypted, so they are excluded
+        conditions = " OR ".join(
+            f"(typeof({column}) = 'text' AND {column} NOT LIKE '$%') "
+            f"OR (typeof({column}) = 'blob' AND substr({column}, 2, 4) != ?)"
+            for column in columns
+        )
+        cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {conditions}", (primary_key_id,) * len(columns))
+        counts[table] = cursor.fetchone()[0]
+    conn.close()
+    return counts
+
+
+def start_rotation():
+    """
+    Generates a new primary key and records a rotation checkpoint.
+
+    The new key is stored through the key provider (old keys kept behind it,
+    so every existing row stays readable) before any row is encrypted with it.
+    Running app processes pick the new key up within
+    encryption.KEY_RELOAD_INTERVAL, or at once when a login or reuse lookup
+    misses because its blind index has already been re-keyed.
+
+    Raises:
+        KeyRotationError: If an unfinished rotation exists; resume it instead
+    """
+    status = get_rotation_status()
+    if status and status["in_progress"]:
+        raise KeyRotationError(
+            f"Rotation to key {status['target_key_id']} is still in progress; resume it first"
+        )
+
+    provider = encryption.get_key_provider()
+    keys = provider.load_keys()
+    try:
+        provider.store_keys([Fernet.generate_key()] + keys)
+    except encryption.KeyProviderError as e:
+        raise KeyRotationError(f"Cannot store a new key: {e}") from e
+    keyring = encryption.reload_keys()
+
+    conn = get_connection()
+    conn.execute("""
+        INSERT OR REPLACE INTO key_rotation_state (id, target_key_id, table_name, last_id, rows_rotated)
+        VALUES (1, ?, ?, 0, 0)
+    """, (keyring.primary_key_id.hex(), ROTATION_TABLES[0][0]))
+    conn.commit()
+    conn.close()
+    print(f"🔑 New primary key {keyring.primary_key_id.hex()} added ({len(keyring.keys)} key(s) in the keyring)")
+    return keyring.primary_key_id.hex()
+
+
+def _rotate_batch(table, rows):
+    """Builds compare-and-set updates for one batch; returns (updates, failed ids)."""
+    updates = []
+    failed = []
+    for row in rows:
+        row_id, values = row[0], row[1:]
+        try:
+            new_values = tuple(_rotate_value(value) for value in values)
+        except Exception as e:
+            print(f"⚠️ Could not re-encrypt {table} row {row_id}: {e}")
+            failed.append(row_id)
+            continue
+        if new_values == values:
+            continue
+        extra = ()
+        if table == "master_account":
+            # Re-key the login blind index along with the username
+            extra = (encryption.blind_index(encryption.decrypt_data(new_values[0])),)
+        elif table == "credentials":
+            # Re-key the reuse fingerprint and signature along with the password
+            extra = reuse_columns(encryption.decrypt_data(new_values[1]))
+        updates.append(new_values + extra + (row_id,) + values)
+    return updates, failed
+
+
+def run_rotation(batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """
+    Re-encrypts every row under the primary key, resuming from the checkpoint.
+
+    Rows are read in id order, batch_size at a time. Each batch's updates and
+    the checkpoint advance are committed in the same transaction, so after a
+    crash the rotation resumes right after the last committed batch. Updates
+    are compare-and-set, so concurrent writes from the running app are never
+    overwritten; rows written under an old key meanwhile are caught by a
+    follow-up pass.
+
+    Returns:
+        Dictionary with rows scanned/rotated, failed row ids, elapsed seconds
+        and throughput
+    """
+    status = get_rotation_status()
+    if not status or not status["in_progress"]:
+        raise KeyRotationError("No rotation in progress; start one first")
+
+    keyring = encryption.reload_keys()
+    if keyring.primary_key_id.hex() != status["target_key_id"]:
+        raise KeyRotationError(
+            f"Primary key {keyring.primary_key_id.hex()} does not match rotation target "
+            f"{status['target_key_id']}; check the key provider"
+        )
+
+    table_names = [table for table, _, _ in ROTATION_TABLES]
+    start_index = table_names.index(status["table_name"])
+    last_id = status["last_id"]
+    result = {"scanned": 0, "rotated": 0}
+    failed_rows = set()
+    start = time.monotonic()
+
+    for rotation_pass in range(MAX_PASSES):
+        for table, id_column, columns in ROTATION_TABLES[start_index:]:
+            column_list = ", ".join(columns)
+            set_list = ", ".join(f"{column} = ?" for column in columns)
+            if table == "master_account":
+                set_list += ", username_index = ?"
+            elif table == "credentials":
+                set_list += ", password_fingerprint = ?, password_minhash = ?"
+            match_list = " AND ".join(f"{column} IS ?" for column in columns)
+
+            while True:
+                batch_start = time.monotonic()
+                conn = get_connection()
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        f"SELECT {id_column}, {column_list} FROM {table} WHERE {id_column} > ? ORDER BY {id_column} LIMIT ?",
+                        (last_id, batch_size)
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    last_id = rows[-1][0]
+
+                    updates, failed = _rotate_batch(table, rows)
+                    rotated = 0
+                    for update in updates:
+                        cursor.execute(
+                            f"UPDATE {table} SET {set_list} WHERE {id_column} = ? AND {match_list}",
+                            update
+                        )
+                        rotated += cursor.rowcount
+                    cursor.execute("""
+                        UPDATE key_rotation_state
+                        SET table_name = ?, last_id = ?, rows_rotated = rows_rotated + ?,
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE id = 1
+                    """, (table, last_id, rotated))
+                    conn.commit()
+                finally:
+                    conn.close()
+
+                result["scanned"] += len(rows)
+                result["rotated"] += rotated
+                failed_rows.update((table, row_id) for row_id in failed)
+                batch_seconds = time.monotonic() - batch_start
+                print(f"🔄 {table}: up to id {last_id}, {len(rows)} scanned, {rotated} rotated "
+                      f"({len(rows) / max(batch_seconds, 1e-9):,.0f} rows/s)")
+                if pause:
+                    time.sleep(pause)
+
+            # Next table starts from the beginning
+            last_id = 0
+            _save_checkpoint(table_names[(table_names.index(table) + 1) % len(table_names)], 0)
+
+        remaining = count_rows_needing_rotation()
+        # Rows that failed to decrypt can never be rotated; don't loop on them
+        if sum(remaining.values()) <= len(failed_rows):
+            break
+        print(f"🔁 {remaining} row(s) were written under an old key during pass {rotation_pass + 1}; rescanning")
+        start_index = 0
+
+    elapsed = time.monotonic() - start
+    result["elapsed_seconds"] = round(elapsed, 2)
+    result["rows_per_second"] = round(result["scanned"] / elapsed, 1) if elapsed else 0.0
+    result["remaining"] = count_rows_needing_rotation()
+    result["failed"] = sorted(failed_rows)
+
+    if not result["failed"] and not any(result["remaining"].values()):
+        conn = get_connection()
+        conn.execute("UPDATE key_rotation_state SET completed_at = CURRENT_TIMESTAMP WHERE id = 1")
+        conn.commit()
+        conn.close()
+    return result
+
+
+def _save_checkpoint(table_name, last_id):
+    """Moves the checkpoint to the start of another table."""
+    conn = get_connection()
+    conn.execute(
+        "UPDATE key_rotation_state SET table_name = ?, last_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = 1",
+        (table_name, last_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+def retire_old_keys():
+    """
+    Removes every non-primary key from the keyring.
+
+    Raises:
+        KeyRotationError: If a rotation is unfinished or rows still need an old key
+    """
+    status = get_rotation_status()
+    if status and status["in_progress"]:
+        raise KeyRotationError("Finish the rotation before retiring old keys")
+    remaining = count_rows_needing_rotation()
+    if any(remaining.values()):
+        raise KeyRotationError(f"Rows still use an old key or the legacy format: {remaining}")
+
+    provider = encryption.get_key_provider()
+    keys = provider.load_keys()
+    try:
+        provider.store_keys(keys[:1])
+    except encryption.KeyProviderError as e:
+        raise KeyRotationError(f"Cannot store the keyring: {e}") from e
+    encryption.reload_keys()
+    return len(keys) - 1
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Rotate the AegisVault encryption key")
+    parser.add_argument("command", choices=["rotate", "resume", "status", "retire"],
+                        help="rotate: add a new key and re-encrypt everything; resume: continue an "
+                             "interrupted rotation; status: show progress; retire: drop old keys")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows re-encrypted per transaction (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Seconds to sleep between batches while the app is running (default: 0)")
+    args = parser.parse_args(argv)
+
+    init_db()
+    try:
+        if args.command == "status":
+            print(f"📋 Rotation: {get_rotation_status()}")
+            print(f"📋 Rows needing re-encryption: {count_rows_needing_rotation()}")
+            print(f"📋 Keys in keyring: {len(encryption.get_keyring().keys)}")
+            return 0
+
+        if args.command == "retire":
+            print(f"✅ Retired {retire_old_keys()} old key(s)")
+            return 0
+
+        if args.command == "rotate":
+            start_rotation()
+
+        result = run_rotation(batch_size=args.batch_size, pause=args.pause)
+        print(f"✅ Scanned {result['scanned']} row(s), re-encrypted {result['rotated']} in "
+              f"{result['elapsed_seconds']}s ({result['rows_per_second']} rows/s)")
+        if result["failed"]:
+            print(f"⚠️ {len(result['failed'])} row(s) could not be decrypted: {result['failed']}")
+            return 1
+        print("💡 Run 'python key_rotation.py retire' to remove the old key once every running app process has picked up the new key")
+        return 0
+    except KeyRotationError as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,8 +1,8 @@
 import os
 import threading
 from database import (
-    store_password, retrieve_password, store_master_account, load_master_account,
-    delete_password, update_password, init_db, get_all_stored_urls
+    store_password, retrieve_password, create_master_account, load_master_account,
+    verify_master_account, delete_password, update_password, init_db, get_all_stored_urls
 )
 from encryption import encrypt_data  # Remove generate_key import
 from session import SessionManager, session_expire_event
@@ -39,20 +39,20 @@ def startup_menu():
 
 def login():
     """Handles master account authentication and session start."""
-    stored_username, stored_password = load_master_account()
+    stored_username, _ = load_master_account()
 
     if not stored_username:
         print("No master account found. Let's create one.")
         username = input("Enter a master username: ")
         password = input("Enter a secure password: ")
-        store_master_account(username, password)
+        create_master_account(username, password)
         print("✅ Master account created successfully!")
         return startup_menu()
 
     entered_username = input("Enter master username: ")
     entered_password = input("Enter master password: ")
 
-    if entered_username == stored_username and entered_password == stored_password:
+    if verify_master_account(entered_username, entered_password):
         print("✅ Login successful! Starting session...")
         session.start_session(entered_username)  # ✅ Start session tracking
         main_menu()  # ✅ Transition to main menu
@@ -128,8 +128,7 @@ def update_credentials():
 
 def main_menu():
     """Displays main menu options and starts session monitoring."""
-    session.start_session("master_user")  # ✅ Ensure session starts properly
-    threading.Thread(target=session.monitor_session, daemon=True).start()  # ✅ Call it from SessionManager
+    session.start_session("master_user")  # ✅ Ensure session starts properly; expiry runs on the shared scheduler
 
     while session.validate_session():
         print("\n🔐 AegisVault - Secure Password Manager")
@@ -159,13 +158,11 @@ def main_menu():
 def logout():
     """Ends session cleanly without triggering an undefined event."""
     print("\n🔒 Logging out and exiting securely...")
-    session.active = False  # ✅ Stop session tracking
+    session.end_session()  # ✅ Stop session tracking and wipe cached secrets
 
     if 'session_expire_event' in globals():  # ✅ Avoid errors if it's missing
         session_expire_event.set()  # ✅ Signal expiration safely
 
-    session.expire_session()  # ✅ Cleanly end session
-
 def check_session():
     """Handles expired sessions and returns to startup menu if needed."""
     if not session.validate_session():
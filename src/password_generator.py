@@ -3,10 +3,15 @@ import string
 import re
 from typing import Dict, List, Optional
 
+from password_strength import PasswordStrengthAnalyzer
+
 class PasswordGenerator:
     """Secure password generator with customizable options."""
     
     def __init__(self):
+        # Entropy is reported exactly as the strength meter computes it
+        self.strength_analyzer = PasswordStrengthAnalyzer()
+
         # Character sets
         self.LOWERCASE = string.ascii_lowercase
         self.UPPERCASE = string.ascii_uppercase
@@ -256,11 +261,8 @@ class PasswordGenerator:
             'symbols': bool(re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]', password))
         }
         
-        # Calculate entropy
-        charset_size = sum(char_sets_used.values()) * 26  # Approximate
-        if charset_size == 0:
-            charset_size = 95  # Basic ASCII
-        entropy = length * (2 ** charset_size).bit_length()
+        # length * log2(charset size), from the analyzer's table
+        entropy = self.strength_analyzer.summarize_password(password)['entropy']
         
         return {
             'length': length,
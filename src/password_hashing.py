@@ -0,0 +1,224 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Supported algorithms and their default work factors
+SCRYPT = "scrypt"
+PBKDF2_SHA256 = "pbkdf2-sha256"
+
+DEFAULT_ALGORITHM = SCRYPT
+DEFAULT_SCRYPT_LOG_N = 15  # N = 2^15, ~32 MB with r=8
+DEFAULT_SCRYPT_R = 8
+DEFAULT_SCRYPT_P = 1
+DEFAULT_PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class PasswordHasher:
+    """
+    One-way password hashing for master account passwords.
+
+    Hashes are stored in a self-describing PHC-style string, for example
+    ``$scrypt$ln=15,r=8,p=1$<salt>$<hash>`` or
+    ``$pbkdf2-sha256$i=600000$<salt>$<hash>``, so the work factor can be
+    raised at any time: old hashes still verify and needs_rehash() reports
+    which ones should be upgraded on the next successful login.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM,
+                 scrypt_log_n: int = DEFAULT_SCRYPT_LOG_N,
+                 scrypt_r: int = DEFAULT_SCRYPT_R,
+                 scrypt_p: int = DEFAULT_SCRYPT_P,
+                 pbkdf2_iterations: int = DEFAULT_PBKDF2_ITERATIONS):
+        if algorithm not in (SCRYPT, PBKDF2_SHA256):
+            raise ValueError(f"Unsupported password hashing algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.scrypt_log_n = scrypt_log_n
+        self.scrypt_r = scrypt_r
+        self.scrypt_p = scrypt_p
+        self.pbkdf2_iterations = pbkdf2_iterations
+
+    @classmethod
+    def from_environment(cls) -> "PasswordHasher":
+        """
+        Build a hasher from AEGISVAULT_KDF, AEGISVAULT_SCRYPT_LOG_N,
+        AEGISVAULT_SCRYPT_R, AEGISVAULT_SCRYPT_P and AEGISVAULT_PBKDF2_ITERATIONS.
+        """
+        env = os.environ
+        return cls(
+            algorithm=env.get("AEGISVAULT_KDF", DEFAULT_ALGORITHM),
+            scrypt_log_n=int(env.get("AEGISVAULT_SCRYPT_LOG_N", DEFAULT_SCRYPT_LOG_N)),
+            scrypt_r=int(env.get("AEGISVAULT_SCRYPT_R", DEFAULT_SCRYPT_R)),
+            scrypt_p=int(env.get("AEGISVAULT_SCRYPT_P", DEFAULT_SCRYPT_P)),
+            pbkdf2_iterations=int(env.get("AEGISVAULT_PBKDF2_ITERATIONS", DEFAULT_PBKDF2_ITERATIONS)),
+        )
+
+    def hash(self, password: str) -> str:
+        """Hash a password with a fresh random salt using the configured parameters."""
+        salt = secrets.token_bytes(SALT_BYTES)
+        if self.algorithm == SCRYPT:
+            params = {"ln": self.scrypt_log_n, "r": self.scrypt_r, "p": self.scrypt_p}
+        else:
+            params = {"i": self.pbkdf2_iterations}
+        digest = _derive(self.algorithm, password, salt, params)
+        param_text = ",".join(f"{name}={value}" for name, value in params.items())
+        return f"${self.algorithm}${param_text}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        """Check a password against a stored hash in constant time."""
+        try:
+            algorithm, params, salt, expected = _parse(encoded)
+        except ValueError:
+            return False
+        digest = _derive(algorithm, password, salt, params, length=len(expected))
+        return hmac.compare_digest(digest, expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """Whether a stored hash uses different parameters than this hasher."""
+        try:
+            algorithm, params, _, _ = _parse(encoded)
+        except ValueError:
+            return True
+        if algorithm != self.algorithm:
+            return True
+        if algorithm == SCRYPT:
+            return params != {"ln": self.scrypt_log_n, "r": self.scrypt_r, "p": self.scrypt_p}
+        return params != {"i": self.pbkdf2_iterations}
+
+    @staticmethod
+    def is_hash(value) -> bool:
+        """Whether a stored value is a password hash (as opposed to legacy ciphertext)."""
+        return isinstance(value, str) and value.startswith((f"${SCRYPT}$", f"${PBKDF2_SHA256}$"))
+
+
+def _parse(encoded: str):
+    """Split an encoded hash into (algorithm, params, salt, digest)."""
+    if not isinstance(encoded, str):
+        raise ValueError("Password hash must be a string")
+    parts = encoded.split("$")
+    if len(parts) != 5 or parts[0] != "" or parts[1] not in (SCRYPT, PBKDF2_SHA256):
+        raise ValueError("Malformed password hash")
+    try:
+        params = {
+            name: int(value)
+            for name, value in (item.split("=", 1) for item in parts[2].split(","))
+        }
+        return parts[1], params, _b64decode(parts[3]), _b64decode(parts[4])
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed password hash") from e
+
+
+def _derive(algorithm: str, password: str, salt: bytes, params: Dict[str, int],
+            length: int = HASH_BYTES) -> bytes:
+    """Run the key derivation function for the given parameters."""
+    if algorithm == SCRYPT:
+        n = 1 << params["ln"]
+        r, p = params["r"], params["p"]
+        # hashlib's default maxmem (32 MB) is too small for r=8, N=2^15
+        maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=maxmem, dklen=length)
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, params["i"], dklen=length)
+
+
+# Shared hasher configured from the environment
+_default_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide hasher, configured from the environment on first use."""
+    global _default_hasher
+    if _default_hasher is None:
+        _default_hasher = PasswordHasher.from_environment()
+    return _default_hasher
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with the process-wide hasher."""
+    return get_password_hasher().hash(password)
+
+
+def _time_hash(hasher: PasswordHasher, rounds: int) -> float:
+    """Average seconds per hash for a hasher."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        hasher.hash("benchmark-password")
+    return (time.perf_counter() - start) / rounds
+
+
+def calibrate(algorithm: str = DEFAULT_ALGORITHM, target_ms: float = 250.0,
+              rounds: int = 3) -> List[Dict]:
+    """
+    Measure hashing time for increasing work factors.
+
+    Returns one row per tested cost with the measured milliseconds per hash and
+    the resulting single-core login throughput. Stops at the first cost that
+    exceeds target_ms.
+    """
+    results = []
+    if algorithm == SCRYPT:
+        costs = range(12, 21)
+        make = lambda cost: PasswordHasher(SCRYPT, scrypt_log_n=cost)
+    else:
+        costs = [100000, 200000, 400000, 600000, 800000, 1200000, 1600000, 2400000]
+        make = lambda cost: PasswordHasher(PBKDF2_SHA256, pbkdf2_iterations=cost)
+
+    for cost in costs:
+        seconds = _time_hash(make(cost), rounds)
+        results.append({
+            "cost": cost,
+            "ms_per_hash": round(seconds * 1000, 1),
+            "logins_per_second_per_core": round(1 / seconds, 1),
+        })
+        if seconds * 1000 > target_ms:
+            break
+    return results
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark and calibrate the master password KDF cost")
+    parser.add_argument("--algorithm", choices=[SCRYPT, PBKDF2_SHA256], default=DEFAULT_ALGORITHM,
+                        help=f"KDF to benchmark (default: {DEFAULT_ALGORITHM})")
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="Maximum acceptable time per login hash in milliseconds (default: 250)")
+    parser.add_argument("--rounds", type=int, default=3, help="Hashes per measurement (default: 3)")
+    args = parser.parse_args(argv)
+
+    cost_name = "log2(N)" if args.algorithm == SCRYPT else "iterations"
+    print(f"⏱️ Calibrating {args.algorithm} against a {args.target_ms:.0f} ms budget...\n")
+    print(f"{cost_name:>12} | {'ms/hash':>9} | {'logins/s/core':>13}")
+    print("-" * 42)
+
+    results = calibrate(args.algorithm, args.target_ms, args.rounds)
+    for row in results:
+        print(f"{row['cost']:>12} | {row['ms_per_hash']:>9} | {row['logins_per_second_per_core']:>13}")
+
+    within_budget = [row for row in results if row["ms_per_hash"] <= args.target_ms]
+    if not within_budget:
+        print("\n⚠️ Even the lowest cost exceeds the budget on this machine.")
+        return 1
+
+    best = within_budget[-1]
+    env_name = "AEGISVAULT_SCRYPT_LOG_N" if args.algorithm == SCRYPT else "AEGISVAULT_PBKDF2_ITERATIONS"
+    print(f"\n✅ Recommended: AEGISVAULT_KDF={args.algorithm} {env_name}={best['cost']}")
+    print("   Existing hashes are upgraded automatically on the next successful login.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,99 @@
+import hashlib
+import hmac
+import os
+import struct
+
+from encryption import blind_index_key
+
+# MinHash signature length (32-bit values) and LSH banding: two passwords become
+# near-duplicate candidates when all BAND_ROWS values of any band agree. Three
+# rows keep unrelated passwords, which share a few common bigrams, from
+# flooding the candidate list; the last NUM_PERMUTATIONS % BAND_ROWS values
+# only count towards the similarity
+NUM_PERMUTATIONS = 32
+BAND_ROWS = 3
+NUM_BANDS = NUM_PERMUTATIONS // BAND_ROWS
+BAND_BYTES = BAND_ROWS * 4
+# Candidates whose signatures agree on at least this fraction of values are reported
+NEAR_DUPLICATE_THRESHOLD = 0.5
+
+_SIGNATURE = struct.Struct(f">{NUM_PERMUTATIONS}I")
+# 64-byte BLAKE2b outputs needed to give every shingle NUM_PERMUTATIONS 32-bit hash values
+_HASH_BLOCKS = -(-_SIGNATURE.size // 64)
+
+# blind-index key -> (fingerprint HMAC, MinHash hashers), keyed and ready to copy; one entry per loaded key
+_reuse_keys = {}
+
+
+def near_duplicate_index_enabled():
+    """Whether MinHash signatures are kept (set AEGISVAULT_NEAR_DUPLICATE_INDEX=0 to turn them off)."""
+    return os.environ.get("AEGISVAULT_NEAR_DUPLICATE_INDEX", "1") != "0"
+
+
+def _keys():
+    """
+    Subkeys derived from the primary blind-index key.
+
+    Both fingerprints and signatures are keyed, so without the vault key they
+    cannot be matched against guessed passwords; they are re-keyed along with
+    the data by key rotation.
+    """
+    blind_key = blind_index_key()
+    keys = _reuse_keys.get(blind_key)
+    if keys is None:
+        fingerprint_key = hmac.new(blind_key, b"aegisvault-password-fingerprint-v1", hashlib.sha256).digest()
+        minhash_key = hmac.new(blind_key, b"aegisvault-password-minhash-v1", hashlib.sha256).digest()
+        keys = _reuse_keys[blind_key] = (
+            hmac.new(fingerprint_key, digestmod=hashlib.sha256),
+            [hashlib.blake2b(key=minhash_key, salt=bytes([block])) for block in range(_HASH_BLOCKS)],
+        )
+    return keys
+
+
+def password_fingerprint(password):
+    """Keyed HMAC-SHA256 of a password; equal passwords have equal fingerprints."""
+    fingerprint = _keys()[0].copy()
+    fingerprint.update(password.encode("utf-8", "surrogatepass"))
+    return fingerprint.hexdigest()
+
+
+def _shingles(password):
+    """Case-folded character bigrams, with start and end markers so short passwords still have some."""
+    marked = "\x02" + password.lower() + "\x03"
+    return {marked[i:i + 2] for i in range(len(marked) - 1)}
+
+
+def minhash_signature(password):
+    """
+    Keyed MinHash signature of a password's character bigrams (NUM_PERMUTATIONS * 4 bytes).
+
+    The fraction of positions two signatures agree on estimates the Jaccard
+    similarity of the passwords' bigram sets, e.g. about 0.7 for
+    Summer2024! and Summer2025!. Each of the NUM_PERMUTATIONS hash
+    functions is one 32-bit word of a keyed BLAKE2b output, so a shingle
+    costs _HASH_BLOCKS hash calls and the minimums are taken column-wise
+    (the empty password still has one shingle, its two markers).
+    """
+    hashers = _keys()[1]
+    rows = []
+    for shingle in _shingles(password):
+        data = shingle.encode("utf-8", "surrogatepass")
+        digest = b""
+        for hasher in hashers:
+            block = hasher.copy()
+            block.update(data)
+            digest += block.digest()
+        rows.append(_SIGNATURE.unpack_from(digest))
+    return _SIGNATURE.pack(*[min(column) for column in zip(*rows)])
+
+
+def signature_similarity(signature, other):
+    """Estimated Jaccard similarity of the passwords behind two signatures (0.0-1.0)."""
+    agreeing = sum(1 for a, b in zip(_SIGNATURE.unpack(signature), _SIGNATURE.unpack(other)) if a == b)
+    return agreeing / NUM_PERMUTATIONS
+
+
+def reuse_columns(password):
+    """Returns the (password_fingerprint, password_minhash) column values for a password."""
+    signature = minhash_signature(password) if near_duplicate_index_enabled() else None
+    return password_fingerprint(password), signature
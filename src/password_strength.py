@@ -1,16 +1,892 @@
 import re
 import math
-from typing import Dict, List, Tuple
+import string
+import datetime
+import threading
+from array import array
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; analyze_many falls back to pure Python
+    np = None
+
+_LOWERCASE_CHARS = frozenset(string.ascii_lowercase)
+_UPPERCASE_CHARS = frozenset(string.ascii_uppercase)
+_ASCII_DIGITS = frozenset(string.digits)
+_SYMBOL_CHARS = frozenset('!@#$%^&*()_+-=[]{}|;:,.<>?')
+# Runs of 3+ identical characters; a match of 4+ is a "heavy" repeat
+_REPEAT_RE = re.compile(r'(.)\1{2,}')
+_COMMON_PATTERN_RE = re.compile(r'123|abc|qwe|asd|password')
+
+# Bits of StrengthColumns.charsets
+CHARSET_LOWERCASE = 1
+CHARSET_UPPERCASE = 2
+CHARSET_DIGITS = 4
+CHARSET_SYMBOLS = 8
+
+# Indexed by StrengthColumns.levels
+STRENGTH_LEVELS = ('Very Weak', 'Weak', 'Moderate', 'Strong', 'Very Strong')
+_LEVEL_THRESHOLDS = (20, 40, 60, 80)
+
+# Passwords scored per vectorized step of analyze_many
+ANALYZE_MANY_CHUNK_SIZE = 65536
+
+# Highest score a password found in the breached-password filter can get ('Very Weak')
+BREACHED_MAX_SCORE = 10
+
+
+class PasswordFeatures(NamedTuple):
+    """Everything the scorers need to know about a password, extracted once."""
+
+    length: int
+    unique_chars: int
+    has_lower: bool
+    has_upper: bool
+    has_digit: bool
+    has_symbol: bool
+    has_repeat: bool        # A character repeated 3+ times in a row
+    has_heavy_repeat: bool  # A character repeated 4+ times in a row
+    has_common_pattern: bool
+    lowered: str
+
+
+def extract_features(password: str) -> PasswordFeatures:
+    """
+    Scans a password once and returns its PasswordFeatures.
+
+    Character classes are tested against the password's set of distinct
+    characters instead of running one regex per class.
+    """
+    chars = set(password)
+    has_digit = not chars.isdisjoint(_ASCII_DIGITS)
+    if not has_digit and not password.isascii():
+        # \d also matches non-ASCII decimal digits
+        has_digit = any(char.isdecimal() for char in chars)
+
+    longest_repeat = 0
+    if _REPEAT_RE.search(password):  # Most passwords have no runs at all
+        for match in _REPEAT_RE.finditer(password):
+            longest_repeat = max(longest_repeat, match.end() - match.start())
+
+    lowered = password.lower()
+    # Positional arguments in field order (length, unique_chars, has_lower, ...); keywords are slower
+    return PasswordFeatures(
+        len(password),
+        len(chars),
+        not chars.isdisjoint(_LOWERCASE_CHARS),
+        not chars.isdisjoint(_UPPERCASE_CHARS),
+        has_digit,
+        not chars.isdisjoint(_SYMBOL_CHARS),
+        longest_repeat >= 3,
+        longest_repeat >= 4,
+        _COMMON_PATTERN_RE.search(lowered) is not None,
+        lowered,
+    )
+
+
+def _ascii_charset_table():
+    """CHARSET_* bits of each ASCII code point, as a NumPy lookup table."""
+    table = np.zeros(128, np.uint8)
+    for chars, bit in ((_LOWERCASE_CHARS, CHARSET_LOWERCASE), (_UPPERCASE_CHARS, CHARSET_UPPERCASE),
+                       (_ASCII_DIGITS, CHARSET_DIGITS), (_SYMBOL_CHARS, CHARSET_SYMBOLS)):
+        table[[ord(char) for char in chars]] |= bit
+    return table
+
+
+def _charset_mask(features: PasswordFeatures) -> int:
+    return (features.has_lower * CHARSET_LOWERCASE | features.has_upper * CHARSET_UPPERCASE
+            | features.has_digit * CHARSET_DIGITS | features.has_symbol * CHARSET_SYMBOLS)
+
+
+class StrengthColumns:
+    """
+    Columnar strength results from analyze_many, one position per password.
+
+    scores: 0-100 strength scores
+    levels: indexes into STRENGTH_LEVELS
+    entropy: bits, rounded like analyze_password
+    charsets: CHARSET_* bitmasks of the character sets used
+    breached: 1 if the password is in the breached-password filter, or None
+        when the analyzer has no filter
+
+    Columns are NumPy arrays when NumPy is installed, otherwise array.array.
+    No plaintext is kept.
+    """
+
+    __slots__ = ("scores", "levels", "entropy", "charsets", "breached")
+
+    def __init__(self, scores, levels, entropy, charsets, breached=None):
+        self.scores = scores
+        self.levels = levels
+        self.entropy = entropy
+        self.charsets = charsets
+        self.breached = breached
+
+    def __len__(self):
+        return len(self.scores)
+
+    def level_name(self, index: int) -> str:
+        return STRENGTH_LEVELS[self.levels[index]]
+
+    def level_counts(self) -> Dict[str, int]:
+        """Number of passwords per strength level."""
+        counts = [0] * len(STRENGTH_LEVELS)
+        if np is not None and isinstance(self.levels, np.ndarray):
+            counts = np.bincount(self.levels, minlength=len(STRENGTH_LEVELS)).tolist()
+        else:
+            for level in self.levels:
+                counts[level] += 1
+        return dict(zip(STRENGTH_LEVELS, counts))
+
+    def rows(self):
+        """Yields (strength_score, strength_level, entropy, breached) per password, as persisted in credentials."""
+        breached = self.breached if self.breached is not None else [None] * len(self)
+        for score, level, entropy, hit in zip(self.scores, self.levels, self.entropy, breached):
+            yield int(score), STRENGTH_LEVELS[level], float(entropy), None if hit is None else int(hit)
+
+
+class PatternMatch(NamedTuple):
+    """A predictable part of a password found by one of the pattern matchers."""
+
+    pattern: str   # dictionary, spatial, sequence, repeat, date or bruteforce
+    i: int         # Index of the first character
+    j: int         # Index of the last character (inclusive)
+    token: str
+    guesses: float
+    info: Optional[Dict] = None  # Pattern-specific details (matched word, graph, year, ...)
+
+    def to_dict(self) -> Dict:
+        result = {
+            'pattern': self.pattern,
+            'token': self.token,
+            'i': self.i,
+            'j': self.j,
+            'guesses_log10': round(math.log10(max(self.guesses, 1)), 2),
+        }
+        if self.info:
+            result.update(self.info)
+        return result
+
+
+def _adjacency_graph(rows, slanted):
+    """
+    Maps every character on a keyboard layout to {neighbor character: direction}.
+
+    rows lists each row's keys from left to right (None for a gap); a key is
+    the characters it types, unshifted first. On a slanted keyboard each row
+    sits half a key to the right of the row above, so keys have six
+    neighbors; on a keypad they have eight.
+    """
+    if slanted:
+        deltas = ((-1, 0), (0, -1), (1, -1), (1, 0), (0, 1), (-1, 1))
+    else:
+        deltas = ((-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1))
+    positions = {(x, y): key for y, row in enumerate(rows) for x, key in enumerate(row) if key}
+
+    graph = {}
+    degrees = 0
+    for (x, y), key in positions.items():
+        neighbors = {}
+        for direction, (dx, dy) in enumerate(deltas):
+            other = positions.get((x + dx, y + dy))
+            if other:
+                degrees += 1
+                for char in other:
+                    neighbors[char] = direction
+        for char in key:
+            graph[char] = neighbors
+    return graph, degrees / len(positions)
+
+
+# name -> (rows, slanted); qwerty keys are (unshifted, shifted) pairs
+KEYBOARD_LAYOUTS = {
+    'qwerty': ((
+        "`~ 1! 2@ 3# 4$ 5% 6^ 7& 8* 9( 0) -_ =+".split(),
+        [None] + "qQ wW eE rR tT yY uU iI oO pP [{ ]} \\|".split(),
+        [None] + "aA sS dD fF gG hH jJ kK lL ;: '\"".split(),
+        [None] + "zZ xX cC vV bB nN mM ,< .> /?".split(),
+    ), True),
+    'keypad': ((
+        [None, "/", "*", "-"],
+        ["7", "8", "9", "+"],
+        ["4", "5", "6"],
+        ["1", "2", "3"],
+        [None, "0", "."],
+    ), False),
+}
+
+# l33t-speak substitutes for each letter
+L33T_TABLE = {
+    'a': '4@', 'b': '8', 'c': '({[<', 'e': '3', 'g': '69', 'i': '1!|',
+    'l': '1|7', 'o': '0', 's': '$5', 't': '+7', 'x': '%', 'z': '2',
+}
+
+
+def _l33t_letters():
+    """The inverse of L33T_TABLE: each l33t character -> the letters it can stand for."""
+    letters = {}
+    for letter, subs in L33T_TABLE.items():
+        for sub in subs:
+            letters[sub] = letters.get(sub, '') + letter
+    return letters
+
+
+_L33T_LETTERS = _l33t_letters()
+
+# Ranked word lists, most common first; a word's rank is its guess count
+PASSWORD_DICTIONARIES = {
+    'passwords': (
+        '123456', 'password', '12345678', 'qwerty', '123456789', '12345', '1234', '111111',
+        '1234567', 'dragon', '123123', 'baseball', 'abc123', 'football', 'monkey', 'letmein',
+        'shadow', 'master', '666666', 'qwertyuiop', '123321', 'mustang', '1234567890', 'michael',
+        '654321', 'superman', '1qaz2wsx', '7777777', '121212', '000000', 'qazwsx', '123qwe',
+        'killer', 'trustno1', 'jordan', 'jennifer', 'zxcvbnm', 'asdfgh', 'hunter', 'buster',
+        'soccer', 'harley', 'batman', 'andrew', 'tigger', 'sunshine', 'iloveyou', 'charlie',
+        'robert', 'thomas', 'hockey', 'ranger', 'daniel', 'starwars', '112233', 'george',
+        'computer', 'michelle', 'jessica', 'pepper', '1111', 'zxcvbn', '555555', '11111111',
+        '131313', 'freedom', '777777', 'pass', 'maggie', '159753', 'aaaaaa', 'ginger',
+        'princess', 'joshua', 'cheese', 'amanda', 'summer', 'love', 'ashley', 'nicole',
+        'chelsea', 'biteme', 'matthew', 'access', 'yankees', '987654321', 'dallas', 'austin',
+        'thunder', 'taylor', 'matrix', 'william', 'corvette', 'hello', 'martin', 'heather',
+        'secret', 'merlin', 'diamond', '1234qwer', 'hammer', 'silver', '222222', '88888888',
+        'anthony', 'justin', 'test', 'bailey', 'q1w2e3r4t5', 'patrick', 'internet', 'scooter',
+        'orange', '11111', 'golfer', 'cookie', 'richard', 'samantha', 'bigdog', 'guitar',
+        'jackson', 'whatever', 'mickey', 'chicken', 'sparky', 'snoopy', 'maverick', 'phoenix',
+        'camaro', 'peanut', 'morgan', 'welcome', 'falcon', 'cowboy', 'ferrari', 'samsung',
+        'andrea', 'smokey', 'steelers', 'joseph', 'mercedes', 'dakota', 'arsenal', 'eagles',
+        'melissa', 'boomer', 'booboo', 'spider', 'nascar', 'monster', 'tigers', 'yellow',
+        'xxxxxx', '123123123', 'gateway', 'marina', 'diablo', 'bulldog', 'qwer1234', 'compaq',
+        'purple', 'banana', 'junior', 'hannah', '123654', 'porsche', 'lakers', 'iceman',
+        'money', 'cowboys', '987654', 'london', 'tennis', '999999', 'ncc1701', 'coffee',
+        'scooby', '0000', 'miller', 'boston', 'q1w2e3r4', 'brandon', 'yamaha', 'chester',
+        'mother', 'forever', 'johnny', 'edward', '333333', 'oliver', 'redsox', 'player',
+        'nikita', 'knight', 'fender', 'barney', 'midnight', 'please', 'brandy', 'chicago',
+        'badboy', 'slayer', 'rangers', 'charles', 'angel', 'flower', 'bigdaddy', 'rabbit',
+        'wizard', 'jasper', 'enter', 'rachel', 'chris', 'steven', 'winner', 'adidas',
+        'victoria', 'natasha', '1q2w3e4r', 'jasmine', 'winter', 'prince', 'marine', 'fishing',
+        'cocacola', 'casper', 'james', '232323', 'raiders', '888888', 'marlboro', 'gandalf',
+        'asdfasdf', 'crystal', '87654321', '12344321', 'golf', 'heaven', 'passw0rd', 'admin',
+        'login', 'qwerty123', 'password1', 'welcome1', 'abc', 'qwe', 'asd', 'default',
+        'changeme', 'letmein1', 'master1', 'dragon1', 'monkey1', 'shadow1', 'sunshine1',
+    ),
+    'english': (
+        'the', 'and', 'that', 'have', 'for', 'not', 'with', 'you', 'this', 'but', 'his',
+        'from', 'they', 'say', 'her', 'she', 'will', 'one', 'all', 'would', 'there', 'their',
+        'what', 'out', 'about', 'who', 'get', 'which', 'when', 'make', 'can', 'like', 'time',
+        'just', 'him', 'know', 'take', 'people', 'into', 'year', 'your', 'good', 'some',
+        'could', 'them', 'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its',
+        'over', 'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our', 'work', 'first',
+        'well', 'way', 'even', 'new', 'want', 'because', 'any', 'these', 'give', 'day', 'most',
+        'man', 'world', 'life', 'home', 'house', 'family', 'friend', 'school', 'water', 'money',
+        'night', 'light', 'heart', 'happy', 'lucky', 'magic', 'power', 'music', 'dream',
+        'star', 'moon', 'sun', 'fire', 'ice', 'snow', 'rain', 'storm', 'thunder', 'river',
+        'ocean', 'sea', 'blue', 'red', 'green', 'black', 'white', 'gold', 'silver', 'purple',
+        'pink', 'orange', 'apple', 'banana', 'cherry', 'lemon', 'peach', 'candy', 'sugar',
+        'honey', 'baby', 'angel', 'devil', 'god', 'jesus', 'king', 'queen', 'prince',
+        'princess', 'lady', 'boy', 'girl', 'love', 'lover', 'kiss', 'sweet', 'cute', 'pretty',
+        'cool', 'super', 'crazy', 'hello', 'welcome', 'secret', 'private', 'hidden', 'open',
+        'door', 'key', 'lock', 'safe', 'guard', 'shield', 'sword', 'knight', 'dragon',
+        'tiger', 'lion', 'eagle', 'falcon', 'wolf', 'bear', 'fox', 'horse', 'monkey',
+        'dog', 'cat', 'kitty', 'puppy', 'bird', 'fish', 'shark', 'snake', 'spider', 'rabbit',
+        'turtle', 'spring', 'summer', 'autumn', 'fall', 'winter', 'january', 'february',
+        'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+        'november', 'december', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday',
+        'saturday', 'sunday', 'today', 'tomorrow', 'forever', 'always', 'never', 'freedom',
+        'peace', 'hope', 'faith', 'trust', 'truth', 'change', 'horse', 'battery', 'staple',
+        'correct', 'computer', 'internet', 'google', 'facebook', 'email', 'phone', 'game',
+        'player', 'soccer', 'football', 'baseball', 'hockey', 'tennis', 'golf', 'master',
+        'admin', 'user', 'guest', 'login', 'access', 'pass', 'word', 'test', 'demo', 'system',
+        'server', 'network', 'office', 'company', 'vault', 'aegis',
+    ),
+    'names': (
+        'james', 'john', 'robert', 'michael', 'william', 'david', 'richard', 'joseph',
+        'thomas', 'charles', 'daniel', 'matthew', 'anthony', 'mark', 'donald', 'steven',
+        'paul', 'andrew', 'joshua', 'kevin', 'brian', 'george', 'edward', 'ronald', 'timothy',
+        'jason', 'jeffrey', 'ryan', 'jacob', 'gary', 'nicholas', 'eric', 'jonathan', 'stephen',
+        'larry', 'justin', 'scott', 'brandon', 'benjamin', 'samuel', 'frank', 'gregory',
+        'alexander', 'patrick', 'jack', 'dennis', 'jerry', 'tyler', 'aaron', 'henry',
+        'mary', 'patricia', 'jennifer', 'linda', 'elizabeth', 'barbara', 'susan', 'jessica',
+        'sarah', 'karen', 'nancy', 'lisa', 'betty', 'margaret', 'sandra', 'ashley', 'kimberly',
+        'emily', 'donna', 'michelle', 'dorothy', 'carol', 'amanda', 'melissa', 'deborah',
+        'stephanie', 'rebecca', 'sharon', 'laura', 'cynthia', 'kathleen', 'amy', 'shirley',
+        'angela', 'helen', 'anna', 'brenda', 'pamela', 'nicole', 'emma', 'samantha',
+        'katherine', 'christine', 'debra', 'rachel', 'olivia', 'sophia', 'alice', 'bob',
+        'smith', 'johnson', 'williams', 'brown', 'jones', 'garcia', 'miller', 'davis',
+        'rodriguez', 'martinez', 'hernandez', 'lopez', 'wilson', 'anderson', 'taylor',
+        'moore', 'jackson', 'martin', 'lee', 'thompson', 'white', 'harris', 'clark', 'lewis',
+    ),
+}
+
+DATE_MIN_YEAR = 1000
+DATE_MAX_YEAR = 2050
+# Years this close to the reference year are guessed first
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = datetime.date.today().year
+# (day|month|year) split points tried for unseparated digit runs of each length
+_DATE_SPLITS = {
+    4: ((1, 2), (2, 3)),
+    5: ((1, 3), (2, 3)),
+    6: ((1, 2), (2, 4), (4, 5)),
+    7: ((1, 3), (2, 3), (4, 5), (4, 6)),
+    8: ((2, 4), (4, 6)),
+}
+_DATE_SEPARATED_RE = re.compile(r'(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})', re.ASCII)
+_ASCII_DIGIT_RUN_RE = re.compile(r'[0-9]{4,}')
+_RECENT_YEAR_RE = re.compile(r'19\d\d|20[0-4]\d', re.ASCII)
+
+_REPEAT_GREEDY_RE = re.compile(r'(.+)\1+')
+_REPEAT_LAZY_RE = re.compile(r'(.+?)\1+')
+
+# Sequences whose characters step by more than this are not treated as sequences
+SEQUENCE_MAX_DELTA = 5
+# Longer passwords are estimated in blocks of at most this many characters (see estimate_guesses)
+PATTERN_MATCH_MAX_LENGTH = 64
+# Only this many leading characters are pattern matched; the rest is costed as brute force
+PATTERN_MATCH_INPUT_LIMIT = 100
+# Floors on the guesses of a match that covers only part of the password
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+# Each extra match in a sequence must save at least this factor of guesses
+_LOG10_MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 4.0
+_LOG10_FACTORIAL = [math.lgamma(count + 1) / math.log(10) for count in range(PATTERN_MATCH_MAX_LENGTH + 1)]
+
+
+def _log10_add(a: float, b: float) -> float:
+    """log10(10 ** a + 10 ** b) without leaving log space."""
+    if a < b:
+        a, b = b, a
+    return a + math.log10(1 + 10 ** (b - a))
+
+
+def _uppercase_variations(token: str) -> int:
+    """How many ways the letters of token could have been capitalized."""
+    upper = sum(1 for char in token if char.isupper())
+    if not upper:
+        return 1
+    lower = sum(1 for char in token if char.islower())
+    # Capitalized first letter, capitalized last letter, or all caps
+    if not lower or (upper == 1 and (token[0].isupper() or token[-1].isupper())):
+        return 2
+    return sum(math.comb(upper + lower, k) for k in range(1, min(upper, lower) + 1))
+
+
+def _l33t_variations(token: str, subs) -> int:
+    """How many ways the l33t substitutions in subs could have been applied to token."""
+    variations = 1
+    lowered = token.lower()
+    for subbed, letter in subs:
+        subbed_count = lowered.count(subbed)
+        letter_count = lowered.count(letter)
+        if not subbed_count or not letter_count:
+            variations *= 2
+        else:
+            variations *= sum(math.comb(subbed_count + letter_count, k)
+                              for k in range(1, min(subbed_count, letter_count) + 1))
+    return variations
+
+
+def _ints_to_day_month(first: int, second: int):
+    for day, month in ((first, second), (second, first)):
+        if 1 <= day <= 31 and 1 <= month <= 12:
+            return day, month
+    return None
+
+
+def _ints_to_date(ints):
+    """(year, month, day) for three integers read as some order of a date, or None."""
+    if ints[1] > 31 or ints[1] <= 0:
+        return None
+    over_12 = over_31 = under_1 = 0
+    for value in ints:
+        if 99 < value < DATE_MIN_YEAR or value > DATE_MAX_YEAR:
+            return None
+        over_31 += value > 31
+        over_12 += value > 12
+        under_1 += value <= 0
+    if over_31 >= 2 or over_12 == 3 or under_1 >= 2:
+        return None
+
+    year_splits = ((ints[2], ints[0], ints[1]), (ints[0], ints[1], ints[2]))
+    for year, first, second in year_splits:
+        if DATE_MIN_YEAR <= year <= DATE_MAX_YEAR:
+            day_month = _ints_to_day_month(first, second)
+            return (year, day_month[1], day_month[0]) if day_month else None
+    for year, first, second in year_splits:
+        day_month = _ints_to_day_month(first, second)
+        if day_month:
+            # Two-digit year
+            year = year + 1900 if year > 50 else year + 2000
+            return year, day_month[1], day_month[0]
+    return None
+
+
+def _year_guesses(year: int) -> int:
+    return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+
+
+class PatternMatcher:
+    """
+    Finds the predictable parts of a password and estimates how many guesses
+    an attacker who knows those patterns needs, in the style of zxcvbn.
+
+    Matchers: dictionary words (including l33t-speak and reversed spellings),
+    keyboard walks on qwerty and keypad adjacency graphs, character
+    sequences, repeats and dates. The ranked dictionaries are loaded once
+    into a shared prefix trie, so a dictionary pass walks the trie from each
+    position and stops as soon as no word continues. A minimum-guesses
+    dynamic program then picks the cheapest way to cover the password with
+    matches and brute-forced gaps. Build one with get_pattern_matcher().
+    """
+
+    def __init__(self, dictionaries: Dict[str, Iterable[str]] = None):
+        # Trie nodes map characters to child nodes; '' holds (rank, dictionary) for a word ending there
+        self._trie = {}
+        for name, words in (dictionaries or PASSWORD_DICTIONARIES).items():
+            for rank, word in enumerate(words, 1):
+                node = self._trie
+                for char in word.lower():
+                    node = node.setdefault(char, {})
+                if '' not in node or node[''][0] > rank:
+                    node[''] = (rank, name)
+
+        self._graphs = []
+        for name, (rows, slanted) in KEYBOARD_LAYOUTS.items():
+            graph, average_degree = _adjacency_graph(rows, slanted)
+            shifted = frozenset(key[1] for row in rows for key in row if key and len(key) > 1)
+            self._graphs.append((name, graph, len(graph), average_degree, shifted))
+
+    def omnimatch(self, password: str, char_log2: Callable[[str], float] = None) -> List[PatternMatch]:
+        """Every match of every matcher, unordered and possibly overlapping."""
+        lowered = password.lower()
+        if len(lowered) != len(password):
+            # A few characters lowercase to several (e.g. 'İ'); keep offsets aligned
+            lowered = ''.join(char if len(char.lower()) != 1 else char.lower() for char in password)
+        matches = self._dictionary_matches(password, lowered)
+        matches += self._reverse_dictionary_matches(password, lowered)
+        matches += self._spatial_matches(password)
+        matches += self._sequence_matches(password)
+        matches += self._repeat_matches(password, char_log2)
+        matches += self._date_matches(password)
+        return matches
+
+    def _dictionary_matches(self, password, lowered):
+        """Dictionary words, also read through l33t-speak substitutions, via one trie walk per position."""
+        matches = []
+        length = len(lowered)
+        for i in range(length):
+            # (next index, trie node, l33t substitutions so far)
+            stack = [(i, self._trie, ())]
+            while stack:
+                j, node, subs = stack.pop()
+                if j == length:
+                    continue
+                char = lowered[j]
+                steps = [(char, subs)]
+                for letter in _L33T_LETTERS.get(char, ''):
+                    # A l33t character stands for the same letter throughout a word
+                    if all(subbed != char or used == letter for subbed, used in subs):
+                        steps.append((letter, subs if (char, letter) in subs else subs + ((char, letter),)))
+                for letter, step_subs in steps:
+                    child = node.get(letter)
+                    if child is None:
+                        continue
+                    entry = child.get('')
+                    if entry is not None and (not step_subs or j > i):
+                        token = password[i:j + 1]
+                        rank, dictionary = entry
+                        guesses = rank * _uppercase_variations(token)
+                        info = {'dictionary': dictionary, 'rank': rank}
+                        if step_subs:
+                            guesses *= _l33t_variations(token, step_subs)
+                            info['l33t'] = dict(step_subs)
+                        matches.append(PatternMatch('dictionary', i, j, token, guesses, info))
+                    stack.append((j + 1, child, step_subs))
+        return matches
+
+    def _reverse_dictionary_matches(self, password, lowered):
+        matches = []
+        last = len(password) - 1
+        reversed_lowered = lowered[::-1]
+        for i in range(len(reversed_lowered)):
+            node = self._trie
+            for j in range(i, len(reversed_lowered)):
+                node = node.get(reversed_lowered[j])
+                if node is None:
+                    break
+                entry = node.get('')
+                if entry is not None and j > i:
+                    start, end = last - j, last - i
+                    token = password[start:end + 1]
+                    rank, dictionary = entry
+                    guesses = rank * _uppercase_variations(token) * 2
+                    matches.append(PatternMatch('dictionary', start, end, token, guesses,
+                                                {'dictionary': dictionary, 'rank': rank, 'reversed': True}))
+        return matches
+
+    def _spatial_matches(self, password):
+        """Runs of 3+ keys where each key is adjacent to the previous one."""
+        matches = []
+        length = len(password)
+        for name, graph, starting_positions, average_degree, shifted_chars in self._graphs:
+            i = 0
+            while i < length - 1:
+                j = i + 1
+                last_direction = None
+                turns = 0
+                shifted = 1 if password[i] in shifted_chars else 0
+                while True:
+                    direction = None
+                    if j < length:
+                        neighbors = graph.get(password[j - 1])
+                        if neighbors is not None:
+                            direction = neighbors.get(password[j])
+                    if direction is not None:
+                        if password[j] in shifted_chars:
+                            shifted += 1
+                        if direction != last_direction:
+                            turns += 1
+                            last_direction = direction
+                        j += 1
+                        continue
+                    if j - i > 2:
+                        token = password[i:j]
+                        guesses = self._spatial_guesses(len(token), turns, shifted, starting_positions, average_degree)
+                        matches.append(PatternMatch('spatial', i, j - 1, token, guesses,
+                                                    {'graph': name, 'turns': turns, 'shifted_count': shifted}))
+                    i = j
+                    break
+        return matches
+
+    @staticmethod
+    def _spatial_guesses(length, turns, shifted, starting_positions, average_degree):
+        guesses = 0
+        for run_length in range(2, length + 1):
+            for run_turns in range(1, min(turns, run_length - 1) + 1):
+                guesses += math.comb(run_length - 1, run_turns - 1) * starting_positions * average_degree ** run_turns
+        if shifted:
+            unshifted = length - shifted
+            if not unshifted:
+                guesses *= 2
+            else:
+                guesses *= sum(math.comb(shifted + unshifted, k) for k in range(1, min(shifted, unshifted) + 1))
+        return guesses
+
+    def _sequence_matches(self, password):
+        """Runs whose characters step by the same small amount (abcd, 9753, ZYX)."""
+        matches = []
+        length = len(password)
+        if length < 3:
+            return matches
+
+        def add(i, j, delta):
+            if j - i > 1 and 0 < abs(delta) <= SEQUENCE_MAX_DELTA:
+                token = password[i:j + 1]
+                first = token[0]
+                if first in 'aAzZ019':
+                    guesses = 4
+                elif first.isdigit():
+                    guesses = 10
+                else:
+                    guesses = 26
+                if delta < 0:
+                    guesses *= 2
+                matches.append(PatternMatch('sequence', i, j, token, guesses * len(token),
+                                            {'ascending': delta > 0}))
+
+        i = 0
+        last_delta = None
+        for k in range(1, length):
+            delta = ord(password[k]) - ord(password[k - 1])
+            if last_delta is None:
+                last_delta = delta
+            if delta == last_delta:
+                continue
+            add(i, k - 1, last_delta)
+            i = k - 1
+            last_delta = delta
+        add(i, length - 1, last_delta)
+        return matches
+
+    def _repeat_matches(self, password, char_log2):
+        """A base token repeated back to back (aaaa, abcabc); the base is costed recursively."""
+        matches = []
+        position = 0
+        while position < len(password):
+            greedy = _REPEAT_GREEDY_RE.search(password, position)
+            if greedy is None:
+                break
+            lazy = _REPEAT_LAZY_RE.search(password, position)
+            if len(greedy.group(0)) > len(lazy.group(0)):
+                # The greedy match repeats a longer span; find its shortest base ('abcabc' in 'abcabcabcabc')
+                match = greedy
+                base = _REPEAT_LAZY_RE.fullmatch(match.group(0)).group(1)
+            else:
+                match = lazy
+                base = match.group(1)
+            token = match.group(0)
+            repeat_count = len(token) // len(base)
+            base_guesses = self.estimate_guesses(base, char_log2)[0]
+            matches.append(PatternMatch('repeat', match.start(), match.end() - 1, token, base_guesses * repeat_count,
+                                        {'base_token': base, 'repeat_count': repeat_count}))
+            position = match.end()
+        return matches
+
+    def _date_matches(self, password):
+        """Dates with or without separators (1990-05-12, 120590) and recent years."""
+        digits = sum(1 for char in password if '0' <= char <= '9')
+        if digits < 4:
+            return []
+        matches = []
+        length = len(password)
+
+        for run in _ASCII_DIGIT_RUN_RE.finditer(password):
+            for i in range(run.start(), run.end() - 3):
+                for j in range(i + 3, min(i + 8, run.end())):
+                    token = password[i:j + 1]
+                    best = None
+                    for first, second in _DATE_SPLITS[len(token)]:
+                        date = _ints_to_date((int(token[:first]), int(token[first:second]), int(token[second:])))
+                        if date and (best is None or abs(date[0] - REFERENCE_YEAR) < abs(best[0] - REFERENCE_YEAR)):
+                            best = date
+                    if best:
+                        matches.append(self._date_match(i, j, token, best, ''))
+
+        if length >= 6:
+            for i in range(length - 5):
+                if not '0' <= password[i] <= '9':
+                    continue
+                for j in range(i + 5, min(i + 10, length)):
+                    separated = _DATE_SEPARATED_RE.fullmatch(password, i, j + 1)
+                    if separated is None:
+                        continue
+                    date = _ints_to_date((int(separated.group(1)), int(separated.group(3)), int(separated.group(4))))
+                    if date:
+                        matches.append(self._date_match(i, j, password[i:j + 1], date, separated.group(2)))
+
+        # Drop dates inside longer dates (e.g. '1205' inside '120590'): sorted by start and then
+        # longest first, a date is nested if an earlier one with a different span reaches as far
+        outer = []
+        reach = -1
+        reach_span = None
+        for match in sorted(matches, key=lambda match: (match.i, -match.j)):
+            if match.j <= reach and (match.i, match.j) != reach_span:
+                continue
+            outer.append(match)
+            if match.j > reach:
+                reach, reach_span = match.j, (match.i, match.j)
+        matches = outer
+        for year in _RECENT_YEAR_RE.finditer(password):
+            matches.append(PatternMatch('date', year.start(), year.end() - 1, year.group(0),
+                                        _year_guesses(int(year.group(0))), {'year': int(year.group(0))}))
+        return matches
+
+    @staticmethod
+    def _date_match(i, j, token, date, separator):
+        year, month, day = date
+        guesses = _year_guesses(year) * 365 * (4 if separator else 1)
+        return PatternMatch('date', i, j, token, guesses,
+                            {'year': year, 'month': month, 'day': day, 'separator': separator})
+
+    def estimate_guesses(self, password: str, char_log2: Callable[[str], float] = None):
+        """
+        Returns (guesses, sequence): the fewest guesses needed to find the
+        password by combining its pattern matches, and the matches (including
+        'bruteforce' gaps) that achieve it.
+
+        Brute-forced characters cost char_log2(char) bits each (log2 of their
+        character-set size), or log2(10) per character when it is not given.
+        Sequences of l matches are charged l! for their ordering plus a
+        10,000-guess floor per extra match, so splitting a password into many
+        tiny matches never looks cheaper than it is. The search grows faster
+        than linearly with length, so passwords over PATTERN_MATCH_MAX_LENGTH
+        characters are estimated block by block, and, as zxcvbn does, only the
+        first PATTERN_MATCH_INPUT_LIMIT characters are matched at all; the
+        rest is one brute-force span.
+        """
+        if not password:
+            return 1.0, []
+        if len(password) > PATTERN_MATCH_INPUT_LIMIT:
+            return self._estimate_truncated_guesses(password, char_log2)
+        if len(password) > PATTERN_MATCH_MAX_LENGTH:
+            return self._estimate_block_guesses(password, char_log2)
+        # prefix[k] = brute-force bits of password[:k]
+        prefix = [0.0]
+        for char in password:
+            prefix.append(prefix[-1] + (char_log2(char) if char_log2 else math.log2(10)))
+
+        length = len(password)
+        by_end = [[] for _ in range(length)]
+        for match in self.omnimatch(password, char_log2):
+            by_end[match.j].append(match)
+
+        # best_*[k][l]: the cheapest l-match cover of password[:k + 1], its last match and log10 guess product
+        best_match = [{} for _ in range(length)]
+        best_product = [{} for _ in range(length)]
+        best_log10 = [{} for _ in range(length)]
+
+        def match_log10(match):
+            guesses = match.guesses
+            if match.j - match.i + 1 < length:
+                guesses = max(guesses, MIN_SUBMATCH_GUESSES_SINGLE_CHAR if match.i == match.j
+                              else MIN_SUBMATCH_GUESSES_MULTI_CHAR)
+            return math.log10(max(guesses, 1))
+
+        def update(match, count, log10_guesses):
+            k = match.j
+            product = log10_guesses
+            if count > 1:
+                product += best_product[match.i - 1][count - 1]
+            total = _log10_add(_LOG10_FACTORIAL[count] + product,
+                               _LOG10_MIN_GUESSES_BEFORE_GROWING_SEQUENCE * (count - 1))
+            for other_count, other_total in best_log10[k].items():
+                if other_count <= count and other_total <= total:
+                    return
+            best_log10[k][count] = total
+            best_match[k][count] = match
+            best_product[k][count] = product
+
+        # Positions right after a non-bruteforce match, where a brute-force span may start
+        bruteforce_starts = [0]
+        for k in range(length):
+            for match in by_end[k]:
+                log10_guesses = match_log10(match)
+                if match.i == 0:
+                    update(match, 1, log10_guesses)
+                else:
+                    for count in list(best_match[match.i - 1]):
+                        update(match, count + 1, log10_guesses)
+
+            # Brute force password[i:k + 1], never right after another brute-force span
+            for i in bruteforce_starts:
+                match = PatternMatch('bruteforce', i, k, password[i:k + 1], 2.0 ** (prefix[k + 1] - prefix[i]))
+                log10_guesses = match_log10(match)
+                if not i:
+                    update(match, 1, log10_guesses)
+                    continue
+                for count, last in list(best_match[i - 1].items()):
+                    if last.pattern != 'bruteforce':
+                        update(match, count + 1, log10_guesses)
+            if any(match.pattern != 'bruteforce' for match in best_match[k].values()):
+                bruteforce_starts.append(k + 1)
+
+        # Unwind the cheapest cover of the whole password
+        count = min(best_log10[length - 1], key=best_log10[length - 1].get)
+        log10_guesses = best_log10[length - 1][count]
+        sequence = []
+        k = length - 1
+        while k >= 0:
+            match = best_match[k][count]
+            sequence.append(match)
+            k = match.i - 1
+            count -= 1
+        sequence.reverse()
+        return 10 ** min(log10_guesses, 300.0), sequence
+
+
+    def _estimate_block_guesses(self, password, char_log2):
+        """
+        estimate_guesses() for long passwords: repeats of PATTERN_MATCH_MAX_LENGTH or
+        more characters, found across the whole password, are blocks of their own,
+        the rest is cut into blocks of PATTERN_MATCH_MAX_LENGTH characters, and the
+        guesses of the blocks multiply.
+        """
+        blocks = []
+        start = 0
+        for match in self._repeat_matches(password, char_log2):
+            if match.j - match.i + 1 >= PATTERN_MATCH_MAX_LENGTH:
+                blocks.extend((i, None) for i in range(start, match.i, PATTERN_MATCH_MAX_LENGTH))
+                blocks.append((match.i, match))
+                start = match.j + 1
+        blocks.extend((i, None) for i in range(start, len(password), PATTERN_MATCH_MAX_LENGTH))
+
+        log10_guesses = 0.0
+        sequence = []
+        for position, (i, repeat) in enumerate(blocks):
+            if repeat is not None:
+                log10_guesses += math.log10(repeat.guesses)
+                sequence.append(repeat)
+                continue
+            end = blocks[position + 1][0] if position + 1 < len(blocks) else len(password)
+            guesses, block_sequence = self.estimate_guesses(password[i:end], char_log2)
+            log10_guesses += math.log10(guesses)
+            sequence.extend(match._replace(i=match.i + i, j=match.j + i) for match in block_sequence)
+        return 10 ** min(log10_guesses, 300.0), sequence
+
+    def _estimate_truncated_guesses(self, password, char_log2):
+        """
+        estimate_guesses() for passwords over PATTERN_MATCH_INPUT_LIMIT characters:
+        the head is matched, the tail is brute force, and their guesses multiply.
+        """
+        guesses, sequence = self.estimate_guesses(password[:PATTERN_MATCH_INPUT_LIMIT], char_log2)
+        tail = password[PATTERN_MATCH_INPUT_LIMIT:]
+        tail_log10 = sum(char_log2(char) if char_log2 else math.log2(10) for char in tail) * math.log10(2)
+        sequence.append(PatternMatch('bruteforce', PATTERN_MATCH_INPUT_LIMIT, len(password) - 1, tail,
+                                     10 ** min(tail_log10, 300.0)))
+        return 10 ** min(math.log10(guesses) + tail_log10, 300.0), sequence
+
+
+_pattern_matcher = None
+_pattern_matcher_lock = threading.Lock()
+
+
+def get_pattern_matcher() -> PatternMatcher:
+    """Returns the process-wide PatternMatcher, building its dictionary trie on first use."""
+    global _pattern_matcher
+    if _pattern_matcher is None:
+        with _pattern_matcher_lock:
+            if _pattern_matcher is None:
+                _pattern_matcher = PatternMatcher()
+    return _pattern_matcher
+
+
+def describe_match(match: PatternMatch) -> str:
+    """A short human-readable description of a pattern match."""
+    info = match.info or {}
+    if match.pattern == 'dictionary':
+        kind = "Common password" if info['dictionary'] == 'passwords' else "Dictionary word"
+        if 'l33t' in info:
+            return f"{kind} '{match.token}' with l33t substitutions"
+        if info.get('reversed'):
+            return f"Reversed {kind.lower()} '{match.token}'"
+        return f"{kind} '{match.token}'"
+    if match.pattern == 'spatial':
+        return f"Keyboard pattern '{match.token}'" if info['graph'] == 'qwerty' else f"Keypad pattern '{match.token}'"
+    if match.pattern == 'sequence':
+        return f"Sequence '{match.token}'"
+    if match.pattern == 'repeat':
+        return f"Repeated '{info['base_token']}' x{info['repeat_count']}"
+    if match.pattern == 'date':
+        return f"Date '{match.token}'" if 'month' in info else f"Recent year '{match.token}'"
+    return f"'{match.token}'"
+
 
 class PasswordStrengthAnalyzer:
     """Analyzes password strength and provides recommendations."""
     
-    def __init__(self):
+    def __init__(self, pattern_entropy: bool = False, breach_filter=None):
         # Character set sizes for entropy calculation
         self.LOWERCASE = 26
         self.UPPERCASE = 26
         self.DIGITS = 10
         self.SYMBOLS = 32  # Common symbols: !@#$%^&*()_+-=[]{}|;:,.<>?
+        # Adds 'pattern_entropy', 'guesses_log10' and 'patterns' to analyze_password()
+        # results and describes the pattern matches in 'common_patterns'
+        self.pattern_entropy = pattern_entropy
+        # Optional breach_filter.BreachFilter; adds 'breached' to results and caps the score
+        self.breach_filter = breach_filter
+
+        # log2 of the character-set size for every CHARSET_* combination, so
+        # entropy is length * table lookup instead of log2(size ** length)
+        self._charset_log2 = []
+        for charsets in range(16):
+            charset_size = ((charsets & CHARSET_LOWERCASE and self.LOWERCASE)
+                            + (charsets & CHARSET_UPPERCASE and self.UPPERCASE)
+                            + (charsets & CHARSET_DIGITS and self.DIGITS)
+                            + (charsets & CHARSET_SYMBOLS and self.SYMBOLS))
+            # If no character sets detected, assume basic ASCII
+            self._charset_log2.append(math.log2(charset_size or 95))
         
     def analyze_password(self, password: str) -> Dict:
         """
@@ -25,83 +901,289 @@ class PasswordStrengthAnalyzer:
         if not password:
             return self._empty_analysis()
             
-        # Calculate various metrics
-        length = len(password)
-        entropy = self._calculate_entropy(password)
-        strength_score = self._calculate_strength_score(password)
+        # Scan the password once; every scorer below reads the same features
+        features = extract_features(password)
+        entropy = self._calculate_entropy(features)
+        strength_score = self._calculate_strength_score(features)
+        breached = self._is_breached(password)
+        if breached:
+            strength_score = min(strength_score, BREACHED_MAX_SCORE)
         strength_level = self._get_strength_level(strength_score)
-        issues = self._identify_issues(password)
-        suggestions = self._generate_suggestions(password, issues)
+        issues = self._identify_issues(features)
+        suggestions = self._generate_suggestions(features, issues)
+        if breached:
+            issues.insert(0, "Found in a list of breached passwords")
+            suggestions.insert(0, "Choose a password that has never appeared in a data breach")
+        if self.pattern_entropy:
+            guesses, sequence = get_pattern_matcher().estimate_guesses(password, self._char_log2)
+            matches = [match for match in sequence if match.pattern != 'bruteforce']
+            common_patterns = [describe_match(match) for match in matches]
+        else:
+            common_patterns = self._check_common_patterns(features)
         
-        return {
+        analysis = {
             'password': password,
-            'length': length,
+            'length': features.length,
             'entropy': entropy,
             'strength_score': strength_score,
             'strength_level': strength_level,
             'issues': issues,
             'suggestions': suggestions,
-            'character_sets': self._analyze_character_sets(password),
-            'common_patterns': self._check_common_patterns(password)
+            'character_sets': self._analyze_character_sets(features),
+            'common_patterns': common_patterns
         }
+        if self.pattern_entropy:
+            analysis['pattern_entropy'] = min(entropy, round(math.log2(guesses), 2))
+            analysis['guesses_log10'] = round(math.log10(guesses), 2)
+            analysis['patterns'] = [match.to_dict() for match in matches]
+        if self.breach_filter is not None:
+            analysis['breached'] = breached
+        return analysis
     
-    def _calculate_entropy(self, password: str) -> float:
-        """Calculate password entropy (bits of randomness)."""
+    def summarize_password(self, password: str) -> Dict:
+        """
+        Returns only the strength_score, strength_level and entropy of a password.
+
+        Cheaper than analyze_password() when issues and suggestions are not
+        needed, e.g. when persisting per-credential strength results.
+        """
         if not password:
+            summary = {'strength_score': 0, 'strength_level': 'Very Weak', 'entropy': 0.0}
+            if self.breach_filter is not None:
+                summary['breached'] = False
+            return summary
+
+        features = extract_features(password)
+        strength_score = self._calculate_strength_score(features)
+        breached = self._is_breached(password)
+        if breached:
+            strength_score = min(strength_score, BREACHED_MAX_SCORE)
+        summary = {
+            'strength_score': strength_score,
+            'strength_level': self._get_strength_level(strength_score),
+            'entropy': self._calculate_entropy(features)
+        }
+        if self.breach_filter is not None:
+            summary['breached'] = breached
+        return summary
+
+    def _is_breached(self, password: str) -> bool:
+        return self.breach_filter is not None and bool(password) and password in self.breach_filter
+    
+    def analyze_many(self, passwords: Iterable[str],
+                     chunk_size: int = ANALYZE_MANY_CHUNK_SIZE) -> StrengthColumns:
+        """
+        Scores many passwords at once and returns compact StrengthColumns.
+
+        Accepts any iterable (e.g. a generator over decrypted rows) and
+        consumes it chunk_size passwords at a time. Each password is scanned
+        once; scoring is vectorized with NumPy when it is installed, and
+        entropy is computed once per distinct (character sets, length) pair.
+        Results match summarize_password() for every password, including
+        the score cap for passwords found in the breached-password filter.
+        """
+        if np is not None:
+            parts = []
+        else:
+            scores, levels, entropy, charsets = array('B'), array('B'), array('d'), array('B')
+        breached = array('B') if self.breach_filter is not None else None
+        entropy_memo = {}
+
+        iterator = iter(passwords)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            if breached is not None:
+                hits = [self._is_breached(password) for password in chunk]
+                breached.extend(hits)
+            if np is not None:
+                part = self._analyze_chunk_numpy(chunk, entropy_memo)
+                if breached is not None:
+                    # Cap breached passwords' scores, as analyze_password does
+                    hit_mask = np.array(hits, bool)
+                    score = np.where(hit_mask, np.minimum(part[0], BREACHED_MAX_SCORE), part[0]).astype(np.uint8)
+                    levels_part = np.searchsorted(_LEVEL_THRESHOLDS, score, side="right").astype(np.uint8)
+                    part = (score, levels_part) + part[2:]
+                parts.append(part)
+                continue
+            for position, item in enumerate(map(extract_features, chunk)):
+                mask = _charset_mask(item)
+                score = self._calculate_strength_score(item)
+                if breached is not None and hits[position]:
+                    score = min(score, BREACHED_MAX_SCORE)
+                scores.append(score)
+                levels.append(self._level_index(score))
+                key = (mask, item.length)
+                bits = entropy_memo.get(key)
+                if bits is None:
+                    bits = entropy_memo[key] = self._charset_entropy(mask, item.length)
+                entropy.append(bits)
+                charsets.append(mask)
+
+        if np is None:
+            return StrengthColumns(scores, levels, entropy, charsets, breached)
+        if breached is not None:
+            breached = np.frombuffer(breached, np.uint8) if len(breached) else np.zeros(0, np.uint8)
+        if not parts:
+            return StrengthColumns(np.zeros(0, np.uint8), np.zeros(0, np.uint8),
+                                   np.zeros(0, np.float64), np.zeros(0, np.uint8), breached)
+        return StrengthColumns(*(np.concatenate(column) for column in zip(*parts)), breached)
+
+    def _analyze_chunk_numpy(self, chunk, entropy_memo):
+        """
+        Vectorized extract_features + scoring for one chunk of passwords.
+
+        The chunk is joined into one newline-separated string, so character
+        classes and distinct-character counts come from whole-array NumPy
+        operations and each regex runs once per chunk instead of per password.
+        Newlines never take part in a repeat ('.' excludes them) or a common
+        pattern, so no match spans two passwords.
+        """
+        count = len(chunk)
+        length = np.fromiter(map(len, chunk), np.int64, count)
+        text = "\n".join(chunk) + "\n"
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+        starts = np.concatenate(([0], np.cumsum(length + 1)[:-1]))
+
+        # Character classes per code point: an ASCII table, plus \d for other decimal digits
+        char_bits = _ascii_charset_table()[np.minimum(codes, 127)]
+        non_ascii = codes > 127
+        if non_ascii.any():
+            char_bits[non_ascii] = 0
+            others, positions = np.unique(codes[non_ascii], return_inverse=True)
+            digit_bits = np.array([CHARSET_DIGITS if chr(code).isdecimal() else 0 for code in others.tolist()],
+                                  np.uint8)
+            char_bits[non_ascii] = digit_bits[positions]
+        charsets = np.bitwise_or.reduceat(char_bits, starts)
+
+        # Distinct characters: unique (password, code point) pairs, separators excluded
+        owner = np.repeat(np.arange(count, dtype=np.int64), length + 1)
+        is_char = np.ones(len(codes), bool)
+        is_char[starts + length] = False
+        pairs = np.sort((owner[is_char] << 21) | codes[is_char].astype(np.int64))
+        first_of_kind = np.ones(len(pairs), bool)
+        first_of_kind[1:] = pairs[1:] != pairs[:-1]
+        unique = np.bincount(pairs[first_of_kind] >> 21, minlength=count)
+
+        longest_repeat = np.zeros(count, np.int64)
+        for match in _REPEAT_RE.finditer(text):
+            index = np.searchsorted(starts, match.start(), side="right") - 1
+            longest_repeat[index] = max(longest_repeat[index], match.end() - match.start())
+        repeat = longest_repeat >= 3
+        heavy_repeat = longest_repeat >= 4
+
+        common = np.zeros(count, bool)
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            match_starts = [match.start() for match in _COMMON_PATTERN_RE.finditer(lowered)]
+            common[np.searchsorted(starts, match_starts, side="right") - 1] = True
+        else:
+            # Lowercasing changed some lengths, so offsets no longer line up
+            common[:] = [_COMMON_PATTERN_RE.search(password.lower()) is not None for password in chunk]
+
+        score = np.where(length >= 8, np.minimum(25, length * 2), 0)
+        score += 8 * ((charsets & CHARSET_LOWERCASE) > 0)
+        score += 8 * ((charsets & CHARSET_UPPERCASE) > 0)
+        score += 8 * ((charsets & CHARSET_DIGITS) > 0)
+        score += 16 * ((charsets & CHARSET_SYMBOLS) > 0)
+        score += 10 * (unique > length * 0.7)
+        score += 10 * ~repeat
+        score -= 15 * heavy_repeat
+        score -= 20 * common
+        score -= 10 * (length < 6)
+        score = np.where(length == 0, 0, np.clip(score, 0, 100)).astype(np.uint8)
+        levels = np.searchsorted(_LEVEL_THRESHOLDS, score, side="right").astype(np.uint8)
+
+        # Entropy depends only on (character sets, length); compute each distinct pair once
+        keys, inverse = np.unique(length * 16 + charsets, return_inverse=True)
+        table = np.empty(len(keys), np.float64)
+        for position, key in enumerate(keys.tolist()):
+            memo_key = (key % 16, key // 16)
+            bits = entropy_memo.get(memo_key)
+            if bits is None:
+                bits = entropy_memo[memo_key] = self._charset_entropy(*memo_key)
+            table[position] = bits
+        return score, levels, table[inverse.reshape(-1)], charsets
+
+    @staticmethod
+    def _level_index(score: int) -> int:
+        """Index into STRENGTH_LEVELS for a score (see _get_strength_level)."""
+        level = 0
+        for threshold in _LEVEL_THRESHOLDS:
+            if score >= threshold:
+                level += 1
+        return level
+
+    def _calculate_entropy(self, features: PasswordFeatures) -> float:
+        """Calculate password entropy (bits of randomness)."""
+        return self._charset_entropy(_charset_mask(features), features.length)
+
+    def _charset_entropy(self, charsets: int, length: int) -> float:
+        """Entropy of a password of length characters drawn from the CHARSET_* sets in charsets."""
+        if not length:
             return 0.0
-            
-        # Determine character set size
-        charset_size = 0
-        if re.search(r'[a-z]', password):
-            charset_size += self.LOWERCASE
-        if re.search(r'[A-Z]', password):
-            charset_size += self.UPPERCASE
-        if re.search(r'\d', password):
-            charset_size += self.DIGITS
-        if re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]', password):
-            charset_size += self.SYMBOLS
-            
-        # If no character sets detected, assume basic ASCII
-        if charset_size == 0:
-            charset_size = 95  # Basic ASCII printable characters
-            
-        # Calculate entropy: log2(charset_size^length)
-        entropy = math.log2(charset_size ** len(password))
-        return round(entropy, 2)
+        # log2(charset_size ** length) without building the power; constant time for any length
+        return round(length * self._charset_log2[charsets], 2)
+
+    def estimate_pattern_entropy(self, password: str) -> float:
+        """
+        Estimates entropy while crediting predictable parts only once.
+
+        log2 of the guesses PatternMatcher.estimate_guesses() needs: dictionary
+        words, keyboard walks, sequences, repeats and dates cost their own
+        guess counts, and every other character costs log2 of its character
+        set, as in the plain entropy.
+        """
+        guesses, _ = get_pattern_matcher().estimate_guesses(password, self._char_log2)
+        return round(math.log2(guesses), 2)
+
+    def _char_log2(self, char: str) -> float:
+        """log2 of the size of the character set a single character belongs to."""
+        if char in _LOWERCASE_CHARS:
+            return self._charset_log2[CHARSET_LOWERCASE]
+        if char in _UPPERCASE_CHARS:
+            return self._charset_log2[CHARSET_UPPERCASE]
+        if char.isdecimal():
+            return self._charset_log2[CHARSET_DIGITS]
+        if char in _SYMBOL_CHARS:
+            return self._charset_log2[CHARSET_SYMBOLS]
+        return self._charset_log2[0]
     
-    def _calculate_strength_score(self, password: str) -> int:
+    def _calculate_strength_score(self, features: PasswordFeatures) -> int:
         """Calculate a strength score from 0-100."""
-        if not password:
+        if not features.length:
             return 0
             
         score = 0
+        length = features.length
         
         # Length bonus (up to 25 points)
-        if len(password) >= 8:
-            score += min(25, len(password) * 2)
+        if length >= 8:
+            score += min(25, length * 2)
         
         # Character variety bonus (up to 40 points)
-        if re.search(r'[a-z]', password):
+        if features.has_lower:
             score += 8
-        if re.search(r'[A-Z]', password):
+        if features.has_upper:
             score += 8
-        if re.search(r'\d', password):
+        if features.has_digit:
             score += 8
-        if re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]', password):
+        if features.has_symbol:
             score += 16
         
         # Complexity bonus (up to 20 points)
-        if len(set(password)) > len(password) * 0.7:  # Good character variety
+        if features.unique_chars > length * 0.7:  # Good character variety
             score += 10
-        if not re.search(r'(.)\1{2,}', password):  # No repeated characters
+        if not features.has_repeat:  # No repeated characters
             score += 10
         
         # Penalties
-        if re.search(r'(.)\1{3,}', password):  # Heavily repeated characters
+        if features.has_heavy_repeat:  # Heavily repeated characters
             score -= 15
-        if re.search(r'(123|abc|qwe|asd|password|123456)', password.lower()):
+        if features.has_common_pattern:
             score -= 20  # Common patterns
-        if len(password) < 6:
+        if length < 6:
             score -= 10  # Too short
             
         return max(0, min(100, score))
@@ -119,66 +1201,66 @@ class PasswordStrengthAnalyzer:
         else:
             return 'Very Weak'
     
-    def _identify_issues(self, password: str) -> List[str]:
+    def _identify_issues(self, features: PasswordFeatures) -> List[str]:
         """Identify specific issues with the password."""
         issues = []
         
-        if len(password) < 8:
+        if features.length < 8:
             issues.append("Too short (minimum 8 characters recommended)")
         
-        if not re.search(r'[a-z]', password):
+        if not features.has_lower:
             issues.append("Missing lowercase letters")
             
-        if not re.search(r'[A-Z]', password):
+        if not features.has_upper:
             issues.append("Missing uppercase letters")
             
-        if not re.search(r'\d', password):
+        if not features.has_digit:
             issues.append("Missing numbers")
             
-        if not re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]', password):
+        if not features.has_symbol:
             issues.append("Missing special characters")
             
-        if re.search(r'(.)\1{3,}', password):
+        if features.has_heavy_repeat:
             issues.append("Too many repeated characters")
             
-        if re.search(r'(123|abc|qwe|asd|password|123456)', password.lower()):
+        if features.has_common_pattern:
             issues.append("Contains common patterns")
             
-        if len(set(password)) < len(password) * 0.5:
+        if features.unique_chars < features.length * 0.5:
             issues.append("Low character variety")
             
         return issues
     
-    def _generate_suggestions(self, password: str, issues: List[str]) -> List[str]:
+    def _generate_suggestions(self, features: PasswordFeatures, issues: List[str]) -> List[str]:
         """Generate specific suggestions for improvement."""
         suggestions = []
         
-        if len(password) < 8:
+        if features.length < 8:
             suggestions.append("Increase length to at least 8 characters")
             
-        if not re.search(r'[a-z]', password):
+        if not features.has_lower:
             suggestions.append("Add lowercase letters (a-z)")
             
-        if not re.search(r'[A-Z]', password):
+        if not features.has_upper:
             suggestions.append("Add uppercase letters (A-Z)")
             
-        if not re.search(r'\d', password):
+        if not features.has_digit:
             suggestions.append("Add numbers (0-9)")
             
-        if not re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]', password):
+        if not features.has_symbol:
             suggestions.append("Add special characters (!@#$%^&*)")
             
-        if re.search(r'(.)\1{3,}', password):
+        if features.has_heavy_repeat:
             suggestions.append("Avoid repeating characters more than twice")
             
-        if re.search(r'(123|abc|qwe|asd|password|123456)', password.lower()):
+        if features.has_common_pattern:
             suggestions.append("Avoid common patterns and sequences")
             
-        if len(set(password)) < len(password) * 0.5:
+        if features.unique_chars < features.length * 0.5:
             suggestions.append("Use more diverse characters")
             
         # Add general suggestions
-        if len(password) < 12:
+        if features.length < 12:
             suggestions.append("Consider using 12+ characters for maximum security")
             
         suggestions.append("Use a mix of random words, numbers, and symbols")
@@ -186,33 +1268,34 @@ class PasswordStrengthAnalyzer:
         
         return suggestions
     
-    def _analyze_character_sets(self, password: str) -> Dict[str, bool]:
+    def _analyze_character_sets(self, features: PasswordFeatures) -> Dict[str, bool]:
         """Analyze which character sets are used."""
         return {
-            'lowercase': bool(re.search(r'[a-z]', password)),
-            'uppercase': bool(re.search(r'[A-Z]', password)),
-            'digits': bool(re.search(r'\d', password)),
-            'symbols': bool(re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]', password))
+            'lowercase': features.has_lower,
+            'uppercase': features.has_upper,
+            'digits': features.has_digit,
+            'symbols': features.has_symbol
         }
     
-    def _check_common_patterns(self, password: str) -> List[str]:
+    def _check_common_patterns(self, features: PasswordFeatures) -> List[str]:
         """Check for common weak patterns."""
         patterns = []
+        lowered = features.lowered
         
         # Common sequences
         sequences = ['123', 'abc', 'qwe', 'asd', 'password', '123456', 'qwerty']
         for seq in sequences:
-            if seq in password.lower():
+            if seq in lowered:
                 patterns.append(f"Contains '{seq}' sequence")
                 
         # Repeated characters
-        if re.search(r'(.)\1{3,}', password):
+        if features.has_heavy_repeat:
             patterns.append("Repeated characters")
             
         # Keyboard patterns
         keyboard_patterns = ['qwerty', 'asdfgh', 'zxcvbn']
         for pattern in keyboard_patterns:
-            if pattern in password.lower():
+            if pattern in lowered:
                 patterns.append("Keyboard pattern detected")
                 
         return patterns
@@ -0,0 +1,38 @@
+import argparse
+import sys
+
+from database import init_db, get_connection, reencrypt_legacy_data, count_legacy_ciphertext
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description="Convert legacy Fernet ciphertext to the compact binary AES-GCM format"
+    )
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Credentials converted per transaction (default: 500)")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Seconds to sleep between batches while the app is running (default: 0)")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Run VACUUM afterwards to return the freed space to the filesystem")
+    args = parser.parse_args(argv)
+
+    init_db()
+    print(f"🔎 {count_legacy_ciphertext()} credential(s) still use the legacy format")
+
+    result = reencrypt_legacy_data(batch_size=args.batch_size, pause=args.pause)
+    print(f"✅ Converted {result['credentials']} credential(s) and {result['master_accounts']} master account(s)")
+    if result["failed"]:
+        print(f"⚠️ {len(result['failed'])} credential(s) could not be decrypted: {result['failed']}")
+
+    if args.vacuum:
+        print("🔧 Running VACUUM...")
+        conn = get_connection()
+        conn.execute("VACUUM")
+        conn.close()
+        print("✅ VACUUM completed")
+
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
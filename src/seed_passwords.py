@@ -3,7 +3,7 @@ import sys
 import os
 from typing import List
 
-from database import init_db, store_password, get_total_stored_passwords, get_all_stored_urls, get_app_data_dir
+from database import init_db, store_passwords_bulk, get_total_stored_passwords, get_all_stored_urls, get_app_data_dir
 from encryption import encrypt_data, decrypt_data  # Import encryption functions instead of generate_key
 from password_generator import PasswordGenerator
 
@@ -48,7 +48,7 @@ def seed_passwords(count: int = 50) -> None:
 
         password_generator = PasswordGenerator()
 
-        created = 0
+        entries = []
         for i, site in enumerate(websites, start=1):
             username = f"user{i:03d}@{site}"
             password = password_generator.generate_password(
@@ -61,8 +61,12 @@ def seed_passwords(count: int = 50) -> None:
                 avoid_ambiguous=True,
             )
 
-            store_password(site, username, password)
-            created += 1
+            entries.append((site, username, password))
+
+        result = store_passwords_bulk(entries)
+        created = result["stored"]
+        for failure in result["failed"]:
+            print(f"⚠️ Skipped {failure['website']}: {failure['error']}")
 
         total = get_total_stored_passwords()
         print(f"✅ Seed complete: created {created} credential(s).")
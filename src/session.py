@@ -1,42 +1,243 @@
+import heapq
+import itertools
 import threading
 import time
+import uuid
 from database import get_user_preferences
+from decrypted_cache import get_decrypted_cache, wipe_decrypted_cache
 
 # Default timeout if no user preferences are found
 DEFAULT_SESSION_TIMEOUT = 300
 session_expire_event = threading.Event()
 
+
+class SessionScheduler:
+    """
+    Expires sessions at their deadlines from a single background thread.
+
+    Deadlines live in a min-heap; the thread sleeps until the earliest one
+    (or until an earlier deadline is scheduled), so it wakes once per expiry
+    instead of polling. Rescheduling a key just pushes a new heap entry and
+    the superseded one is skipped when it surfaces, which keeps schedule()
+    and cancel() O(log n) and O(1).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines = {}  # key -> (deadline, callback) currently in force
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, key, deadline, callback):
+        """Calls callback(key) at deadline (time.monotonic()), replacing any earlier schedule for key."""
+        with self._condition:
+            self._deadlines[key] = (deadline, callback)
+            heapq.heappush(self._heap, (deadline, next(self._counter), key))
+            self._compact()
+            self._ensure_thread()
+            # Wake the thread if this is now the earliest deadline
+            if self._heap[0][2] == key:
+                self._condition.notify()
+
+    def cancel(self, key):
+        """Forgets key; its pending heap entries are discarded lazily."""
+        with self._condition:
+            self._deadlines.pop(key, None)
+
+    def deadline(self, key):
+        """Returns the scheduled deadline for key, or None."""
+        entry = self._deadlines.get(key)
+        return entry[0] if entry else None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _compact(self):
+        """Drops superseded heap entries once they outnumber live ones."""
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [
+                item for item in self._heap
+                if self._deadlines.get(item[2], (None,))[0] == item[0]
+            ]
+            heapq.heapify(self._heap)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="session-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    deadline, _, key = self._heap[0]
+                    current = self._deadlines.get(key)
+                    if current is None or current[0] != deadline:
+                        heapq.heappop(self._heap)  # Cancelled or rescheduled
+                        continue
+                    delay = deadline - time.monotonic()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    del self._deadlines[key]
+                    callback = current[1]
+                    break
+            try:
+                callback(key)
+            except Exception as e:
+                print(f"Error expiring session {key}: {e}")
+
+
+class SessionState:
+    """One tracked session: who it belongs to and when it expires."""
+
+    __slots__ = ("username", "timeout", "started_at", "last_activity", "deadline", "on_expire")
+
+    def __init__(self, username, timeout, on_expire=None):
+        now = time.monotonic()
+        self.username = username
+        self.on_expire = on_expire
+        self.timeout = timeout
+        self.started_at = now
+        self.last_activity = now
+        self.deadline = now + timeout
+
+
+class SessionRegistry:
+    """
+    Tracks any number of concurrent sessions on one shared scheduler.
+
+    Each session's deadline is kept alongside it, so remaining time is a
+    subtraction; activity pushes the deadline out and reschedules expiry.
+    On expiry the session's own on_expire callback and then every registered
+    listener are called as callback(session_key, state).
+    """
+
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler or SessionScheduler()
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_expiry_listener(self, listener):
+        """Registers a callable run whenever a session times out."""
+        self._listeners.append(listener)
+
+    def start(self, session_key, username, timeout=DEFAULT_SESSION_TIMEOUT, on_expire=None):
+        """Starts (or restarts) tracking a session."""
+        state = SessionState(username, timeout, on_expire)
+        with self._lock:
+            self._sessions[session_key] = state
+        self.scheduler.schedule(session_key, state.deadline, self._expire)
+        return state
+
+    def touch(self, session_key):
+        """Records activity, pushing the deadline out by the session's timeout."""
+        with self._lock:
+            state = self._sessions.get(session_key)
+            if state is None:
+                return False
+            state.last_activity = time.monotonic()
+            state.deadline = state.last_activity + state.timeout
+        self.scheduler.schedule(session_key, state.deadline, self._expire)
+        return True
+
+    def set_timeout(self, session_key, timeout):
+        """Changes a session's timeout, measured from its last activity."""
+        with self._lock:
+            state = self._sessions.get(session_key)
+            if state is None:
+                return False
+            state.timeout = timeout
+            state.deadline = state.last_activity + timeout
+        self.scheduler.schedule(session_key, state.deadline, self._expire)
+        return True
+
+    def get(self, session_key):
+        """Returns the SessionState of an active session, or None."""
+        state = self._sessions.get(session_key)
+        if state is None or state.deadline <= time.monotonic():
+            return None
+        return state
+
+    def is_active(self, session_key):
+        return self.get(session_key) is not None
+
+    def remaining(self, session_key):
+        """Seconds until the session expires (0 if it is not active)."""
+        state = self._sessions.get(session_key)
+        if state is None:
+            return 0
+        return max(0, int(state.deadline - time.monotonic()))
+
+    def end(self, session_key):
+        """Stops tracking a session without firing expiry listeners (e.g. logout)."""
+        with self._lock:
+            state = self._sessions.pop(session_key, None)
+        self.scheduler.cancel(session_key)
+        return state
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self, session_key):
+        with self._lock:
+            state = self._sessions.get(session_key)
+            if state is None:
+                return
+            if state.deadline > time.monotonic():
+                # Activity moved the deadline; make sure the newest one is scheduled
+                self.scheduler.schedule(session_key, state.deadline, self._expire)
+                return
+            del self._sessions[session_key]
+        if state.on_expire is not None:
+            state.on_expire(session_key, state)
+        for listener in list(self._listeners):
+            listener(session_key, state)
+
+
+# Shared by every SessionManager in the process
+session_registry = SessionRegistry()
+
+
 class SessionManager:
+    """Single-session facade over the shared registry, used by the CLI and web app."""
+
     def __init__(self):
+        self.key = uuid.uuid4().hex
         self.active = False
         self.username = None
-        self.start_time = None
         self.timeout = DEFAULT_SESSION_TIMEOUT
         self.preferences = None
 
     def start_session(self, username):
-        """Starts a session and monitors expiration."""
+        """Starts a session; the shared scheduler expires it, no thread per session."""
         self.active = True
         self.username = username
-        self.start_time = time.time()
-        
+
         # Load user preferences
         self.preferences = get_user_preferences(username)
         if self.preferences:
             self.timeout = self.preferences.get('session_timeout', DEFAULT_SESSION_TIMEOUT)
-        
-        threading.Thread(target=self.monitor_session, daemon=True).start()  # ✅ Run in background
+        get_decrypted_cache().set_ttl(self.timeout)  # 🔐 Decrypted entries never outlive the session timeout
+
+        session_registry.start(self.key, username, self.timeout, on_expire=self._on_expired)
 
     def validate_session(self):
         """Checks if the session is still active."""
-        if not self.active or (time.time() - self.start_time) >= self.timeout:
+        if not self.active or not session_registry.is_active(self.key):
             self.expire_session()
             return False
         return True
 
     def refresh_session(self):
         """Refreshes session timer when activity occurs."""
-        self.start_time = time.time()
+        session_registry.touch(self.key)
         #print("🔄 Session timer refreshed.")
 
     def expire_session(self):
@@ -47,20 +248,26 @@ class SessionManager:
         print("\n❌ Session expired due to inactivity.")
         self.active = False
         self.username = None
+        session_registry.end(self.key)
+        wipe_decrypted_cache()  # 🧹 Zero any cached plaintext credentials
         session_expire_event.set()  # ✅ Signal expiration only once
         print(f"DEBUG: session_expire_event.is_set() → {session_expire_event.is_set()}")  # 🛠 Confirms event signal
 
-    def monitor_session(self):
-        """Monitors session timeout and expires if idle for too long."""
-        while self.active:
-            time.sleep(5)  # ✅ Check every 5 seconds
+    def end_session(self):
+        """Ends the session on logout."""
+        self.active = False
+        self.username = None
+        session_registry.end(self.key)
+        wipe_decrypted_cache()
 
-            if not self.validate_session():
-                break
+    def _on_expired(self, session_key, state):
+        self.expire_session()
 
     def update_timeout(self, new_timeout):
         """Update session timeout dynamically."""
         self.timeout = new_timeout
+        session_registry.set_timeout(self.key, new_timeout)
+        get_decrypted_cache().set_ttl(new_timeout)
         if self.preferences:
             self.preferences['session_timeout'] = new_timeout
 
@@ -68,6 +275,4 @@ class SessionManager:
         """Get remaining session time in seconds."""
         if not self.active:
             return 0
-        elapsed = time.time() - self.start_time
-        remaining = max(0, self.timeout - elapsed)
-        return int(remaining)
\ No newline at end of file
+        return session_registry.remaining(self.key)
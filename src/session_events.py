@@ -0,0 +1,96 @@
+import threading
+import time
+
+from event_bus import event_bus, session_topic
+from session import session_registry
+from session_store import get_session_store
+
+# How long before expiry a session_warning event is pushed (seconds)
+SESSION_WARNING_SECONDS = 60
+
+_warned = set()
+_warned_lock = threading.Lock()
+
+
+def events_supported():
+    """
+    Whether /api/events can be served.
+
+    The event bus only reaches subscribers in this process, so when the
+    session store is shared between worker processes (the SQLite store) a
+    stream on one worker would miss events published on the others; pages
+    poll instead.
+    """
+    return not get_session_store().shared
+
+
+def _watch_key(session_id):
+    return ("session-events", session_id)
+
+
+def session_status_data(state):
+    """The payload of a 'session' event for a store entry (or None when expired)."""
+    if state is None:
+        return {"active": False, "remaining_time": 0}
+    return {
+        "active": True,
+        "remaining_time": state["remaining_time"],
+        "timeout": state["timeout"],
+    }
+
+
+def watch_session(session_id):
+    """
+    Pushes warning and expiry events for a session while anyone listens.
+
+    The check runs on the shared session scheduler thread at the session's
+    next interesting moment (the warning point, then the deadline) and
+    re-reads the store each time, so activity seen by other worker processes
+    simply moves the next check out.
+    """
+    _check_session(_watch_key(session_id))
+
+
+def unwatch_session(session_id):
+    """Stops watching once the session's last listener has gone."""
+    if not event_bus.has_subscribers(session_topic(session_id)):
+        session_registry.scheduler.cancel(_watch_key(session_id))
+        with _warned_lock:
+            _warned.discard(session_id)
+
+
+def publish_session_status(session_id):
+    """Pushes the session's current status (after a refresh or timeout change)."""
+    with _warned_lock:
+        _warned.discard(session_id)
+    topic = session_topic(session_id)
+    if event_bus.has_subscribers(topic):
+        event_bus.publish(topic, "session", session_status_data(get_session_store().get(session_id)))
+        _check_session(_watch_key(session_id))
+
+
+def _check_session(key):
+    session_id = key[1]
+    topic = session_topic(session_id)
+    if not event_bus.has_subscribers(topic):
+        return
+
+    state = get_session_store().get(session_id)
+    if state is None:
+        with _warned_lock:
+            _warned.discard(session_id)
+        event_bus.publish(topic, "session_expired", session_status_data(None))
+        return
+
+    remaining = state["remaining_time"]
+    if remaining <= SESSION_WARNING_SECONDS:
+        with _warned_lock:
+            first_warning = session_id not in _warned
+            _warned.add(session_id)
+        if first_warning:
+            event_bus.publish(topic, "session_warning", session_status_data(state))
+        # remaining_time is in whole seconds, so check again just past the deadline
+        delay = remaining + 1
+    else:
+        delay = remaining - SESSION_WARNING_SECONDS
+    session_registry.scheduler.schedule(key, time.monotonic() + delay, _check_session)
@@ -0,0 +1,213 @@
+import os
+import secrets
+from abc import ABC, abstractmethod
+import threading
+import time
+
+from database import get_connection
+from session import DEFAULT_SESSION_TIMEOUT, session_registry
+
+# How often the SQLite store deletes expired rows (seconds)
+PURGE_INTERVAL = 60
+
+
+def new_session_id():
+    """Returns a fresh unguessable session id."""
+    return secrets.token_urlsafe(32)
+
+
+class SessionStore(ABC):
+    """
+    Server-side session state keyed by session id.
+
+    Each browser session carries only its id (session['session_id']); its
+    username, timeout and deadline live in the store, so every request sees
+    just the caller's own state.
+    """
+
+    # True when other worker processes see the same sessions
+    shared = False
+
+    @abstractmethod
+    def create(self, username, timeout=DEFAULT_SESSION_TIMEOUT):
+        """Starts a session and returns its id."""
+
+    @abstractmethod
+    def get(self, session_id):
+        """
+        Returns the session as a dict (session_id, username, timeout,
+        remaining_time) or None if it does not exist or has expired.
+        """
+
+    @abstractmethod
+    def touch(self, session_id):
+        """Records activity, extending the session; False if it has expired."""
+
+    @abstractmethod
+    def set_timeout(self, session_id, timeout):
+        """Changes the session's timeout, measured from its last activity."""
+
+    @abstractmethod
+    def delete(self, session_id):
+        """Ends the session (logout)."""
+
+
+class InMemorySessionStore(SessionStore):
+    """Sessions held in this process, expired by the shared session scheduler."""
+
+    def __init__(self, registry=None):
+        self.registry = registry or session_registry
+
+    def create(self, username, timeout=DEFAULT_SESSION_TIMEOUT):
+        session_id = new_session_id()
+        self.registry.start(session_id, username, timeout)
+        return session_id
+
+    def get(self, session_id):
+        state = self.registry.get(session_id) if session_id else None
+        if state is None:
+            return None
+        return {
+            "session_id": session_id,
+            "username": state.username,
+            "timeout": state.timeout,
+            "remaining_time": self.registry.remaining(session_id),
+        }
+
+    def touch(self, session_id):
+        return bool(session_id) and self.registry.touch(session_id)
+
+    def set_timeout(self, session_id, timeout):
+        return bool(session_id) and self.registry.set_timeout(session_id, timeout)
+
+    def delete(self, session_id):
+        if session_id:
+            self.registry.end(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions kept in the vault database, shared by every worker process.
+
+    Deadlines are wall-clock expires_at values, checked on every read; expired
+    rows are purged at most every PURGE_INTERVAL seconds.
+    """
+
+    shared = True
+
+    def __init__(self):
+        self._next_purge = 0.0
+        self._purge_lock = threading.Lock()
+
+    def create(self, username, timeout=DEFAULT_SESSION_TIMEOUT):
+        self._maybe_purge()
+        session_id = new_session_id()
+        now = time.time()
+        conn = get_connection()
+        conn.execute(
+            """
+            INSERT INTO sessions (session_id, username, timeout, created_at, last_activity, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (session_id, username, timeout, now, now, now + timeout)
+        )
+        conn.commit()
+        conn.close()
+        return session_id
+
+    def get(self, session_id):
+        if not session_id:
+            return None
+        conn = get_connection()
+        row = conn.execute(
+            "SELECT username, timeout, expires_at FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time())
+        ).fetchone()
+        conn.close()
+        if not row:
+            return None
+        return {
+            "session_id": session_id,
+            "username": row[0],
+            "timeout": row[1],
+            "remaining_time": max(0, int(row[2] - time.time())),
+        }
+
+    def touch(self, session_id):
+        if not session_id:
+            return False
+        now = time.time()
+        conn = get_connection()
+        cursor = conn.execute(
+            """
+            UPDATE sessions SET last_activity = ?, expires_at = ? + timeout
+            WHERE session_id = ? AND expires_at > ?
+            """,
+            (now, now, session_id, now)
+        )
+        conn.commit()
+        conn.close()
+        return cursor.rowcount > 0
+
+    def set_timeout(self, session_id, timeout):
+        if not session_id:
+            return False
+        conn = get_connection()
+        cursor = conn.execute(
+            """
+            UPDATE sessions SET timeout = ?, expires_at = last_activity + ?
+            WHERE session_id = ? AND expires_at > ?
+            """,
+            (timeout, timeout, session_id, time.time())
+        )
+        conn.commit()
+        conn.close()
+        return cursor.rowcount > 0
+
+    def delete(self, session_id):
+        if not session_id:
+            return
+        conn = get_connection()
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.commit()
+        conn.close()
+
+    def purge_expired(self):
+        """Deletes expired sessions; returns how many were removed."""
+        conn = get_connection()
+        cursor = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount
+
+    def _maybe_purge(self):
+        now = time.monotonic()
+        with self._purge_lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + PURGE_INTERVAL
+        self.purge_expired()
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def create_session_store(kind=None):
+    """Builds a store from kind or AEGISVAULT_SESSION_STORE ('memory' or 'sqlite')."""
+    kind = (kind or os.environ.get("AEGISVAULT_SESSION_STORE", "memory")).lower()
+    if kind == "memory":
+        return InMemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown session store: {kind}")
+
+
+def get_session_store():
+    """Returns the process-wide session store, created on first use."""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = create_session_store()
+    return _session_store
@@ -1,11 +1,16 @@
 // Auto-Lock Features for AegisVault
+
+// Session status poll used when the server can't push events (ms)
+const FALLBACK_POLL_MS = 30000;
+
 class AutoLockManager {
     constructor() {
         this.inactivityTimer = null;
         this.lastActivity = Date.now();
         this.isLocked = false;
         this.preferences = null;
-        this.sessionCheckInterval = null;
+        this.eventSource = null;
+        this.pollInterval = null;
         
         this.init();
     }
@@ -93,12 +98,48 @@ class AutoLockManager {
     }
 
     startSessionMonitoring() {
-        // Check session status every 30 seconds
-        this.sessionCheckInterval = setInterval(async () => {
+        // The server pushes session and stats changes; nothing is polled
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+        this.eventSource = new EventSource('/api/events');
+
+        ['session', 'session_warning', 'session_expired', 'audit_stats_changed'].forEach(type => {
+            this.eventSource.addEventListener(type, (event) => {
+                const data = JSON.parse(event.data);
+                // Let pages (dashboard, audit logs) react to the same stream
+                document.dispatchEvent(new CustomEvent(`aegis:${type}`, { detail: data }));
+                if (type === 'session_warning') {
+                    console.warn(`Session expires in ${data.remaining_time}s`);
+                } else if (type === 'session_expired' || (type === 'session' && !data.active)) {
+                    this.lockSession();
+                }
+            });
+        });
+
+        this.eventSource.onerror = () => {
+            // The browser reconnects by itself unless the server refused the stream
+            // (a 204 when the server runs several workers and can't push to this one)
+            if (this.eventSource.readyState === EventSource.CLOSED && !this.isLocked) {
+                console.warn('Session event stream unavailable; polling instead');
+                this.startPolling();
+            }
+        };
+    }
+
+    startPolling() {
+        if (this.pollInterval) {
+            return;
+        }
+        // Pages that refresh on pushed events (audit logs) poll at their own pace
+        document.dispatchEvent(new CustomEvent('aegis:events_unavailable'));
+        this.pollInterval = setInterval(async () => {
             try {
                 const response = await fetch('/api/session/status');
                 if (response.ok) {
                     const data = await response.json();
+                    document.dispatchEvent(new CustomEvent('aegis:session', { detail: data }));
                     if (!data.active) {
                         this.lockSession();
                     }
@@ -106,7 +147,7 @@ class AutoLockManager {
             } catch (error) {
                 console.error('Session check failed:', error);
             }
-        }, 30000);
+        }, FALLBACK_POLL_MS);
     }
 
     handleInactivity() {
@@ -217,8 +258,11 @@ class AutoLockManager {
         if (this.inactivityTimer) {
             clearTimeout(this.inactivityTimer);
         }
-        if (this.sessionCheckInterval) {
-            clearInterval(this.sessionCheckInterval);
+        if (this.eventSource) {
+            this.eventSource.close();
+        }
+        if (this.pollInterval) {
+            clearInterval(this.pollInterval);
         }
 
         // Show lock notification
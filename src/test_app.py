@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the Flask endpoints.
+"""
+
+import contextlib
+import importlib
+import os
+import sys
+import tempfile
+
+import pytest
+
+import breach_filter
+import session_store
+from conftest import temporary_database
+from session_events import events_supported
+from session_store import SQLiteSessionStore
+
+BREACHED = ["password", "Summer2024!"]
+
+
+@contextlib.contextmanager
+def _app_client():
+    """A test client for a freshly imported app, backed by a throwaway database and breach filter."""
+    directory = tempfile.mkdtemp()
+    wordlist = os.path.join(directory, "wordlist.txt")
+    with open(wordlist, "w", encoding="utf-8") as file:
+        file.write("\n".join(BREACHED))
+    filter_path = os.path.join(directory, "breached.bloom")
+    breach_filter.build_filter(wordlist, filter_path)
+
+    previous_path = os.environ.get("AEGISVAULT_BREACH_FILTER")
+    previous_filter = (breach_filter._breach_filter, breach_filter._breach_filter_loaded)
+    os.environ["AEGISVAULT_BREACH_FILTER"] = filter_path
+    breach_filter._breach_filter, breach_filter._breach_filter_loaded = None, False
+    try:
+        with temporary_database():
+            sys.modules.pop("app", None)
+            app_module = importlib.import_module("app")
+            client = app_module.app.test_client()
+            with client.session_transaction() as flask_session:
+                flask_session["user_id"] = "alice"
+            yield client
+    finally:
+        sys.modules.pop("app", None)
+        if breach_filter._breach_filter is not None:
+            breach_filter._breach_filter.close()
+        breach_filter._breach_filter, breach_filter._breach_filter_loaded = previous_filter
+        if previous_path is None:
+            os.environ.pop("AEGISVAULT_BREACH_FILTER", None)
+        else:
+            os.environ["AEGISVAULT_BREACH_FILTER"] = previous_path
+
+
+@pytest.fixture(scope="module")
+def client():
+    with _app_client() as test_client:
+        yield test_client
+
+
+def test_analyze_password_flags_breached_passwords(client):
+    """The live strength meter checks the breached-password filter."""
+    print("🔧 Testing /analyze_password against the breach filter...")
+    analysis = client.post("/analyze_password", json={"password": "Summer2024!"}).get_json()
+    print(f"   Summer2024!: {analysis['strength_level']} breached={analysis['breached']}")
+    assert analysis["breached"] is True
+    assert analysis["strength_level"] == "Very Weak"
+    assert client.post("/analyze_password", json={"password": "Kx7#vQ!2pLm$9zR"}).get_json()["breached"] is False
+
+
+def test_events_are_refused_with_a_shared_session_store(client):
+    """With sessions shared between workers the page polls instead of holding a stream."""
+    print("🔧 Testing /api/events with the SQLite session store...")
+    assert events_supported()
+    previous_store = session_store._session_store
+    session_store._session_store = SQLiteSessionStore()
+    try:
+        assert not events_supported()
+        session_id = session_store._session_store.create("alice", 60)
+        with client.session_transaction() as flask_session:
+            flask_session["session_id"] = session_id
+        response = client.get("/api/events")
+        assert response.status_code == 204
+        assert client.get("/api/session/status").get_json()["active"] is True
+    finally:
+        session_store._session_store = previous_store
+
+
+def test_audit_log_paging_parameters_are_validated(client):
+    """Non-numeric limits and offsets and unreadable cursors are client errors, not 500s."""
+    print("🔧 Testing /api/audit_logs parameter validation...")
+    assert client.get("/api/audit_logs?limit=5").status_code == 200
+    assert client.get("/api/audit_logs?offset=5").status_code == 200
+    for query in ("limit=ten", "offset=1.5", "limit=5&offset=x", "cursor=bogus", "direction=up"):
+        response = client.get(f"/api/audit_logs?{query}")
+        assert response.status_code == 400, query
+        assert "error" in response.get_json()
+
+
+if __name__ == "__main__":
+    print("🚀 Starting App Tests...\n")
+
+    try:
+        with _app_client() as test_client:
+            test_analyze_password_flags_breached_passwords(test_client)
+            test_events_are_refused_with_a_shared_session_store(test_client)
+            test_audit_log_paging_parameters_are_validated(test_client)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
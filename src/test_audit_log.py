@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Test script for audit log queries and cursor pagination.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import database
+
+
+def _row(username, action_type, created_at, success=True):
+    return (username, action_type, f"{action_type} by {username}", None, "127.0.0.1",
+            "pytest", success, None, "session", None, created_at)
+
+
+def _seed_audit_logs():
+    """Replaces the audit log with a fixed set of rows (some sharing a timestamp); returns them newest first."""
+    conn = database.get_connection()
+    try:
+        conn.execute("DELETE FROM audit_logs")
+        conn.execute("DELETE FROM audit_stats_daily")
+        conn.commit()
+    finally:
+        conn.close()
+
+    rows = []
+    for i in range(25):
+        # Pairs of rows share a second, so ties are broken by id
+        created_at = f"2020-01-{1 + i // 2:02d} 12:00:00"
+        rows.append(_row("alice", "LOGIN" if i % 3 else "VIEW_PASSWORD", created_at, success=i % 4 != 0))
+    rows.append(_row("bob", "LOGIN", "2020-01-05 12:00:00"))
+    database._write_audit_batch(rows)
+
+    conn = database.get_connection()
+    try:
+        stored = conn.execute(
+            "SELECT id, username, action_type, success, created_at FROM audit_logs "
+            "ORDER BY created_at DESC, id DESC"
+        ).fetchall()
+    finally:
+        conn.close()
+    return stored
+
+
+def _walk(direction="next", cursor=None, **filters):
+    """Follows cursors until the last page; returns the pages' id lists."""
+    pages = []
+    while True:
+        page = database.get_audit_logs_page(limit=10, cursor=cursor, direction=direction, **filters)
+        pages.append([log["id"] for log in page["logs"]])
+        cursor = page["next_cursor" if direction == "next" else "prev_cursor"]
+        if cursor is None:
+            return pages, page
+
+
+def test_cursor_pages_cover_every_row_once(temp_db):
+    """Next cursors walk all rows newest first; prev cursors walk back to the same pages."""
+    print("🔧 Testing cursor paging boundaries...")
+    stored = _seed_audit_logs()
+    expected = [row[0] for row in stored if row[1] == "alice"]
+
+    pages, last_page = _walk(username="alice")
+    print(f"   Page sizes: {[len(page) for page in pages]}")
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == expected
+    assert last_page["next_cursor"] is None
+
+    first_page = database.get_audit_logs_page(username="alice", limit=10)
+    assert first_page["prev_cursor"] is None
+    assert first_page["next_cursor"] is not None
+
+    # Paging back from the last page returns the earlier pages unchanged
+    back, newest = _walk("prev", last_page["prev_cursor"], username="alice")
+    assert back == pages[1::-1]
+    assert newest["prev_cursor"] is None
+
+    # A page that ends exactly at the last row has no next cursor
+    exact = database.get_audit_logs_page(username="alice", limit=25)
+    assert len(exact["logs"]) == 25 and exact["next_cursor"] is None
+
+
+def test_filters_combine(temp_db):
+    """Username, action type, success and date filters narrow the same ordered rows."""
+    print("🔧 Testing filter combinations...")
+    stored = _seed_audit_logs()
+    cases = [
+        ({"username": "alice", "action_type": "LOGIN"}, lambda row: row[1] == "alice" and row[2] == "LOGIN"),
+        ({"username": "alice", "success_only": False}, lambda row: row[1] == "alice" and not row[3]),
+        ({"action_type": "LOGIN", "success_only": True}, lambda row: row[2] == "LOGIN" and row[3]),
+        ({"start_date": "2020-01-04 00:00:00", "end_date": "2020-01-08 23:59:59"},
+         lambda row: "2020-01-04" <= row[4][:10] <= "2020-01-08"),
+    ]
+    for filters, keep in cases:
+        expected = [row[0] for row in stored if keep(row)]
+        pages, _ = _walk(**filters)
+        assert sum(pages, []) == expected, filters
+        offset_ids = [log["id"] for log in database.get_audit_logs(limit=1000, **filters)]
+        assert offset_ids == expected, filters
+
+
+def test_invalid_and_tampered_cursors(temp_db):
+    """Cursors that don't decode to a (timestamp, id) position are rejected with ValueError."""
+    print("🔧 Testing invalid cursors...")
+    cursor = database.encode_audit_cursor("2020-01-05 12:00:00", 42)
+    assert database.decode_audit_cursor(cursor) == ("2020-01-05 12:00:00", 42)
+
+    def encode(value):
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+    bad_cursors = [
+        "not a cursor!",
+        cursor[:-3],
+        encode(["2020-01-05 12:00:00", "42"]),
+        encode([20260105, 42]),
+        encode({"created_at": "2020-01-05 12:00:00", "id": 42}),
+        encode(["2020-01-05 12:00:00", 42, "extra"]),
+    ]
+    for bad in bad_cursors:
+        try:
+            database.get_audit_logs_page(cursor=bad)
+            assert False, f"expected ValueError for {bad!r}"
+        except ValueError:
+            pass
+
+    try:
+        database.get_audit_logs_page(direction="sideways")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def _rollup_and_log_counts():
+    """Per (username, day, action_type, success) counts from the rollup and from audit_logs itself."""
+    conn = database.get_connection()
+    try:
+        rollup = conn.execute(
+            "SELECT username, day, action_type, success, event_count FROM audit_stats_daily"
+        ).fetchall()
+        logs = conn.execute("""
+            SELECT username, date(created_at), action_type, COALESCE(success, 1), COUNT(*)
+            FROM audit_logs
+            GROUP BY username, date(created_at), action_type, COALESCE(success, 1)
+        """).fetchall()
+        total = conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0]
+    finally:
+        conn.close()
+    return sorted(rollup), sorted(logs), total
+
+
+def _assert_rollup_matches_logs():
+    rollup, logs, total = _rollup_and_log_counts()
+    assert rollup == logs
+    assert sum(row[4] for row in rollup) == total
+    return total
+
+
+def test_rollup_tracks_inserts_backfill_and_cleanup(temp_db):
+    """audit_stats_daily always sums to COUNT(*) over audit_logs, and the stats read from it."""
+    print("🔧 Testing the audit statistics rollup...")
+    _seed_audit_logs()
+    now = datetime.now(timezone.utc)
+
+    def days_ago(days):
+        return (now - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    database._write_audit_batch([
+        _row("alice", "LOGIN", days_ago(0)),
+        _row("alice", "LOGIN", days_ago(1), success=False),
+        _row("alice", "EXPORT", days_ago(2), success=None),
+        _row("bob", "LOGIN", days_ago(3)),
+    ])
+    # Through the background writer too
+    for i in range(5):
+        database.log_audit_event("alice", "VIEW_PASSWORD", "viewed", success=i != 0)
+    assert database.flush_audit_log()
+    total = _assert_rollup_matches_logs()
+    print(f"   {total} events after inserts")
+
+    stats = database.get_audit_log_stats(username="alice", days=30)
+    print(f"   {stats}")
+    assert stats["total_events"] == 8
+    assert stats["events_by_type"] == {"LOGIN": 2, "EXPORT": 1, "VIEW_PASSWORD": 5}
+    assert stats["success_stats"] == {1: 6, 0: 2}
+    assert database.get_audit_log_stats(days=30)["total_events"] == 9
+
+    # Rebuilding the rollup from scratch gives the same counts
+    conn = database.get_connection()
+    try:
+        conn.execute("DELETE FROM audit_stats_daily")
+        conn.commit()
+    finally:
+        conn.close()
+    database.init_db()
+    assert _assert_rollup_matches_logs() == total
+
+    # The seeded January rows are well past a 90 day retention
+    assert database.cleanup_old_audit_logs(retention_days=90) == 26
+    assert _assert_rollup_matches_logs() == total - 26
+    assert database.get_audit_log_stats(username="alice", days=30) == stats
+    assert database.get_audit_log_stats(username="alice", days=3650)["total_events"] == 8
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Audit Log Tests...\n")
+
+    from conftest import temporary_database
+
+    try:
+        with temporary_database() as temp_db:
+            test_cursor_pages_cover_every_row_once(temp_db)
+            test_filters_combine(temp_db)
+            test_invalid_and_tampered_cursors(temp_db)
+            test_rollup_tracks_inserts_backfill_and_cleanup(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous audit log writer.
+"""
+
+import threading
+import time
+
+from audit_writer import AuditLogWriter
+
+
+class RecordingSink:
+    """Collects written batches in memory."""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        with self.lock:
+            return [row for batch in self.batches for row in batch]
+
+
+def test_size_threshold_batches_events():
+    """Events are written together once a batch fills up."""
+    print("🔧 Testing size-triggered batching...")
+    sink = RecordingSink()
+    writer = AuditLogWriter(sink, batch_size=10, flush_interval=60)
+
+    for i in range(25):
+        writer.submit(("user", "LOGIN", i), action_type="LOGIN")
+    writer.flush(timeout=2)
+
+    print(f"   Batch sizes: {[len(b) for b in sink.batches]}")
+    assert [len(b) for b in sink.batches] == [10, 10, 5]
+    assert [row[2] for row in sink.rows] == list(range(25))
+    writer.shutdown()
+
+
+def test_interval_flush():
+    """A lone event is written once flush_interval has passed."""
+    print("🔧 Testing interval-triggered flush...")
+    sink = RecordingSink()
+    writer = AuditLogWriter(sink, batch_size=100, flush_interval=0.05)
+
+    writer.submit(("user", "LOGOUT"), action_type="LOGOUT")
+    time.sleep(0.3)
+
+    assert len(sink.rows) == 1
+    assert writer.get_metrics()["flushes_by_reason"]["interval"] == 1
+    writer.shutdown()
+
+
+def test_critical_events_are_durable():
+    """Critical actions return only after they have been written."""
+    print("🔧 Testing flush-on-critical...")
+    sink = RecordingSink()
+    writer = AuditLogWriter(sink, batch_size=100, flush_interval=60)
+
+    writer.submit(("user", "LOGIN"), action_type="LOGIN")
+    assert sink.rows == []
+    writer.submit(("user", "LOGIN_FAILED"), action_type="LOGIN_FAILED")
+
+    assert len(sink.rows) == 2
+    assert writer.get_metrics()["critical_flushes"] == 1
+    writer.shutdown()
+
+
+def test_backpressure_falls_back_to_sync_write():
+    """A full queue makes callers write synchronously instead of dropping events."""
+    print("🔧 Testing backpressure...")
+    sink = RecordingSink(delay=0.05)
+    writer = AuditLogWriter(sink, batch_size=1, flush_interval=60,
+                            max_queue_size=2, enqueue_timeout=0.01)
+
+    for i in range(20):
+        writer.submit(("user", "EVENT", i), action_type="EVENT")
+    writer.shutdown()
+
+    metrics = writer.get_metrics()
+    print(f"   Metrics: {metrics}")
+    assert metrics["sync_fallbacks"] > 0
+    assert sorted(row[2] for row in sink.rows) == list(range(20))
+
+
+def test_flush_times_out_on_a_full_queue():
+    """flush() gives up after its timeout even when the queue has no room for the request."""
+    print("🔧 Testing flush timeout on a full queue...")
+    release = threading.Event()
+    writer = AuditLogWriter(lambda rows: release.wait(), batch_size=1, flush_interval=60,
+                            max_queue_size=1, enqueue_timeout=0.01)
+    writer.submit(("user", "EVENT", 0), action_type="EVENT")
+    time.sleep(0.05)  # The writer is now stuck in the sink
+    writer.submit(("user", "EVENT", 1), action_type="EVENT")
+
+    start = time.monotonic()
+    assert writer.flush(timeout=0.1) is False
+    assert time.monotonic() - start < 1.0
+    release.set()
+    writer.shutdown()
+
+
+def test_shutdown_times_out_on_a_full_queue():
+    """shutdown() gives up after its timeout when the queue has no room for the stop request."""
+    print("🔧 Testing shutdown timeout on a full queue...")
+    release = threading.Event()
+    writer = AuditLogWriter(lambda rows: release.wait(), batch_size=1, flush_interval=60,
+                            max_queue_size=1, enqueue_timeout=0.01)
+    writer.submit(("user", "EVENT", 0), action_type="EVENT")
+    time.sleep(0.05)  # The writer is now stuck in the sink
+    writer.submit(("user", "EVENT", 1), action_type="EVENT")
+
+    start = time.monotonic()
+    assert writer.shutdown(timeout=0.1) is False
+    assert time.monotonic() - start < 1.0
+    release.set()
+
+
+def test_shutdown_writes_pending_events():
+    """Pending events are written when the writer shuts down."""
+    print("🔧 Testing shutdown flush...")
+    sink = RecordingSink()
+    writer = AuditLogWriter(sink, batch_size=100, flush_interval=60)
+
+    for i in range(5):
+        writer.submit(("user", "EVENT", i), action_type="EVENT")
+    assert writer.shutdown() is True
+
+    assert len(sink.rows) == 5
+    assert writer.get_metrics()["flushes_by_reason"]["shutdown"] == 1
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Audit Writer Tests...\n")
+
+    try:
+        test_size_threshold_batches_events()
+        test_interval_flush()
+        test_critical_events_are_durable()
+        test_backpressure_falls_back_to_sync_write()
+        test_flush_times_out_on_a_full_queue()
+        test_shutdown_times_out_on_a_full_queue()
+        test_shutdown_writes_pending_events()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
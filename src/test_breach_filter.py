@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the breached-password Bloom filter.
+"""
+
+import os
+import tempfile
+
+from breach_filter import BreachFilter, build_filter
+from password_strength import PasswordStrengthAnalyzer
+
+BREACHED = ["password", "123456", "Summer2024!", "correct horse battery staple", "pässwört"]
+
+
+def _build(entries, false_positive_rate=0.001):
+    directory = tempfile.mkdtemp()
+    wordlist = os.path.join(directory, "wordlist.txt")
+    with open(wordlist, "w", encoding="utf-8") as file:
+        file.write("\n".join(entries) + "\r\n\n")
+    path = os.path.join(directory, "breached.bloom")
+    return build_filter(wordlist, path, false_positive_rate), path
+
+
+def test_membership_and_false_positive_rate():
+    """Every listed password is found; unlisted ones rarely are."""
+    print("🔧 Testing filter membership...")
+    entries = BREACHED + [f"leaked-{i}" for i in range(20000)]
+    result, path = _build(entries, 0.01)
+    print(f"   {result}")
+    assert result["entries"] == len(entries)
+
+    breach_filter = BreachFilter(path)
+    try:
+        assert all(entry in breach_filter for entry in entries)
+        false_positives = sum(f"fresh-{i}" in breach_filter for i in range(20000))
+        print(f"   False positives: {false_positives} / 20000")
+        assert false_positives < 20000 * 0.02
+    finally:
+        breach_filter.close()
+
+
+def test_analyzer_flags_breached_passwords():
+    """Breached passwords are flagged and capped at Very Weak, in single and batch analysis."""
+    print("🔧 Testing analyzer integration...")
+    _, path = _build(BREACHED)
+    breach_filter = BreachFilter(path)
+    try:
+        analyzer = PasswordStrengthAnalyzer(breach_filter=breach_filter)
+        analysis = analyzer.analyze_password("Summer2024!")
+        print(f"   Summer2024!: {analysis['strength_level']} {analysis['issues'][0]}")
+        assert analysis["breached"] is True
+        assert analysis["strength_level"] == "Very Weak"
+        assert analysis["issues"][0] == "Found in a list of breached passwords"
+        assert analyzer.analyze_password("Kx7#vQ!2pLm$9zR")["breached"] is False
+
+        passwords = ["Summer2024!", "Kx7#vQ!2pLm$9zR", "", "pässwört"]
+        rows = list(analyzer.analyze_many(passwords).rows())
+        for password, row in zip(passwords, rows):
+            summary = analyzer.summarize_password(password)
+            assert row == (summary["strength_score"], summary["strength_level"],
+                           summary["entropy"], int(summary["breached"])), password
+        assert [row[3] for row in rows] == [1, 0, 0, 1]
+    finally:
+        breach_filter.close()
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Breach Filter Tests...\n")
+
+    try:
+        test_membership_and_false_positive_rate()
+        test_analyzer_flags_breached_passwords()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
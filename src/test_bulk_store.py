@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for storing credentials in bulk.
+"""
+
+import database
+
+
+def _credential_ids():
+    conn = database.get_connection()
+    try:
+        return dict(conn.execute("SELECT website, id FROM credentials").fetchall())
+    finally:
+        conn.close()
+
+
+def _execute(sql):
+    conn = database.get_connection()
+    try:
+        conn.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_entries_are_written_in_chunks(temp_db):
+    """Entries are consumed lazily and written chunk_size at a time in one transaction."""
+    print("🔧 Testing chunking...")
+    _execute("DELETE FROM credentials")
+    chunk_sizes = []
+    write_chunk = database._write_credential_chunk
+
+    def recording_write_chunk(cursor, chunk, failed):
+        chunk_sizes.append(len(chunk))
+        return write_chunk(cursor, chunk, failed)
+
+    database._write_credential_chunk = recording_write_chunk
+    try:
+        entries = ((f"site{i}.com", f"user{i}", f"Pass{i}!") for i in range(8))
+        result = database.store_passwords_bulk(entries, chunk_size=3)
+    finally:
+        database._write_credential_chunk = write_chunk
+
+    print(f"   {result}, chunks {chunk_sizes}")
+    assert result == {"stored": 8, "failed": []}
+    assert chunk_sizes == [3, 3, 2]
+    assert database.retrieve_password("site7.com") == ("user7", "Pass7!")
+    assert database.get_total_stored_passwords() == 8
+
+    # Exactly one chunk's worth, and a dict entry
+    assert database.store_passwords_bulk(
+        [{"website": "a.com", "username": "u", "password": "p"}, ("b.com", "u", "p")], chunk_size=2
+    ) == {"stored": 2, "failed": []}
+
+    try:
+        database.store_passwords_bulk([("c.com", "u", "p")], chunk_size=0)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_existing_websites_are_upserted(temp_db):
+    """Existing and soft-deleted websites are updated in place, keeping their ids."""
+    print("🔧 Testing upserts...")
+    _execute("DELETE FROM credentials")
+    database.store_password("keep.com", "old-user", "OldPass1!")
+    database.store_password("restore.com", "old-user", "OldPass2!")
+    database.delete_password("restore.com")
+    ids = _credential_ids()
+
+    result = database.store_passwords_bulk([
+        ("keep.com", "new-user", "NewPass1!"),
+        ("restore.com", "new-user", "NewPass2!"),
+        ("new.com", "new-user", "NewPass3!"),
+        ("new.com", "last-wins", "NewPass4!"),
+    ], chunk_size=2)
+    assert result == {"stored": 4, "failed": []}
+
+    after = _credential_ids()
+    assert after["keep.com"] == ids["keep.com"] and after["restore.com"] == ids["restore.com"]
+    assert database.retrieve_password("keep.com") == ("new-user", "NewPass1!")
+    assert database.retrieve_password("restore.com") == ("new-user", "NewPass2!")
+    assert database.retrieve_password("new.com") == ("last-wins", "NewPass4!")
+    assert database.get_total_stored_passwords() == 3
+
+
+def test_failures_are_reported_and_the_rest_committed(temp_db):
+    """Invalid entries and rows the database rejects are reported; the rest of their chunk is kept."""
+    print("🔧 Testing partial failures...")
+    _execute("DELETE FROM credentials")
+    _execute("""
+        CREATE TRIGGER reject_test_row BEFORE INSERT ON credentials
+        WHEN new.website = 'rejected.com'
+        BEGIN
+            SELECT RAISE(ABORT, 'rejected by test trigger');
+        END
+    """)
+    try:
+        result = database.store_passwords_bulk([
+            ("one.com", "u", "p1"),
+            ("rejected.com", "u", "p2"),      # fails inside the executemany
+            ("three.com", "u", "p3"),
+            {"website": "four.com", "username": "u"},  # missing password
+            ("", "u", "p5"),
+            ("six.com", None, "p6"),
+            ("seven.com", "u", "p7"),
+        ], chunk_size=3)
+    finally:
+        _execute("DROP TRIGGER reject_test_row")
+
+    print(f"   {result}")
+    assert result["stored"] == 3
+    failures = {failure["index"]: failure for failure in result["failed"]}
+    assert sorted(failures) == [1, 3, 4, 5]
+    assert failures[1]["website"] == "rejected.com" and "rejected by test trigger" in failures[1]["error"]
+    assert failures[3]["website"] == "four.com" and failures[3]["error"].startswith("Invalid entry")
+    assert failures[5]["error"] == "Invalid entry: username must be a string"
+
+    # The rejected row's chunk neighbours were rolled back to the savepoint and written again
+    assert sorted(_credential_ids()) == ["one.com", "seven.com", "three.com"]
+    assert database.retrieve_password("three.com") == ("u", "p3")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Bulk Store Tests...\n")
+
+    from conftest import temporary_database
+
+    try:
+        with temporary_database() as temp_db:
+            test_entries_are_written_in_chunks(temp_db)
+            test_existing_websites_are_upserted(temp_db)
+            test_failures_are_reported_and_the_rest_committed(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite connection pool.
+"""
+
+import os
+import tempfile
+import threading
+
+from connection_pool import ConnectionPool, PoolExhaustedError
+
+
+def _temp_db_path():
+    return os.path.join(tempfile.mkdtemp(), "pool_test.db")
+
+
+def test_connections_are_reused():
+    """A released connection should be handed out again instead of reopened."""
+    print("🔧 Testing connection reuse...")
+    pool = ConnectionPool(_temp_db_path(), max_size=2)
+
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+
+    for _ in range(10):
+        conn = pool.acquire()
+        conn.execute("INSERT INTO items (name) VALUES ('x')")
+        conn.commit()
+        conn.close()
+
+    stats = pool.get_stats()
+    print(f"   Stats: {stats}")
+    assert stats["created"] == 1
+    assert stats["checkouts"] == 11
+
+    conn = pool.acquire()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 10
+    conn.close()
+    pool.close()
+
+
+def test_release_rolls_back_and_resets_state():
+    """Uncommitted work and row_factory must not leak to the next caller."""
+    print("🔧 Testing connection reset on release...")
+    pool = ConnectionPool(_temp_db_path(), max_size=1)
+
+    with pool.acquire() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+
+    conn = pool.acquire()
+    conn.row_factory = lambda cursor, row: row[0]
+    conn.execute("INSERT INTO items DEFAULT VALUES")
+    conn.close()  # No commit
+
+    conn = pool.acquire()
+    assert conn.row_factory is None
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    conn.close()
+    pool.close()
+
+
+def test_recycling_and_exhaustion():
+    """Connections past max_uses are replaced; an exhausted pool times out."""
+    print("🔧 Testing recycling and pool exhaustion...")
+    pool = ConnectionPool(_temp_db_path(), max_size=1, max_uses=3, acquire_timeout=0.1)
+
+    for _ in range(7):
+        pool.acquire().close()
+    assert pool.get_stats()["recycled"] == 2
+
+    held = pool.acquire()
+    try:
+        pool.acquire()
+        raise AssertionError("Expected PoolExhaustedError")
+    except PoolExhaustedError:
+        print("   Pool exhaustion detected as expected")
+    held.close()
+    pool.close()
+
+
+def test_concurrent_writers():
+    """Many threads sharing a small pool should all succeed."""
+    print("🔧 Testing concurrent writers...")
+    pool = ConnectionPool(_temp_db_path(), max_size=4)
+    with pool.acquire() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, worker INTEGER)")
+
+    def worker(n):
+        for _ in range(25):
+            with pool.acquire() as conn:
+                conn.execute("INSERT INTO items (worker) VALUES (?)", (n,))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with pool.acquire() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    print(f"   Rows written: {total}, stats: {pool.get_stats()}")
+    assert total == 200
+    assert pool.get_stats()["open"] <= 4
+    pool.close()
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Connection Pool Tests...\n")
+
+    try:
+        test_connections_are_reused()
+        test_release_rolls_back_and_resets_state()
+        test_recycling_and_exhaustion()
+        test_concurrent_writers()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the decrypted credential cache.
+"""
+
+import time
+
+from decrypted_cache import DecryptedCache
+
+
+def test_hits_require_matching_version():
+    """Entries are served only while the row version is unchanged."""
+    print("🔧 Testing cache hits and staleness...")
+    cache = DecryptedCache(enabled=True)
+    cache.put(1, 0, "example.com", "alice", "s3cret")
+
+    assert cache.get(1, 0) == {
+        "website": "example.com", "username": "alice", "password": "s3cret"
+    }
+    assert cache.get(1, 1) is None  # Row was updated
+    assert cache.get(1, 0) is None  # Stale entry was dropped
+    metrics = cache.get_metrics()
+    print(f"   Metrics: {metrics}")
+    assert (metrics["hits"], metrics["misses"], metrics["size"]) == (1, 2, 0)
+
+    # Writes also invalidate by website
+    cache.put(1, 0, "example.com", "alice", "s3cret")
+    cache.invalidate_website("example.com")
+    assert cache.get(1, 0) is None
+
+
+def test_ttl_and_lru_eviction():
+    """Entries expire after the TTL and the least recently used is evicted first."""
+    print("🔧 Testing TTL and LRU eviction...")
+    cache = DecryptedCache(max_entries=2, ttl=60, enabled=True)
+    cache.put(1, "t", "a.com", "u", "p1")
+    cache.put(2, "t", "b.com", "u", "p2")
+    cache.get(1, "t")  # 1 is now most recently used
+    cache.put(3, "t", "c.com", "u", "p3")
+    assert cache.get(2, "t") is None
+    assert cache.get(1, "t") is not None
+    assert cache.get_metrics()["evictions"] == 1
+
+    cache.set_ttl(0.05)
+    time.sleep(0.1)
+    assert cache.get(1, "t") is None
+    assert cache.get_metrics()["expirations"] == 1
+
+
+def test_ttl_per_entry():
+    """Each entry keeps the TTL it was cached with; shorten_ttl caps entries without changing the default."""
+    print("🔧 Testing per-entry TTLs...")
+    cache = DecryptedCache(ttl=60, enabled=True)
+    cache.put(1, 0, "short.com", "u", "p1", ttl=0.05)  # A session with a short timeout
+    cache.put(2, 0, "long.com", "u", "p2", ttl=60)     # Another session's longer timeout
+    cache.put(3, 0, "default.com", "u", "p3")
+    time.sleep(0.1)
+    assert cache.get(1, 0) is None
+    assert cache.get(2, 0) is not None and cache.get(3, 0) is not None
+
+    cache.shorten_ttl(0.05)
+    assert cache.ttl == 60
+    time.sleep(0.1)
+    assert cache.get(2, 0) is None and cache.get(3, 0) is None
+    cache.put(4, 0, "new.com", "u", "p4")
+    assert cache.get(4, 0) is not None
+
+
+def test_wipe_zeroes_secrets():
+    """wipe() overwrites the cached bytes before dropping them."""
+    print("🔧 Testing secure wipe...")
+    cache = DecryptedCache(enabled=True)
+    cache.put(1, "t", "a.com", "alice", "s3cret")
+    entry = cache._entries[1]
+
+    cache.wipe()
+    assert bytes(entry.password) == bytes(len("s3cret"))
+    assert bytes(entry.username) == bytes(len("alice"))
+    assert cache.get(1, "t") is None
+
+
+def test_disabled_cache_stores_nothing():
+    """The cache is opt-in; a disabled cache never stores or serves entries."""
+    print("🔧 Testing disabled cache...")
+    cache = DecryptedCache()
+    cache.put(1, "t", "a.com", "u", "p")
+    assert cache.get(1, "t") is None
+    assert cache.get_metrics()["size"] == 0
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Decrypted Cache Tests...\n")
+
+    try:
+        test_hits_require_matching_version()
+        test_ttl_and_lru_eviction()
+        test_ttl_per_entry()
+        test_wipe_zeroes_secrets()
+        test_disabled_cache_stores_nothing()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
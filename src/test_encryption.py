@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch encryption helpers.
+"""
+
+import os
+
+import encryption
+from encryption import (encrypt_data, decrypt_data, encrypt_many, decrypt_many,
+                        is_legacy_ciphertext, get_keyring, InvalidToken, ENVELOPE_VERSION,
+                        EnvKeyProvider, MemoryKeyProvider, set_key_provider,
+                        get_key_provider)
+
+_previous_provider = None
+
+
+def setup_module(module=None):
+    """Use a throwaway in-memory key so the tests never touch the real key file."""
+    global _previous_provider
+    _previous_provider = get_key_provider()
+    set_key_provider(MemoryKeyProvider())
+
+
+def teardown_module(module=None):
+    set_key_provider(_previous_provider)
+
+
+def test_batch_round_trip_keeps_order():
+    """encrypt_many/decrypt_many round-trip large batches in order."""
+    print("🔧 Testing batch round trip...")
+    original_workers = encryption.MAX_CRYPTO_WORKERS
+    encryption.MAX_CRYPTO_WORKERS = 4  # Force the threaded path even on one core
+    try:
+        values = [f"secret-{i}" for i in range(1000)]
+        tokens = encrypt_many(values)
+        assert len(tokens) == len(values)
+        assert decrypt_many(tokens) == values
+        # Tokens are interchangeable with the single-value helpers
+        assert decrypt_data(tokens[500]) == "secret-500"
+    finally:
+        encryption.MAX_CRYPTO_WORKERS = original_workers
+
+
+def test_small_batches_and_generators():
+    """Small batches stay serial and any iterable is accepted."""
+    print("🔧 Testing small batches...")
+    assert encrypt_many([]) == []
+    tokens = encrypt_many(value for value in ("a", "b", "c"))
+    assert decrypt_many(iter(tokens)) == ["a", "b", "c"]
+    assert decrypt_many([encrypt_data("x")]) == ["x"]
+
+
+def test_binary_envelope_and_legacy_tokens():
+    """New values are compact binary envelopes; legacy Fernet tokens still decrypt."""
+    print("🔧 Testing binary envelope...")
+    envelope = encrypt_data("hunter2")
+    legacy = get_keyring().fernet.encrypt(b"hunter2").decode()
+    print(f"   Envelope: {len(envelope)} bytes, legacy token: {len(legacy)} chars")
+
+    assert isinstance(envelope, bytes) and envelope[0] == ENVELOPE_VERSION
+    assert len(envelope) < len(legacy)
+    assert decrypt_data(envelope) == decrypt_data(legacy) == "hunter2"
+    assert is_legacy_ciphertext(legacy) and not is_legacy_ciphertext(envelope)
+
+
+def test_tampered_envelope_is_rejected():
+    """Flipping any bit of an envelope makes decryption fail."""
+    print("🔧 Testing tamper detection...")
+    envelope = bytearray(encrypt_data("hunter2"))
+    for position in (1, 10, len(envelope) - 1):
+        tampered = bytearray(envelope)
+        tampered[position] ^= 0x01
+        try:
+            decrypt_data(bytes(tampered))
+            raise AssertionError(f"Tampered byte {position} was accepted")
+        except InvalidToken:
+            pass
+
+
+class CountingProvider(MemoryKeyProvider):
+    """Memory provider that records how often keys are loaded."""
+
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+
+    def load_keys(self):
+        self.loads += 1
+        return super().load_keys()
+
+
+def test_keys_load_lazily_once():
+    """Keys are read on first crypto use only, and only once."""
+    print("🔧 Testing lazy key loading...")
+    provider = CountingProvider()
+    set_key_provider(provider)
+    try:
+        assert provider.loads == 0
+        token = encrypt_data("lazy")
+        assert decrypt_data(token) == "lazy"
+        assert provider.loads == 1
+    finally:
+        set_key_provider(MemoryKeyProvider())
+
+    # A provider that can't load keys is rejected when created, not on first use
+    try:
+        type("NoKeysProvider", (encryption.KeyProvider,), {})()
+        raise AssertionError("Expected TypeError")
+    except TypeError:
+        pass
+
+
+def test_env_provider_and_read_only_store():
+    """AEGISVAULT_ENCRYPTION_KEY supplies comma separated keys and can't be rewritten."""
+    print("🔧 Testing environment key provider...")
+    old_key, new_key = MemoryKeyProvider().load_keys()[0], MemoryKeyProvider().load_keys()[0]
+    provider = EnvKeyProvider("AEGISVAULT_TEST_KEYS")
+    os.environ["AEGISVAULT_TEST_KEYS"] = old_key.decode()
+    try:
+        set_key_provider(provider)
+        token = encrypt_data("rotating")
+
+        # Prepend a new primary key; old envelopes stay readable
+        os.environ["AEGISVAULT_TEST_KEYS"] = f"{new_key.decode()},{old_key.decode()}"
+        encryption.reload_keys()
+        assert decrypt_data(token) == "rotating"
+        assert encryption.needs_reencryption(token)
+        assert not encryption.needs_reencryption(encrypt_data("fresh"))
+
+        try:
+            provider.store_keys([new_key])
+            raise AssertionError("EnvKeyProvider should be read-only")
+        except encryption.KeyProviderError:
+            pass
+    finally:
+        del os.environ["AEGISVAULT_TEST_KEYS"]
+        set_key_provider(MemoryKeyProvider())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Encryption Tests...\n")
+
+    try:
+        setup_module()
+        test_batch_round_trip_keeps_order()
+        test_small_batches_and_generators()
+        test_binary_envelope_and_legacy_tokens()
+        test_tampered_envelope_is_rejected()
+        test_keys_load_lazily_once()
+        test_env_provider_and_read_only_store()
+        teardown_module()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
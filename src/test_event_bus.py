@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for the event bus and pushed session events.
+"""
+
+import event_bus
+import session_events
+from event_bus import EventBus, format_sse, session_topic
+from session_store import get_session_store
+
+
+def test_publish_reaches_only_topic_subscribers():
+    """Subscribers get events for their topics; slow ones drop the oldest."""
+    print("🔧 Testing publish/subscribe...")
+    bus = EventBus()
+    alice = bus.subscribe(["user:alice"])
+    bob = bus.subscribe(["user:bob"], maxsize=2)
+
+    assert bus.publish("user:alice", "audit_stats_changed", {"new_events": 1}) == 1
+    assert bus.publish("user:nobody", "audit_stats_changed") == 0
+    event = alice.get(timeout=1)
+    assert event.type == "audit_stats_changed" and event.data == {"new_events": 1}
+    assert bob.get(timeout=0.01) is None
+
+    for i in range(3):
+        bus.publish("user:bob", "n", {"i": i})
+    assert bob.dropped == 1
+    assert [bob.get(timeout=1).data["i"] for _ in range(2)] == [1, 2]
+
+    alice.close()
+    assert not bus.has_subscribers("user:alice")
+    assert format_sse("session", {"active": True}, 7) == 'id: 7\nevent: session\ndata: {"active": true}\n\n'
+
+
+def test_session_warning_and_expiry_are_pushed():
+    """A watched session gets a warning before its deadline and then an expiry event."""
+    print("🔧 Testing pushed session events...")
+    previous_warning = session_events.SESSION_WARNING_SECONDS
+    session_events.SESSION_WARNING_SECONDS = 1
+    try:
+        session_id = get_session_store().create("alice", 2)
+        subscription = event_bus.event_bus.subscribe([session_topic(session_id)])
+        session_events.watch_session(session_id)
+
+        warning = subscription.get(timeout=3)
+        print(f"   {warning.type}: {warning.data}")
+        assert warning.type == "session_warning"
+        assert warning.data["active"] and warning.data["remaining_time"] <= 1
+
+        expired = subscription.get(timeout=3)
+        print(f"   {expired.type}: {expired.data}")
+        assert expired.type == "session_expired"
+        assert not expired.data["active"]
+
+        subscription.close()
+        session_events.unwatch_session(session_id)
+    finally:
+        session_events.SESSION_WARNING_SECONDS = previous_warning
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Event Bus Tests...\n")
+
+    try:
+        test_publish_reaches_only_topic_subscribers()
+        test_session_warning_and_expiry_are_pushed()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for encryption key rotation.
+"""
+
+import contextlib
+import time
+
+import pytest
+
+import database
+import encryption
+import key_rotation
+from conftest import temporary_database
+from encryption import MemoryKeyProvider, set_key_provider, get_key_provider
+
+
+@contextlib.contextmanager
+def _rotation_database():
+    """A throwaway database and in-memory keyring, seeded with credentials and a master account."""
+    previous_provider = get_key_provider()
+    set_key_provider(MemoryKeyProvider())
+    try:
+        with temporary_database() as path:
+            database.store_passwords_bulk([(f"site{i}.com", f"user{i}", f"Pass{i}!") for i in range(120)])
+            database.create_master_account("alice", "master-pw")
+            yield path
+    finally:
+        set_key_provider(previous_provider)
+
+
+@pytest.fixture(scope="module")
+def temp_db():
+    """Overrides the shared fixture with a seeded database and throwaway keyring."""
+    with _rotation_database() as path:
+        yield path
+
+
+def test_rotation_reencrypts_everything(temp_db):
+    """After a rotation every row uses the new key and logins still work."""
+    print("🔧 Testing full rotation...")
+    before = database.get_all_credentials()
+
+    target = key_rotation.start_rotation()
+    result = key_rotation.run_rotation(batch_size=50)
+    print(f"   Result: {result}")
+
+    assert result["rotated"] == 121
+    assert not any(result["remaining"].values())
+    assert key_rotation.get_rotation_status()["target_key_id"] == target
+    assert not key_rotation.get_rotation_status()["in_progress"]
+    assert database.get_all_credentials() == before
+    assert database.verify_master_account("alice", "master-pw")
+
+    assert key_rotation.retire_old_keys() == 1
+    assert len(encryption.get_keyring().keys) == 1
+    assert database.get_all_credentials() == before
+    assert database.verify_master_account("alice", "master-pw")
+
+
+def test_rotation_resumes_after_crash(temp_db):
+    """A rotation interrupted mid-way resumes from its last committed batch."""
+    print("🔧 Testing crash and resume...")
+    before = database.get_all_credentials()
+    key_rotation.start_rotation()
+
+    original_rotate_batch = key_rotation._rotate_batch
+    calls = []
+
+    def crash_on_second_batch(table, rows):
+        calls.append(table)
+        if len(calls) == 2:
+            raise RuntimeError("simulated crash")
+        return original_rotate_batch(table, rows)
+
+    key_rotation._rotate_batch = crash_on_second_batch
+    try:
+        key_rotation.run_rotation(batch_size=50)
+        raise AssertionError("Expected the simulated crash")
+    except RuntimeError:
+        pass
+    finally:
+        key_rotation._rotate_batch = original_rotate_batch
+
+    status = key_rotation.get_rotation_status()
+    print(f"   Checkpoint after crash: {status}")
+    assert status["in_progress"] and status["last_id"] == 50 and status["rows_rotated"] == 50
+
+    # A second rotation can't start until this one finishes
+    try:
+        key_rotation.start_rotation()
+        raise AssertionError("Expected KeyRotationError")
+    except key_rotation.KeyRotationError:
+        pass
+
+    result = key_rotation.run_rotation(batch_size=50)
+    # Only the rows after the checkpoint are rotated on resume
+    assert result["rotated"] == 71
+    assert not any(result["remaining"].values())
+    assert database.get_all_credentials() == before
+    assert database.verify_master_account("alice", "master-pw")
+
+
+def test_stale_process_picks_up_rotated_blind_indexes(temp_db):
+    """A process still holding the pre-rotation keyring can log in and look up reuse after a rotation."""
+    print("🔧 Testing lookups from a process with the old keyring...")
+    stale_keyring, stale_version = encryption.get_keyring(), encryption._keyring_version
+
+    # Another process rotates (and re-keys the blind indexes) but never retires the old key
+    key_rotation.start_rotation()
+    key_rotation.run_rotation(batch_size=50)
+    fresh_keyring = encryption.get_keyring()
+
+    def go_stale():
+        encryption._keyring, encryption._keyring_version = stale_keyring, stale_version
+        # As if this process had just checked for new keys
+        encryption._next_reload_check = time.monotonic() + 3600
+
+    go_stale()
+    assert database.verify_master_account("alice", "master-pw")
+    assert encryption.get_keyring().primary_key_id == fresh_keyring.primary_key_id
+
+    go_stale()
+    assert database.get_websites_using_password("Pass7!") == ["site7.com"]
+    assert encryption.get_keyring().primary_key_id == fresh_keyring.primary_key_id
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Key Rotation Tests...\n")
+
+    try:
+        with _rotation_database() as temp_db:
+            test_rotation_reencrypts_everything(temp_db)
+            test_rotation_resumes_after_crash(temp_db)
+            test_stale_process_picks_up_rotated_blind_indexes(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
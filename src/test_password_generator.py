@@ -3,7 +3,10 @@
 Test script for the password generator functionality.
 """
 
+import math
+
 from password_generator import PasswordGenerator
+from password_strength import PasswordStrengthAnalyzer
 
 def test_password_generator():
     """Test the password generator functionality."""
@@ -113,5 +116,24 @@ def test_password_generator():
     print("\n" + "=" * 50)
     print("✅ Password Generator Tests Completed!")
 
+def test_entropy_matches_the_analyzer():
+    """Generated passwords report length * log2(charset size), the same bits as the strength meter."""
+    print("🔧 Testing generator entropy...")
+    generator = PasswordGenerator()
+    analyzer = PasswordStrengthAnalyzer()
+
+    info = generator.get_password_strength_info("abcdefgh")
+    assert info["entropy"] == round(8 * math.log2(26), 2)
+    info = generator.get_password_strength_info("Abcdefgh12345678")
+    assert info["entropy"] == round(16 * math.log2(62), 2)
+    assert info["strength_level"] == "Strong"
+
+    for _ in range(20):
+        password = generator.generate_password(length=20)
+        info = generator.get_password_strength_info(password)
+        assert info["entropy"] == analyzer.analyze_password(password)["entropy"]
+        assert info["entropy"] < 20 * 7
+
 if __name__ == "__main__":
     test_password_generator()
+    test_entropy_matches_the_analyzer()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the master password hasher.
+"""
+
+from password_hashing import PasswordHasher, SCRYPT, PBKDF2_SHA256, calibrate
+
+# Low work factors keep the tests fast
+FAST_SCRYPT = PasswordHasher(SCRYPT, scrypt_log_n=10)
+FAST_PBKDF2 = PasswordHasher(PBKDF2_SHA256, pbkdf2_iterations=1000)
+
+
+def test_hash_and_verify():
+    """Hashes verify with the right password and reject the wrong one."""
+    print("🔧 Testing hash and verify...")
+    for hasher in (FAST_SCRYPT, FAST_PBKDF2):
+        encoded = hasher.hash("correct horse")
+        print(f"   {encoded}")
+        assert PasswordHasher.is_hash(encoded)
+        assert hasher.verify("correct horse", encoded)
+        assert not hasher.verify("wrong horse", encoded)
+        # Salts are random, so hashing twice gives different strings
+        assert encoded != hasher.hash("correct horse")
+
+
+def test_needs_rehash_on_parameter_change():
+    """Hashes made with other parameters or algorithms are flagged for upgrade."""
+    print("🔧 Testing needs_rehash...")
+    encoded = FAST_SCRYPT.hash("secret")
+
+    assert not FAST_SCRYPT.needs_rehash(encoded)
+    assert PasswordHasher(SCRYPT, scrypt_log_n=11).needs_rehash(encoded)
+    assert FAST_PBKDF2.needs_rehash(encoded)
+    # Other hashers can still verify it, since parameters travel with the hash
+    assert FAST_PBKDF2.verify("secret", encoded)
+
+
+def test_rejects_malformed_and_legacy_values():
+    """Legacy Fernet tokens and garbage are not treated as hashes."""
+    print("🔧 Testing malformed values...")
+    legacy_token = "gAAAAABn0000000000000000000000000000000000000000"
+    assert not PasswordHasher.is_hash(legacy_token)
+    assert not FAST_SCRYPT.verify("secret", legacy_token)
+    assert not FAST_SCRYPT.verify("secret", "$scrypt$ln=x$abc$def")
+    assert FAST_SCRYPT.needs_rehash(legacy_token)
+
+
+def test_calibration_reports_costs():
+    """Calibration returns increasing costs and stops past the budget."""
+    print("🔧 Testing calibration...")
+    results = calibrate(PBKDF2_SHA256, target_ms=1, rounds=1)
+    for row in results:
+        print(f"   {row}")
+    assert results
+    assert results[-1]["ms_per_hash"] > 1 or len(results) == 8
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Password Hashing Tests...\n")
+
+    try:
+        test_hash_and_verify()
+        test_needs_rehash_on_parameter_change()
+        test_rejects_malformed_and_legacy_values()
+        test_calibration_reports_costs()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
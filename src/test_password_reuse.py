@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for reused and near-duplicate password detection.
+"""
+
+import database
+from password_reuse import minhash_signature, password_fingerprint, signature_similarity
+
+
+def test_fingerprints_and_signatures():
+    """Equal passwords share a fingerprint; similar ones have similar signatures."""
+    print("🔧 Testing fingerprints and signatures...")
+    assert password_fingerprint("Summer2024!") == password_fingerprint("Summer2024!")
+    assert password_fingerprint("Summer2024!") != password_fingerprint("summer2024!")
+    similar = signature_similarity(minhash_signature("Summer2024!"), minhash_signature("Summer2025!"))
+    unrelated = signature_similarity(minhash_signature("Summer2024!"), minhash_signature("kX9#vq!Lm2Pz"))
+    print(f"   similar {similar}, unrelated {unrelated}")
+    assert similar >= database.NEAR_DUPLICATE_THRESHOLD
+    assert unrelated < database.NEAR_DUPLICATE_THRESHOLD
+
+
+def test_empty_and_one_character_passwords(temp_db):
+    """Passwords too short for more than one or two bigrams still get signatures and can be stored."""
+    print("🔧 Testing empty and one-character passwords...")
+    for password in ("", "a", "7"):
+        fingerprint, signature = database.reuse_columns(password)
+        assert len(fingerprint) == 64
+        assert len(signature) == len(minhash_signature("Summer2024!"))
+    assert minhash_signature("a") == minhash_signature("A")
+    assert minhash_signature("") != minhash_signature("a")
+
+    database.store_password("empty.example", "alice", "")
+    result = database.store_passwords_bulk([("short.example", "alice", "x")])
+    assert result == {"stored": 1, "failed": []}
+    assert database.get_websites_using_password("x") == ["short.example"]
+    database.delete_password("empty.example")
+    database.delete_password("short.example")
+
+
+def test_report_groups_without_decrypting(temp_db):
+    """Exact and near-duplicate groups come from stored fingerprints and signatures only."""
+    print("🔧 Testing reuse report...")
+    database.store_password("mail.example", "alice", "Summer2024!")
+    database.store_password("bank.example", "alice", "Summer2024!")
+    database.store_password("shop.example", "alice", "Summer2025!")
+    database.store_password("news.example", "alice", "kX9#vq!Lm2Pz")
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("the reuse report must not decrypt passwords")
+
+    decrypt_data, decrypt_many = database.decrypt_data, database.decrypt_many
+    database.decrypt_data = database.decrypt_many = refuse
+    try:
+        report = database.get_password_reuse_report()
+    finally:
+        database.decrypt_data, database.decrypt_many = decrypt_data, decrypt_many
+    print(f"   {report}")
+
+    assert report["reused"] == [{"websites": ["bank.example", "mail.example"], "count": 2}]
+    assert report["reused_credentials"] == 2
+    assert len(report["near_duplicates"]) == 1
+    assert report["near_duplicates"][0]["websites"] == ["bank.example", "mail.example", "shop.example"]
+    assert report["near_duplicate_index"] is True
+
+
+def test_lookup_and_removal(temp_db):
+    """Lookups exclude the website being edited; deleted credentials drop out of the report."""
+    print("🔧 Testing lookup and removal...")
+    assert database.get_websites_using_password("Summer2024!", exclude_website="mail.example") == ["bank.example"]
+    assert database.get_websites_using_password("not stored anywhere") == []
+
+    database.delete_password("bank.example")
+    database.delete_password("shop.example")
+    report = database.get_password_reuse_report()
+    print(f"   {report}")
+    assert report["reused"] == []
+    assert report["near_duplicates"] == []
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Password Reuse Tests...\n")
+
+    from conftest import temporary_database
+
+    try:
+        with temporary_database() as temp_db:
+            test_fingerprints_and_signatures()
+            test_empty_and_one_character_passwords(temp_db)
+            test_report_groups_without_decrypting(temp_db)
+            test_lookup_and_removal(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
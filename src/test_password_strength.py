@@ -3,6 +3,8 @@
 Test script for Password Strength Analyzer
 """
 
+import math
+
 from password_strength import PasswordStrengthAnalyzer
 
 def test_password_analyzer():
@@ -88,12 +90,177 @@ def test_edge_cases():
         if analysis['common_patterns']:
             print(f"   Patterns: {', '.join(analysis['common_patterns'])}")
 
+def test_summary_matches_full_analysis():
+    """summarize_password() must agree with analyze_password() on the persisted fields."""
+    analyzer = PasswordStrengthAnalyzer()
+    
+    print("\n🧪 Summary vs Full Analysis Test\n")
+    print("=" * 60)
+    
+    for password in ["", "123", "password", "Password123", "K9#mP$2vL@8nQ&5wR", "a" * 50]:
+        analysis = analyzer.analyze_password(password)
+        summary = analyzer.summarize_password(password)
+        for field in ("strength_score", "strength_level", "entropy"):
+            assert summary[field] == analysis[field], (password, field)
+    print("   ✅ Summaries match full analyses")
+
+def test_feature_extraction_matches_legacy_regexes():
+    """The single-pass analyzer returns exactly what the regex-per-scorer version did."""
+    from bench_password_strength import check_identical, random_passwords
+
+    print("\n🧪 Feature Extraction vs Legacy Test\n")
+    print("=" * 60)
+
+    check_identical(random_passwords(300))
+    print("   ✅ Identical results for 300 passwords")
+
+def test_analyze_many_matches_summaries():
+    """Batch results agree with summarize_password(), across chunk boundaries and for generators."""
+    from bench_password_strength import random_passwords
+
+    analyzer = PasswordStrengthAnalyzer()
+
+    print("\n🧪 Batch Analysis Test\n")
+    print("=" * 60)
+
+    passwords = random_passwords(500) + ["", "٣٤٥ digits", "a\n\n\n\nb", "İstanbul123"]
+    columns = analyzer.analyze_many((password for password in passwords), chunk_size=64)
+    assert len(columns) == len(passwords)
+    for password, row in zip(passwords, columns.rows()):
+        summary = analyzer.summarize_password(password)
+        assert row == (summary["strength_score"], summary["strength_level"], summary["entropy"], None), password
+    assert sum(columns.level_counts().values()) == len(passwords)
+    assert len(analyzer.analyze_many([])) == 0
+    print(f"   ✅ {len(passwords)} batch results match, levels: {columns.level_counts()}")
+
+def test_entropy_is_length_times_log_table():
+    """Table-driven entropy equals log2(charset_size ** length), even for very long passwords."""
+    import math
+
+    analyzer = PasswordStrengthAnalyzer(pattern_entropy=True)
+
+    print("\n🧪 Entropy Test\n")
+    print("=" * 60)
+
+    for length in (1, 8, 64, 128, 1000):
+        for password, charset_size in (("a" * length, 26), ("aA1!" * length, 94)):
+            expected = round(math.log2(charset_size ** len(password)), 2)
+            assert analyzer.analyze_password(password)["entropy"] == expected, (length, charset_size)
+
+    # Predictable passwords get far less credit than their character sets suggest
+    for password in ("password123", "aaaaaaaa", "abcdefgh", "Summer2025!"):
+        analysis = analyzer.analyze_password(password)
+        print(f"   {password}: entropy {analysis['entropy']}, pattern-aware {analysis['pattern_entropy']}")
+        assert analysis["pattern_entropy"] < analysis["entropy"] / 2
+    random_like = analyzer.analyze_password("X9$kLm#2vQ!pR7zW")
+    assert random_like["pattern_entropy"] > 60
+    assert "pattern_entropy" not in PasswordStrengthAnalyzer().analyze_password("abc")
+
+def test_pattern_matchers_find_predictable_parts():
+    """Each matcher finds its pattern, and the guess estimate only credits it once."""
+    from password_strength import get_pattern_matcher
+
+    analyzer = PasswordStrengthAnalyzer(pattern_entropy=True)
+    matcher = get_pattern_matcher()
+    assert get_pattern_matcher() is matcher
+
+    print("\n🧪 Pattern Matcher Test\n")
+    print("=" * 60)
+
+    expected = {
+        "password": ("dictionary", {"dictionary": "passwords", "rank": 2}),
+        "P@ssw0rd": ("dictionary", {"l33t": {"@": "a", "0": "o"}}),
+        "drowssap": ("dictionary", {"reversed": True}),
+        "zxcvbnm,./": ("spatial", {"graph": "qwerty", "turns": 1}),
+        "97531": ("sequence", {"ascending": False}),
+        "abcabcabc": ("repeat", {"base_token": "abc", "repeat_count": 3}),
+        "12/05/1990": ("date", {"year": 1990, "separator": "/"}),
+    }
+    for password, (pattern, details) in expected.items():
+        analysis = analyzer.analyze_password(password)
+        print(f"   {password}: {analysis['common_patterns']}, {analysis['pattern_entropy']} bits")
+        assert len(analysis["patterns"]) == 1, analysis["patterns"]
+        found = analysis["patterns"][0]
+        assert found["pattern"] == pattern and found["token"] == password
+        assert all(found[key] == value for key, value in details.items()), found
+
+    _, sequence = matcher.estimate_guesses("jennifer1987")
+    assert [match.pattern for match in sequence] == ["dictionary", "date"]
+    assert [match.token for match in sequence] == ["jennifer", "1987"]
+    _, sequence = matcher.estimate_guesses("jennifer1987!x")
+    assert "".join(match.token for match in sequence) == "jennifer1987!x"
+    assert matcher.estimate_guesses("")[0] == 1
+
+    # Random-looking passwords have no patterns and keep most of their entropy
+    analysis = analyzer.analyze_password("X9$kLm#2vQ!pR7zW")
+    assert analysis["patterns"] == [] and analysis["pattern_entropy"] > 60
+
+def test_long_passwords_are_matched_past_the_first_block():
+    """Repeats and sequences longer than one block are not costed as brute force."""
+    from password_strength import PATTERN_MATCH_MAX_LENGTH, get_pattern_matcher
+
+    analyzer = PasswordStrengthAnalyzer(pattern_entropy=True)
+    for password in ("1" * 100, "0123456789" * 10, "abc" * 33):
+        bits = analyzer.estimate_pattern_entropy(password)
+        print(f"   {password[:12]}... ({len(password)} chars): {bits} bits")
+        assert bits < 20
+
+    # Blocks are matched separately; the tokens still cover the whole password
+    password = "correcthorse" * 2 + "X9$kLm#2vQ!pR7zW" * 3 + "jennifer1987"
+    assert len(password) > PATTERN_MATCH_MAX_LENGTH
+    _, sequence = get_pattern_matcher().estimate_guesses(password)
+    assert "".join(match.token for match in sequence) == password
+    assert sequence[-1].token == "1987" and sequence[-1].i == len(password) - 4
+
+
+def test_matching_stops_at_the_input_limit():
+    """Only the first PATTERN_MATCH_INPUT_LIMIT characters are matched; the rest is brute force."""
+    from password_strength import PATTERN_MATCH_INPUT_LIMIT, get_pattern_matcher
+
+    matcher = get_pattern_matcher()
+    matched_lengths = []
+    omnimatch, repeat_matches = matcher.omnimatch, matcher._repeat_matches
+
+    def record(function):
+        def recorded(password, *args):
+            matched_lengths.append(len(password))
+            return function(password, *args)
+        return recorded
+
+    matcher.omnimatch, matcher._repeat_matches = record(omnimatch), record(repeat_matches)
+    try:
+        password = "1" * 5000
+        guesses, sequence = matcher.estimate_guesses(password)
+    finally:
+        del matcher.omnimatch, matcher._repeat_matches
+    print(f"   Longest matched input: {max(matched_lengths)} of {len(password)} chars")
+    assert max(matched_lengths) <= PATTERN_MATCH_INPUT_LIMIT
+    assert "".join(match.token for match in sequence) == password
+    assert sequence[-1].pattern == "bruteforce" and sequence[-1].i == PATTERN_MATCH_INPUT_LIMIT
+    assert guesses == 1e300
+
+    head = "Tr0ub4dor&3" * 9 + "x"
+    assert len(head) == PATTERN_MATCH_INPUT_LIMIT
+    head_guesses, _ = matcher.estimate_guesses(head)
+    guesses, _ = matcher.estimate_guesses(head + "42")
+    assert abs(math.log10(guesses) - math.log10(head_guesses) - 2) < 1e-9
+
+    analysis = PasswordStrengthAnalyzer(pattern_entropy=True).analyze_password("a" * 2000)
+    assert analysis["patterns"][0]["pattern"] == "repeat"
+
 if __name__ == "__main__":
     print("🚀 Starting Password Strength Analyzer Tests...\n")
     
     try:
         test_password_analyzer()
         test_edge_cases()
+        test_summary_matches_full_analysis()
+        test_feature_extraction_matches_legacy_regexes()
+        test_analyze_many_matches_summaries()
+        test_entropy_is_length_times_log_table()
+        test_pattern_matchers_find_predictable_parts()
+        test_long_passwords_are_matched_past_the_first_block()
+        test_matching_stops_at_the_input_limit()
         print("\n✅ All tests completed successfully!")
         
     except Exception as e:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for converting legacy Fernet ciphertext to binary envelopes.
+"""
+
+import database
+import encryption
+import reencrypt_data
+
+
+def _fernet(value):
+    """A value as the pre-envelope code stored it: a Fernet token in a TEXT column."""
+    return encryption.get_keyring().fernet.encrypt(value.encode()).decode()
+
+
+def _seed_legacy_rows():
+    conn = database.get_connection()
+    try:
+        conn.execute("DELETE FROM credentials")
+        conn.execute("DELETE FROM master_account")
+        conn.executemany(
+            "INSERT INTO credentials (website, username, password) VALUES (?, ?, ?)",
+            [(f"legacy{i}.com", _fernet(f"user{i}"), _fernet(f"Pass{i}!")) for i in range(5)]
+        )
+        conn.execute(
+            "INSERT INTO master_account (username, password, username_index) VALUES (?, ?, ?)",
+            (_fernet("alice"), _fernet("master-pw"), encryption.blind_index("alice"))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    # One row already in the current format
+    database.store_password("modern.com", "user5", "Pass5!")
+
+
+def _stored_values():
+    conn = database.get_connection()
+    try:
+        return conn.execute("SELECT website, username, password FROM credentials ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_legacy_rows_are_converted_once(temp_db):
+    """Legacy rows become envelopes that still decrypt; a second run changes nothing."""
+    print("🔧 Testing legacy re-encryption...")
+    _seed_legacy_rows()
+    assert database.count_legacy_ciphertext() == 5
+    modern_before = _stored_values()[-1]
+
+    result = database.reencrypt_legacy_data(batch_size=2)
+    print(f"   {result}")
+    assert result == {"credentials": 5, "master_accounts": 1, "failed": []}
+    assert database.count_legacy_ciphertext() == 0
+
+    converted = _stored_values()
+    assert converted[-1] == modern_before
+    for website, username, password in converted:
+        assert isinstance(username, bytes) and isinstance(password, bytes)
+        assert not encryption.is_legacy_ciphertext(username) and not encryption.is_legacy_ciphertext(password)
+    for i in range(5):
+        assert database.retrieve_password(f"legacy{i}.com") == (f"user{i}", f"Pass{i}!")
+    assert database.verify_master_account("alice", "master-pw")
+
+    # Nothing left to convert, and already-converted values are left byte for byte
+    assert database.reencrypt_legacy_data(batch_size=2) == {"credentials": 0, "master_accounts": 0, "failed": []}
+    assert _stored_values() == converted
+
+
+def test_script_reports_undecryptable_rows(temp_db):
+    """reencrypt_data.py converts what it can and exits non-zero for rows it can't decrypt."""
+    print("🔧 Testing reencrypt_data.py...")
+    _seed_legacy_rows()
+    conn = database.get_connection()
+    try:
+        conn.execute("UPDATE credentials SET password = 'not-a-fernet-token' WHERE website = 'legacy3.com'")
+        conn.commit()
+        broken_id = conn.execute("SELECT id FROM credentials WHERE website = 'legacy3.com'").fetchone()[0]
+    finally:
+        conn.close()
+
+    assert reencrypt_data.main(["--batch-size", "2"]) == 1
+    assert database.count_legacy_ciphertext() == 1
+    assert database.reencrypt_legacy_data()["failed"] == [broken_id]
+    assert database.retrieve_password("legacy4.com") == ("user4", "Pass4!")
+
+    conn = database.get_connection()
+    try:
+        conn.execute("DELETE FROM credentials WHERE website = 'legacy3.com'")
+        conn.commit()
+    finally:
+        conn.close()
+    assert reencrypt_data.main(["--vacuum"]) == 0
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Re-encryption Tests...\n")
+
+    from conftest import temporary_database
+
+    try:
+        with temporary_database() as temp_db:
+            test_legacy_rows_are_converted_once(temp_db)
+            test_script_reports_undecryptable_rows(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the session scheduler and registry.
+"""
+
+import threading
+import time
+
+from session import SessionScheduler, SessionRegistry
+
+
+def test_scheduler_fires_in_deadline_order():
+    """Callbacks run once, in deadline order; cancelled keys never fire."""
+    print("🔧 Testing scheduler ordering and cancel...")
+    scheduler = SessionScheduler()
+    fired = []
+    now = time.monotonic()
+
+    scheduler.schedule("c", now + 0.15, fired.append)
+    scheduler.schedule("a", now + 0.05, fired.append)
+    scheduler.schedule("b", now + 0.10, fired.append)
+    scheduler.schedule("x", now + 0.08, fired.append)
+    scheduler.cancel("x")
+    # Rescheduling replaces the earlier deadline
+    scheduler.schedule("c", now + 0.02, fired.append)
+
+    time.sleep(0.3)
+    print(f"   Fired: {fired}")
+    assert fired == ["c", "a", "b"]
+    assert len(scheduler) == 0
+
+
+def test_registry_handles_many_sessions_on_one_thread():
+    """Thousands of sessions expire on time without a thread per session."""
+    print("🔧 Testing many concurrent sessions...")
+    registry = SessionRegistry()
+    expired = []
+    lock = threading.Lock()
+
+    def on_expire(key, state):
+        with lock:
+            expired.append(key)
+
+    registry.add_expiry_listener(on_expire)
+    threads_before = threading.active_count()
+    for i in range(2000):
+        registry.start(f"session-{i}", f"user-{i}", timeout=0.2 if i % 2 else 60)
+
+    assert threading.active_count() <= threads_before + 1
+    assert registry.remaining("session-0") in (59, 60)
+    time.sleep(0.5)
+
+    print(f"   Expired: {len(expired)}, still active: {len(registry)}")
+    assert len(expired) == 1000
+    assert all(int(key.split("-")[1]) % 2 for key in expired)
+    assert registry.is_active("session-0") and not registry.is_active("session-1")
+
+
+def test_activity_pushes_deadline_out():
+    """touch() keeps a session alive; end() stops it without expiry callbacks."""
+    print("🔧 Testing refresh and logout...")
+    registry = SessionRegistry()
+    expired = []
+    registry.start("s1", "alice", timeout=0.15, on_expire=lambda key, state: expired.append(key))
+    registry.start("s2", "bob", timeout=0.15, on_expire=lambda key, state: expired.append(key))
+    registry.end("s2")
+
+    for _ in range(4):
+        time.sleep(0.05)
+        registry.touch("s1")
+    assert expired == [] and registry.is_active("s1")
+
+    time.sleep(0.3)
+    assert expired == ["s1"]
+    assert registry.remaining("s1") == 0
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Session Tests...\n")
+
+    try:
+        test_scheduler_fires_in_deadline_order()
+        test_registry_handles_many_sessions_on_one_thread()
+        test_activity_pushes_deadline_out()
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
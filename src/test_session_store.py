@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-session server-side stores.
+"""
+
+import time
+
+import database
+from session import SessionRegistry
+from session_store import InMemorySessionStore, SQLiteSessionStore, SessionStore
+
+def _check_store(store):
+    # Two users' sessions never see each other's state
+    alice = store.create("alice", 60)
+    bob = store.create("bob", 1)
+    assert alice != bob
+    assert store.get(alice)["username"] == "alice"
+    assert store.get(bob)["username"] == "bob"
+    assert 58 <= store.get(alice)["remaining_time"] <= 60
+    assert store.get("no-such-session") is None
+    assert store.get(None) is None
+
+    # Changing one session's timeout leaves the other alone
+    assert store.set_timeout(alice, 120)
+    assert store.get(alice)["timeout"] == 120
+    assert store.get(bob)["timeout"] == 1
+
+    time.sleep(1.2)
+    assert store.get(bob) is None
+    assert not store.touch(bob)
+    assert store.touch(alice)
+    assert store.get(alice) is not None
+
+    store.delete(alice)
+    assert store.get(alice) is None
+    assert not store.touch(alice)
+
+
+def test_in_memory_store():
+    """Sessions are isolated, time out and end on delete."""
+    print("🔧 Testing in-memory session store...")
+    _check_store(InMemorySessionStore(SessionRegistry()))
+
+    class IncompleteStore(SessionStore):
+        def create(self, username, timeout=60):
+            return "id"
+
+    try:
+        IncompleteStore()
+        assert False, "expected TypeError"
+    except TypeError:
+        pass
+
+
+def test_sqlite_store(temp_db):
+    """The SQLite store behaves the same and is shared between store instances."""
+    print("🔧 Testing SQLite session store...")
+    store = SQLiteSessionStore()
+    _check_store(store)
+
+    # A second instance (another worker process) sees the same sessions
+    session_id = store.create("carol", 60)
+    assert SQLiteSessionStore().get(session_id)["username"] == "carol"
+
+    expired = store.create("dave", 0)
+    assert store.get(expired) is None
+    assert store.purge_expired() >= 1
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Session Store Tests...\n")
+
+    from conftest import temporary_database
+
+    try:
+        test_in_memory_store()
+        with temporary_database() as temp_db:
+            test_sqlite_store(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for cached user preferences.
+"""
+
+
+import database
+
+def test_defaults_are_created_and_cached(temp_db):
+    """First read creates typed defaults; later reads come from the cache."""
+    print("🔧 Testing cached defaults...")
+    preferences = database.load_user_preferences("alice")
+    print(f"   {preferences}")
+    assert preferences.session_timeout == 300
+    assert preferences.lock_on_window_blur is True
+    assert database.load_user_preferences("alice") is preferences
+    assert database.get_user_preferences("alice")["session_timeout"] == 300
+
+
+def test_update_writes_through_and_changes_etag(temp_db):
+    """Updates are coerced to column types and replace the cached entry."""
+    print("🔧 Testing write-through updates...")
+    before = database.load_user_preferences("bob")
+    database.update_user_preferences("bob", session_timeout="600", auto_lock_enabled=False, bogus=1)
+    after = database.load_user_preferences("bob")
+    print(f"   {before.etag} -> {after.etag}")
+    assert after.session_timeout == 600
+    assert after.auto_lock_enabled is False
+    assert after.etag != before.etag
+
+    try:
+        database.update_user_preferences("bob", session_timeout="soon")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert database.load_user_preferences("bob").session_timeout == 600
+
+
+def test_string_flags_and_timeouts_are_parsed(temp_db):
+    """Form and JSON strings like "false" turn options off; bad values are rejected."""
+    print("🔧 Testing flag and timeout parsing...")
+    database.load_user_preferences("carol")
+    database.update_user_preferences("carol", lock_on_window_blur="false", auto_lock_enabled="0",
+                                     lock_on_tab_inactive="On", session_timeout=" 900 ")
+    preferences = database.load_user_preferences("carol")
+    print(f"   {preferences}")
+    assert preferences.lock_on_window_blur is False
+    assert preferences.auto_lock_enabled is False
+    assert preferences.lock_on_tab_inactive is True
+    assert preferences.session_timeout == 900
+
+    for field, value in (("auto_lock_enabled", "maybe"), ("auto_lock_enabled", 2), ("auto_lock_enabled", None),
+                         ("session_timeout", 0), ("session_timeout", "-5"), ("session_timeout", True)):
+        try:
+            database.update_user_preferences("carol", **{field: value})
+            assert False, f"expected ValueError for {field}={value!r}"
+        except ValueError:
+            pass
+    assert database.load_user_preferences("carol") == preferences
+
+
+if __name__ == "__main__":
+    print("🚀 Starting User Preferences Tests...\n")
+
+    from conftest import temporary_database
+
+    try:
+        with temporary_database() as temp_db:
+            test_defaults_are_created_and_cached(temp_db)
+            test_update_writes_through_and_changes_etag(temp_db)
+            test_string_flags_and_timeouts_are_parsed(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Test script for vault listing, website search and single-credential lookup.
+"""
+
+import database
+import decrypted_cache
+from decrypted_cache import DecryptedCache
+
+WEBSITES = ["mail.com", "gmail.com", "mail.google.com", "mailbox.org", "example.com", "hotmail.co.uk",
+            "mymail-mail.net", "ai.com"]
+
+
+def _clear_credentials():
+    conn = database.get_connection()
+    try:
+        conn.execute("DELETE FROM credentials")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _websites(result):
+    return [credential["website"] for credential in result["credentials"]]
+
+
+def test_search_ranking(temp_db):
+    """Best bm25 match first, shorter websites first on ties; paging keeps that order."""
+    print("🔧 Testing search ranking...")
+    _clear_credentials()
+    for website in WEBSITES:
+        database.store_password(website, "alice", "Summer2024!")
+
+    result = database.search_credentials("mail")
+    print(f"   mail: {_websites(result)}")
+    assert _websites(result) == ["mymail-mail.net", "mail.com", "gmail.com", "mailbox.org", "hotmail.co.uk",
+                                 "mail.google.com"]
+    assert result["total"] == 6 and result["pages"] == 1 and result["query"] == "mail"
+
+    pages = [database.search_credentials("mail", page=page, per_page=4) for page in (1, 2, 3)]
+    assert [_websites(page) for page in pages] == [_websites(result)[:4], _websites(result)[4:], []]
+    assert pages[0]["pages"] == 2
+
+    # Case-insensitive, and FTS5 syntax in the query is matched literally
+    assert _websites(database.search_credentials("AIL.")) == ["mail.com", "gmail.com", "hotmail.co.uk",
+                                                               "mail.google.com", "mymail-mail.net"]
+    assert database.search_credentials('mail" OR "example')["total"] == 0
+    assert database.search_credentials("nothing-like-this")["credentials"] == []
+
+
+def test_short_queries_fall_back_to_like(temp_db):
+    """Queries under three characters use a LIKE scan ordered by website; empty lists everything."""
+    print("🔧 Testing the LIKE fallback...")
+    _clear_credentials()
+    for website in WEBSITES + ["50%_off.shop"]:
+        database.store_password(website, "alice", "Summer2024!")
+
+    assert len("ai") < database.MIN_FTS_QUERY_LENGTH
+    result = database.search_credentials("ai")
+    assert _websites(result) == sorted(website for website in WEBSITES if "ai" in website)
+    assert result["query"] == "ai"
+    assert _websites(database.search_credentials("%_")) == ["50%_off.shop"]
+    assert database.search_credentials("  ")["total"] == len(WEBSITES) + 1
+
+
+def test_index_follows_inserts_updates_and_deletes(temp_db):
+    """The credentials_fts triggers keep search in step with writes, soft deletes and restores."""
+    print("🔧 Testing search index triggers...")
+    _clear_credentials()
+
+    def found(query):
+        return _websites(database.search_credentials(query))
+
+    database.store_password("bank.example", "alice", "Summer2024!")
+    database.store_passwords_bulk([("shop.example", "alice", "Winter2024!")])
+    assert found("example") == ["bank.example", "shop.example"]
+
+    # Password updates and upserts don't duplicate index entries
+    database.update_password("bank.example", "Autumn2024!")
+    database.store_password("shop.example", "bob", "Spring2024!")
+    assert found("example") == ["bank.example", "shop.example"]
+
+    # Renaming a website moves its index entry
+    conn = database.get_connection()
+    try:
+        conn.execute("UPDATE credentials SET website = 'credit-union.example' WHERE website = 'bank.example'")
+        conn.commit()
+    finally:
+        conn.close()
+    assert found("bank") == []
+    assert found("union") == ["credit-union.example"]
+
+    # Soft delete hides it; storing the website again restores it once
+    database.delete_password("shop.example")
+    assert found("shop") == []
+    assert database.search_credentials("example")["total"] == 1
+    database.store_password("shop.example", "alice", "Summer2025!")
+    assert found("shop") == ["shop.example"]
+    assert database.search_credentials("example")["total"] == 2
+
+    # Hard deletes of active and soft-deleted rows
+    database.delete_password("credit-union.example")
+    conn = database.get_connection()
+    try:
+        conn.execute("DELETE FROM credentials")
+        conn.commit()
+    finally:
+        conn.close()
+    assert database.search_credentials("example")["total"] == 0
+
+
+def test_page_listing(temp_db):
+    """Sorting is validated, pages are bounded and website filters match % and _ literally."""
+    print("🔧 Testing credential pages...")
+    _clear_credentials()
+    websites = [f"site{i:02d}.com" for i in range(12)] + ["100%.com", "a_b.com", "axb.com"]
+    database.store_passwords_bulk([(website, "alice", "Summer2024!") for website in websites])
+
+    for bad in ({"sort": "password"}, {"sort": "website; DROP TABLE credentials"}, {"order": "up"}):
+        try:
+            database.get_credentials_page(**bad)
+            assert False, f"expected ValueError for {bad}"
+        except ValueError:
+            pass
+
+    first = database.get_credentials_page(page=1, per_page=5)
+    assert first["total"] == 15 and first["pages"] == 3
+    assert _websites(first) == sorted(websites)[:5]
+    assert "password" not in first["credentials"][0] and "username" not in first["credentials"][0]
+    last = database.get_credentials_page(page=3, per_page=5, order="desc")
+    assert _websites(last) == sorted(websites, reverse=True)[10:]
+    assert database.get_credentials_page(page=4, per_page=5)["credentials"] == []
+
+    # Out-of-range page numbers and sizes are clamped
+    assert database.get_credentials_page(page=0, per_page=5)["page"] == 1
+    assert database.get_credentials_page(page=-3, per_page=0)["per_page"] == 1
+    everything = database.get_credentials_page(per_page=100, sort="created_at")
+    assert everything["pages"] == 1 and len(everything["credentials"]) == 15
+
+    assert _websites(database.get_credentials_page(website_filter="%")) == ["100%.com"]
+    assert _websites(database.get_credentials_page(website_filter="a_b")) == ["a_b.com"]
+    assert _websites(database.get_credentials_page(website_filter="SITE1")) == ["site10.com", "site11.com"]
+    assert database.get_credentials_page(website_filter="\\")["total"] == 0
+
+
+def test_credential_by_id(temp_db):
+    """Single rows are decrypted on demand; missing and soft-deleted ids return None."""
+    print("🔧 Testing credential lookup by id...")
+    _clear_credentials()
+    database.store_password("bank.example", "alice", "Summer2024!")
+    database.store_password("old.example", "bob", "Winter2024!")
+    ids = {credential["website"]: credential["id"]
+           for credential in database.get_credentials_page()["credentials"]}
+
+    assert database.get_credential_by_id(ids["bank.example"]) == {
+        "id": ids["bank.example"], "website": "bank.example", "username": "alice", "password": "Summer2024!"
+    }
+    database.delete_password("old.example")
+    assert database.get_credential_by_id(ids["old.example"]) is None
+    assert database.get_credential_by_id(max(ids.values()) + 1000) is None
+    assert database.get_credential_by_id(-1) is None
+
+
+def test_decrypted_cache_sees_writes_from_other_connections(temp_db):
+    """Every write bumps the row version, so cached plaintext is never served after a change made elsewhere."""
+    print("🔧 Testing decrypted cache freshness...")
+    _clear_credentials()
+    database.store_password("bank.example", "alice", "Summer2024!")
+    credential_id = database.get_credentials_page()["credentials"][0]["id"]
+
+    previous_cache = decrypted_cache._decrypted_cache
+    cache = decrypted_cache._decrypted_cache = DecryptedCache(enabled=True)
+    try:
+        assert database.get_credential_by_id(credential_id, cache_ttl=60)["password"] == "Summer2024!"
+        assert database.retrieve_password("bank.example") == ("alice", "Summer2024!")
+        assert cache.get_metrics()["hits"] == 1
+
+        # Rewritten by another process within the same second: updated_at may not change, the version does
+        replacement = database.encrypt_data("Winter2024!")
+        conn = database.get_connection()
+        try:
+            conn.execute("UPDATE credentials SET password = ? WHERE id = ?", (replacement, credential_id))
+            conn.commit()
+        finally:
+            conn.close()
+        assert database.get_credential_by_id(credential_id)["password"] == "Winter2024!"
+
+        # Upserts count as writes too
+        conn = database.get_connection()
+        try:
+            before = conn.execute("SELECT version FROM credentials WHERE id = ?", (credential_id,)).fetchone()[0]
+        finally:
+            conn.close()
+        database.store_passwords_bulk([("bank.example", "bob", "Autumn2024!")])
+        assert database.retrieve_password("bank.example") == ("bob", "Autumn2024!")
+        conn = database.get_connection()
+        try:
+            assert conn.execute("SELECT version FROM credentials WHERE id = ?", (credential_id,)).fetchone()[0] > before
+        finally:
+            conn.close()
+    finally:
+        decrypted_cache._decrypted_cache = previous_cache
+
+
+def test_stats_summary_is_invalidated_by_writes(temp_db):
+    """The cached strength summary is reused until a store, update, delete or bulk write changes it."""
+    print("🔧 Testing the password stats cache...")
+    _clear_credentials()
+    database.invalidate_password_stats()
+
+    def cached_summary():
+        """Returns the summary, failing if it would have to be rebuilt from the database."""
+        get_connection = database.get_connection
+
+        def refuse():
+            raise AssertionError("the cached summary should have been used")
+
+        database.get_connection = refuse
+        try:
+            return database.get_password_stats_summary()
+        finally:
+            database.get_connection = get_connection
+
+    assert database.get_password_stats_summary()["total"] == 0
+    assert cached_summary()["total"] == 0
+
+    database.store_password("bank.example", "alice", "a")
+    summary = database.get_password_stats_summary()
+    assert summary["total"] == 1 and summary["strength_distribution"]["Very Weak"] == 1
+    assert cached_summary() == summary
+
+    database.update_password("bank.example", "Kx7#vQ!2pLm$9zR-wide")
+    summary = database.get_password_stats_summary()
+    assert summary["total"] == 1 and summary["strength_distribution"]["Very Weak"] == 0
+    assert cached_summary() == summary
+
+    database.store_passwords_bulk([("shop.example", "alice", "123"), ("news.example", "alice", "456")])
+    assert database.get_password_stats_summary()["total"] == 3
+    assert cached_summary()["total"] == 3
+
+    database.delete_password("shop.example")
+    assert database.get_password_stats_summary()["total"] == 2
+
+    # Callers get copies, so mutating one can't corrupt the cache
+    cached_summary()["strength_distribution"]["Very Weak"] = 99
+    assert cached_summary()["strength_distribution"]["Very Weak"] == 1
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Vault Tests...\n")
+
+    from conftest import temporary_database
+
+    try:
+        with temporary_database() as temp_db:
+            test_search_ranking(temp_db)
+            test_short_queries_fall_back_to_like(temp_db)
+            test_index_follows_inserts_updates_and_deletes(temp_db)
+            test_page_listing(temp_db)
+            test_credential_by_id(temp_db)
+            test_decrypted_cache_sees_writes_from_other_connections(temp_db)
+            test_stats_summary_is_invalidated_by_writes(temp_db)
+        print("\n✅ All tests completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()